@@ -0,0 +1,36 @@
+"""tag search trigram index
+
+Revision ID: 3f9c2a1d7e45
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c2a1d7e45"
+down_revision: str | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # SQLite searches an in-process trigram index instead
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # similarity() and gin_trgm_ops come from pg_trgm; the index is built
+    # without blocking writes to tags
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tags_name_trgm "
+            "ON tags USING gin (name gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_tags_name_trgm")
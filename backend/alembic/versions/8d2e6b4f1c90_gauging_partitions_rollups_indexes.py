@@ -0,0 +1,212 @@
+"""tank gauging, run partitions and watermarks, rollup tiers, hierarchy and keyset indexes
+
+Revision ID: 8d2e6b4f1c90
+Revises: 3f9c2a1d7e45
+Create Date: 2026-10-18 12:00:00.000000
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.models.base import UUIDType
+from app.models.telemetry import uses_timescale
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2e6b4f1c90"
+down_revision: str | None = "3f9c2a1d7e45"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+ROLLUP_TIERS = ("telemetry_rollup_1m", "telemetry_rollup_1h", "telemetry_rollup_1d")
+
+# Indexes on tables that already hold data; built without blocking writes on PostgreSQL
+EXISTING_TABLE_INDEXES = (
+    ("ix_audit_logs_created_at_id", "audit_logs", ["created_at", "id"]),
+    ("ix_custody_transfers_transfer_time_id", "custody_transfers", ["transfer_time", "id"]),
+    ("ix_trips_updated_at", "trips", ["updated_at"]),
+    ("ix_epods_updated_at", "epods", ["updated_at"]),
+    ("ix_berth_schedules_updated_at", "berth_schedules", ["updated_at"]),
+    (
+        "ix_variance_records_run_reference",
+        "variance_records",
+        ["reconciliation_run_id", "reference_id", "node"],
+    ),
+    ("ix_reconciliation_runs_parent_run_id", "reconciliation_runs", ["parent_run_id"]),
+)
+
+PATH_TABLES = ("assets", "systems", "tags")
+
+
+def _timestamps() -> list[sa.Column]:
+    return [
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+    ]
+
+
+def _existing_tables() -> set[str]:
+    # Tables added by the app's create_all at startup may already be there;
+    # offline (--sql) output assumes none are
+    if op.get_context().as_sql:
+        return set()
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _existing_columns(table: str) -> set[str]:
+    if op.get_context().as_sql:
+        return set()
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    postgresql = op.get_bind().dialect.name == "postgresql"
+    existing = _existing_tables()
+
+    if "parent_run_id" not in _existing_columns("reconciliation_runs"):
+        # Batch mode so SQLite, which can't ALTER in a foreign key, copies the table
+        with op.batch_alter_table("reconciliation_runs") as batch_op:
+            batch_op.add_column(
+                sa.Column(
+                    "parent_run_id",
+                    UUIDType,
+                    # PostgreSQL's default name, as create_all would give it
+                    sa.ForeignKey(
+                        "reconciliation_runs.id", name="reconciliation_runs_parent_run_id_fkey"
+                    ),
+                    nullable=True,
+                )
+            )
+
+    if "reconciliation_watermarks" not in existing:
+        op.create_table(
+            "reconciliation_watermarks",
+            sa.Column(
+                "reconciliation_run_id",
+                UUIDType,
+                sa.ForeignKey("reconciliation_runs.id"),
+                primary_key=True,
+            ),
+            sa.Column("node", sa.String(30), primary_key=True),
+            sa.Column("watermark", sa.DateTime(timezone=True), nullable=False),
+        )
+
+    if "strapping_table_points" not in existing:
+        op.create_table(
+            "strapping_table_points",
+            sa.Column("table_ref", sa.String(255), primary_key=True),
+            sa.Column("level_mm", sa.Float(), primary_key=True),
+            sa.Column("volume_m3", sa.Float(), nullable=False),
+        )
+
+    if "tank_dips" not in existing:
+        op.create_table(
+            "tank_dips",
+            sa.Column("id", UUIDType, primary_key=True),
+            sa.Column("tank_id", UUIDType, sa.ForeignKey("tanks.id"), nullable=False),
+            sa.Column("measured_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("level_mm", sa.Float(), nullable=False),
+            sa.Column("source", sa.String(50), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index("ix_tank_dips_tank_measured_at", "tank_dips", ["tank_id", "measured_at"])
+
+    if "tank_receipts" not in existing:
+        op.create_table(
+            "tank_receipts",
+            sa.Column("id", UUIDType, primary_key=True),
+            sa.Column("tank_id", UUIDType, sa.ForeignKey("tanks.id"), nullable=False),
+            sa.Column(
+                "berth_schedule_id", UUIDType, sa.ForeignKey("berth_schedules.id"), nullable=True
+            ),
+            sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("ended_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("metered_volume_m3", sa.Float(), nullable=False),
+            sa.Column("reference", sa.String(255), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index("ix_tank_receipts_tank_id", "tank_receipts", ["tank_id"])
+        op.create_index("ix_tank_receipts_started_at", "tank_receipts", ["started_at"])
+
+    if "asset_closure" not in existing:
+        op.create_table(
+            "asset_closure",
+            sa.Column("ancestor_id", UUIDType, primary_key=True),
+            sa.Column("descendant_id", UUIDType, primary_key=True),
+            sa.Column("depth", sa.Integer(), nullable=False),
+            sa.Column("kind", sa.String(10), nullable=False),
+        )
+        op.create_index("ix_asset_closure_descendant_id", "asset_closure", ["descendant_id"])
+
+    # On TimescaleDB the tiers are continuous aggregates from
+    # scripts.create_telemetry_rollups, not tables
+    if not uses_timescale():
+        for tier in ROLLUP_TIERS:
+            if tier in existing:
+                continue
+            op.create_table(
+                tier,
+                sa.Column("tag_id", UUIDType, primary_key=True),
+                sa.Column("bucket", sa.DateTime(timezone=True), primary_key=True),
+                sa.Column("value_min", sa.Float(), nullable=False),
+                sa.Column("value_max", sa.Float(), nullable=False),
+                sa.Column("value_avg", sa.Float(), nullable=False),
+                sa.Column("value_last", sa.Float(), nullable=False),
+                sa.Column("sample_count", sa.Integer(), nullable=False),
+                sa.Column("good_count", sa.Integer(), nullable=False),
+                sa.Column("uncertain_count", sa.Integer(), nullable=False),
+                sa.Column("bad_count", sa.Integer(), nullable=False),
+            )
+    if "telemetry_rollup_state" not in existing:
+        op.create_table(
+            "telemetry_rollup_state",
+            sa.Column("tier", sa.String(10), primary_key=True),
+            sa.Column("refreshed_until", sa.DateTime(timezone=True), nullable=False),
+        )
+
+    if not postgresql:
+        for name, table, columns in EXISTING_TABLE_INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS ltree")
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in EXISTING_TABLE_INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} ({', '.join(columns)})"
+            )
+        for table in PATH_TABLES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_path_gist "
+                f"ON {table} USING gist ((path::ltree))"
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for table in PATH_TABLES:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_path_gist")
+            for name, _, _ in EXISTING_TABLE_INDEXES:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    else:
+        for name, table, _ in EXISTING_TABLE_INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True)
+
+    op.drop_table("telemetry_rollup_state")
+    if not uses_timescale():
+        for tier in ROLLUP_TIERS:
+            op.drop_table(tier)
+    op.drop_table("asset_closure")
+    op.drop_table("tank_receipts")
+    op.drop_table("tank_dips")
+    op.drop_table("strapping_table_points")
+    op.drop_table("reconciliation_watermarks")
+    with op.batch_alter_table("reconciliation_runs") as batch_op:
+        batch_op.drop_column("parent_run_id")
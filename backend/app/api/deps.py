@@ -4,16 +4,17 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.core.constants import UserRole
 from app.core.security import decode_token
-from app.database import get_db
+from app.database import get_db, get_session_factory
 from app.models.user import User
 
 security_scheme = HTTPBearer()
 
 DbSession = Annotated[AsyncSession, Depends(get_db)]
+SessionFactory = Annotated[async_sessionmaker[AsyncSession], Depends(get_session_factory)]
 
 
 async def get_current_user(
@@ -0,0 +1,152 @@
+"""Shared pagination for list endpoints.
+
+Every list endpoint accepts ``page``/``per_page`` as before, plus:
+
+- ``cursor``: the ``meta.next_cursor`` of the previous page. Pages are then
+  read by keyset, ``WHERE (sort_key, id) < (last_sort_key, last_id)``, so
+  page 10,000 of the audit log costs the same as page 1.
+- ``count``: ``exact`` (default) runs ``count(*)``; ``estimate`` uses the
+  planner's row estimate on PostgreSQL (exact on SQLite); ``none`` skips
+  counting and reports ``total: null``. ``meta.next_cursor`` is null on the
+  last page either way.
+"""
+
+import base64
+import uuid
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Annotated, Any
+
+import orjson
+from fastapi import Depends, Query
+from sqlalchemy import Select, func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.config import settings
+from app.core.constants import CountMode
+from app.core.exceptions import ValidationException
+
+
+@dataclass(frozen=True)
+class PageParams:
+    page: int
+    per_page: int
+    cursor: str | None
+    count: CountMode
+
+
+def page_params(default: int = 25, maximum: int = 100) -> Callable[..., PageParams]:
+    """Build the query-parameter dependency for a list endpoint."""
+
+    def dependency(
+        page: int = Query(1, ge=1),
+        per_page: int = Query(default, ge=1, le=maximum),
+        cursor: str | None = Query(
+            None, description="meta.next_cursor of the previous page; ignores `page`"
+        ),
+        count: CountMode = Query(CountMode.EXACT, description="exact, estimate or none"),
+    ) -> PageParams:
+        return PageParams(page=page, per_page=per_page, cursor=cursor, count=count)
+
+    return dependency
+
+
+Pagination = Annotated[PageParams, Depends(page_params())]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = orjson.dumps(
+        [v.isoformat() if isinstance(v, datetime) else str(v) for v in values]
+    )
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[InstrumentedAttribute]) -> list[Any]:
+    try:
+        raw = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(raw, list) or len(raw) != len(keys):
+            raise ValueError(cursor)
+        return [_parse(key, value) for key, value in zip(keys, raw, strict=True)]
+    except ValueError as exc:
+        raise ValidationException("Invalid pagination cursor") from exc
+
+
+def _parse(key: InstrumentedAttribute, value: str) -> Any:
+    if key.key == "id":
+        return uuid.UUID(value)
+    python_type = key.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    params: PageParams,
+    sort: InstrumentedAttribute,
+    descending: bool = False,
+) -> tuple[list, dict]:
+    """Run one page of ``query`` ordered by ``(sort, id)``; returns rows and ``meta``.
+
+    ``sort`` must be non-null; the model's ``id`` breaks ties so keyset
+    pages never skip or repeat rows.
+    """
+    keys = (sort, sort.class_.id)
+    page_query = query.order_by(*(key.desc() if descending else key.asc() for key in keys))
+    if params.cursor is not None:
+        after = tuple_(*keys)
+        # Bind with the column types, e.g. so SQLite compares GUID strings
+        values = decode_cursor(params.cursor, keys)
+        bound = tuple_(*(literal(v, key.type) for key, v in zip(keys, values, strict=True)))
+        page_query = page_query.where(after < bound if descending else after > bound)
+    else:
+        page_query = page_query.offset((params.page - 1) * params.per_page)
+
+    # One extra row tells us whether there is a next page without counting
+    rows = list(
+        (await db.execute(page_query.limit(params.per_page + 1))).scalars().unique().all()
+    )
+    next_cursor = None
+    if len(rows) > params.per_page:
+        rows = rows[: params.per_page]
+        next_cursor = encode_cursor([getattr(rows[-1], key.key) for key in keys])
+
+    return rows, {
+        "page": None if params.cursor is not None else params.page,
+        "per_page": params.per_page,
+        "total": await _count(db, query, params.count),
+        "next_cursor": next_cursor,
+    }
+
+
+class _Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a query, compiled with its bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, query: Select) -> None:
+        self.query = query
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler: SQLCompiler, **kw: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.query, **kw)
+
+
+async def _count(db: AsyncSession, query: Select, mode: CountMode) -> int | None:
+    if mode == CountMode.NONE:
+        return None
+    if mode == CountMode.ESTIMATE and settings.DB_ENGINE != "sqlite":
+        plan = (await db.execute(_Explain(query))).scalar_one()
+        if isinstance(plan, str):
+            plan = orjson.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    return (
+        await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))
+    ).scalar_one()
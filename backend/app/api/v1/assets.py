@@ -1,9 +1,11 @@
 import uuid
+from datetime import datetime
 
 from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import func, select
+from sqlalchemy import select
 
 from app.api.deps import CurrentUser, DbSession
+from app.api.pagination import Pagination, paginate
 from app.models.asset import Asset, System, Tag
 from app.schemas.asset import (
     AssetCreate,
@@ -16,6 +18,9 @@ from app.schemas.asset import (
     TagResponse,
     TagUpdate,
 )
+from app.services.asset_hierarchy import AssetHierarchyService
+from app.services.tag_registry import tag_registry
+from app.services.tag_search import TagSearchService
 
 router = APIRouter()
 
@@ -25,27 +30,19 @@ router = APIRouter()
 async def list_assets(
     db: DbSession,
     current_user: CurrentUser,
-    page: int = Query(1, ge=1),
-    per_page: int = Query(25, ge=1, le=100),
+    pagination: Pagination,
     asset_type: str | None = None,
 ) -> dict:
-    offset = (page - 1) * per_page
     query = select(Asset).where(Asset.deleted_at.is_(None))
-    count_query = select(func.count(Asset.id)).where(Asset.deleted_at.is_(None))
 
     if asset_type:
         query = query.where(Asset.asset_type == asset_type)
-        count_query = count_query.where(Asset.asset_type == asset_type)
 
-    total = (await db.execute(count_query)).scalar_one()
-    result = await db.execute(
-        query.order_by(Asset.name).offset(offset).limit(per_page)
-    )
-    assets = result.scalars().unique().all()
+    assets, meta = await paginate(db, query, pagination, Asset.name)
 
     return {
         "data": [AssetResponse.model_validate(a) for a in assets],
-        "meta": {"page": page, "per_page": per_page, "total": total},
+        "meta": meta,
         "errors": None,
     }
 
@@ -64,6 +61,7 @@ async def create_asset(body: AssetCreate, db: DbSession, current_user: CurrentUs
     asset = Asset(**body.model_dump())
     db.add(asset)
     await db.flush()
+    await AssetHierarchyService(db).place(asset)
     await db.refresh(asset)
     return {"data": AssetResponse.model_validate(asset), "meta": None, "errors": None}
 
@@ -81,6 +79,7 @@ async def update_asset(
         setattr(asset, field, value)
 
     await db.flush()
+    await AssetHierarchyService(db).place(asset)
     await db.refresh(asset)
     return {"data": AssetResponse.model_validate(asset), "meta": None, "errors": None}
 
@@ -101,6 +100,30 @@ async def delete_asset(
     return {"data": {"message": "Asset soft-deleted"}, "meta": None, "errors": None}
 
 
+@router.get("/{asset_id}/tags", response_model=dict)
+async def list_subtree_tags(
+    asset_id: uuid.UUID, db: DbSession, current_user: CurrentUser
+) -> dict:
+    tags = await AssetHierarchyService(db).subtree_tags(asset_id)
+    return {
+        "data": [TagResponse.model_validate(t) for t in tags],
+        "meta": {"total": len(tags)},
+        "errors": None,
+    }
+
+
+@router.get("/{asset_id}/rollup", response_model=dict)
+async def get_subtree_rollup(
+    asset_id: uuid.UUID,
+    db: DbSession,
+    current_user: CurrentUser,
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+) -> dict:
+    rollups = await AssetHierarchyService(db).subtree_rollup(asset_id, start, end)
+    return {"data": rollups, "meta": None, "errors": None}
+
+
 # --- Systems ---
 @router.get("/{asset_id}/systems", response_model=dict)
 async def list_systems(
@@ -122,6 +145,7 @@ async def create_system(body: SystemCreate, db: DbSession, current_user: Current
     system = System(**body.model_dump())
     db.add(system)
     await db.flush()
+    await AssetHierarchyService(db).place(system)
     await db.refresh(system)
     return {"data": SystemResponse.model_validate(system), "meta": None, "errors": None}
 
@@ -139,6 +163,7 @@ async def update_system(
         setattr(system, field, value)
 
     await db.flush()
+    await AssetHierarchyService(db).place(system)
     await db.refresh(system)
     return {"data": SystemResponse.model_validate(system), "meta": None, "errors": None}
 
@@ -151,12 +176,7 @@ async def search_tags(
     q: str = Query(..., min_length=1),
     limit: int = Query(20, ge=1, le=100),
 ) -> dict:
-    result = await db.execute(
-        select(Tag)
-        .where(Tag.name.ilike(f"%{q}%"), Tag.deleted_at.is_(None))
-        .limit(limit)
-    )
-    tags = result.scalars().all()
+    tags = await TagSearchService(db).search(q, limit)
     return {
         "data": [TagResponse.model_validate(t) for t in tags],
         "meta": None,
@@ -169,7 +189,9 @@ async def create_tag(body: TagCreate, db: DbSession, current_user: CurrentUser)
     tag = Tag(**body.model_dump())
     db.add(tag)
     await db.flush()
+    await AssetHierarchyService(db).place(tag)
     await db.refresh(tag)
+    tag_registry.invalidate_on_commit(db, tag.id)
     return {"data": TagResponse.model_validate(tag), "meta": None, "errors": None}
 
 
@@ -186,5 +208,7 @@ async def update_tag(
         setattr(tag, field, value)
 
     await db.flush()
+    await AssetHierarchyService(db).place(tag)
     await db.refresh(tag)
+    tag_registry.invalidate_on_commit(db, tag.id)
     return {"data": TagResponse.model_validate(tag), "meta": None, "errors": None}
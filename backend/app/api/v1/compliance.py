@@ -1,9 +1,17 @@
+import asyncio
 import uuid
-
-from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import func, select
-
-from app.api.deps import CurrentUser, DbSession
+from datetime import datetime, timezone
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.deps import CurrentUser, DbSession, SessionFactory
+from app.api.pagination import PageParams, Pagination, page_params, paginate
+from app.core.constants import ExportFormat, ReportFormat
+from app.database import on_commit
 from app.models.compliance import AuditLog, ComplianceReport, CustodyTransfer
 from app.schemas.compliance import (
     AuditLogResponse,
@@ -12,36 +20,56 @@ from app.schemas.compliance import (
     CustodyTransferCreate,
     CustodyTransferResponse,
 )
+from app.services.compliance_export import (
+    MEDIA_TYPES,
+    ComplianceExporter,
+    audit_log_export,
+    custody_transfer_export,
+)
+from app.services.report_artifacts import ReportArtifactStore
+from app.services.report_renderer import REPORT_MEDIA_TYPES
+from app.workers.report_tasks import render_report as render_report_task
 
 router = APIRouter()
 
+AuditPagination = Annotated[PageParams, Depends(page_params(default=50, maximum=200))]
+
+
+def _export_response(
+    session_factory: async_sessionmaker[AsyncSession],
+    query: Select,
+    export_format: ExportFormat,
+    name: str,
+    title: str,
+) -> StreamingResponse:
+    filename = f"{name}_{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.{export_format.value}"
+    return StreamingResponse(
+        ComplianceExporter(session_factory).stream(query, export_format, title),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 
 # --- Compliance Reports ---
 @router.get("/reports", response_model=dict)
 async def list_reports(
     db: DbSession,
     current_user: CurrentUser,
-    page: int = Query(1, ge=1),
-    per_page: int = Query(25, ge=1, le=100),
+    pagination: Pagination,
     report_type: str | None = None,
 ) -> dict:
-    offset = (page - 1) * per_page
     query = select(ComplianceReport)
-    count_query = select(func.count(ComplianceReport.id))
 
     if report_type:
         query = query.where(ComplianceReport.report_type == report_type)
-        count_query = count_query.where(ComplianceReport.report_type == report_type)
 
-    total = (await db.execute(count_query)).scalar_one()
-    result = await db.execute(
-        query.order_by(ComplianceReport.created_at.desc()).offset(offset).limit(per_page)
+    reports, meta = await paginate(
+        db, query, pagination, ComplianceReport.created_at, descending=True
     )
-    reports = result.scalars().all()
 
     return {
         "data": [ComplianceReportResponse.model_validate(r) for r in reports],
-        "meta": {"page": page, "per_page": per_page, "total": total},
+        "meta": meta,
         "errors": None,
     }
 
@@ -57,6 +85,9 @@ async def create_report(
     db.add(report)
     await db.flush()
     await db.refresh(report)
+    # Rendered by the reports worker once the DRAFT row is visible to it
+    report_id = str(report.id)
+    on_commit(db, lambda: asyncio.to_thread(render_report_task.delay, report_id))
     return {
         "data": ComplianceReportResponse.model_validate(report),
         "meta": None,
@@ -81,70 +112,106 @@ async def get_report(
     }
 
 
+@router.get("/reports/{report_id}/file")
+async def download_report(
+    report_id: uuid.UUID, db: DbSession, current_user: CurrentUser
+) -> FileResponse:
+    report = await db.get(ComplianceReport, report_id)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
+    artifacts = ReportArtifactStore()
+    if not artifacts.exists(report.file_url):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Report has not been rendered"
+        )
+    report_format = ReportFormat(report.file_format)
+    return FileResponse(
+        artifacts.path(report.file_url),
+        media_type=REPORT_MEDIA_TYPES[report_format],
+        filename=f"{report.title} v{report.version}.{report_format.value.lower()}",
+    )
+
+
 # --- Audit Logs ---
 @router.get("/audit", response_model=dict)
 async def list_audit_logs(
     db: DbSession,
     current_user: CurrentUser,
-    page: int = Query(1, ge=1),
-    per_page: int = Query(50, ge=1, le=200),
+    pagination: AuditPagination,
     resource_type: str | None = None,
     user_id: uuid.UUID | None = None,
 ) -> dict:
-    offset = (page - 1) * per_page
     query = select(AuditLog)
-    count_query = select(func.count(AuditLog.id))
 
     if resource_type:
         query = query.where(AuditLog.resource_type == resource_type)
-        count_query = count_query.where(AuditLog.resource_type == resource_type)
     if user_id:
         query = query.where(AuditLog.user_id == user_id)
-        count_query = count_query.where(AuditLog.user_id == user_id)
 
-    total = (await db.execute(count_query)).scalar_one()
-    result = await db.execute(
-        query.order_by(AuditLog.created_at.desc()).offset(offset).limit(per_page)
-    )
-    logs = result.scalars().all()
+    logs, meta = await paginate(db, query, pagination, AuditLog.created_at, descending=True)
 
     return {
         "data": [AuditLogResponse.model_validate(log) for log in logs],
-        "meta": {"page": page, "per_page": per_page, "total": total},
+        "meta": meta,
         "errors": None,
     }
 
 
+@router.get("/audit/export")
+async def export_audit_logs(
+    current_user: CurrentUser,
+    session_factory: SessionFactory,
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    resource_type: str | None = None,
+    user_id: uuid.UUID | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> StreamingResponse:
+    """Stream every matching audit log entry, oldest first, as CSV or XLSX."""
+    query = audit_log_export(resource_type=resource_type, user_id=user_id, start=start, end=end)
+    return _export_response(session_factory, query, export_format, "audit_logs", "Audit log")
+
+
 # --- Custody Transfers ---
 @router.get("/custody", response_model=dict)
 async def list_custody_transfers(
     db: DbSession,
     current_user: CurrentUser,
-    page: int = Query(1, ge=1),
-    per_page: int = Query(25, ge=1, le=100),
+    pagination: Pagination,
     batch_id: str | None = None,
 ) -> dict:
-    offset = (page - 1) * per_page
     query = select(CustodyTransfer)
-    count_query = select(func.count(CustodyTransfer.id))
 
     if batch_id:
         query = query.where(CustodyTransfer.batch_id == batch_id)
-        count_query = count_query.where(CustodyTransfer.batch_id == batch_id)
 
-    total = (await db.execute(count_query)).scalar_one()
-    result = await db.execute(
-        query.order_by(CustodyTransfer.transfer_time.desc()).offset(offset).limit(per_page)
+    transfers, meta = await paginate(
+        db, query, pagination, CustodyTransfer.transfer_time, descending=True
     )
-    transfers = result.scalars().all()
 
     return {
         "data": [CustodyTransferResponse.model_validate(t) for t in transfers],
-        "meta": {"page": page, "per_page": per_page, "total": total},
+        "meta": meta,
         "errors": None,
     }
 
 
+@router.get("/custody/export")
+async def export_custody_transfers(
+    current_user: CurrentUser,
+    session_factory: SessionFactory,
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    batch_id: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> StreamingResponse:
+    """Stream every matching custody transfer, by transfer time, as CSV or XLSX."""
+    query = custody_transfer_export(batch_id=batch_id, start=start, end=end)
+    return _export_response(
+        session_factory, query, export_format, "custody_transfers", "Custody transfers"
+    )
+
+
 @router.post("/custody", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_custody_transfer(
     body: CustodyTransferCreate, db: DbSession, current_user: CurrentUser
@@ -1,9 +1,10 @@
 import uuid
 
 from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import func, select
+from sqlalchemy import select
 
 from app.api.deps import CurrentUser, DbSession
+from app.api.pagination import Pagination, paginate
 from app.models.fleet import EPod, GeofenceZone, Trip, Vehicle
 from app.schemas.fleet import (
     EPodCreate,
@@ -26,27 +27,19 @@ router = APIRouter()
 async def list_vehicles(
     db: DbSession,
     current_user: CurrentUser,
-    page: int = Query(1, ge=1),
-    per_page: int = Query(25, ge=1, le=100),
+    pagination: Pagination,
     status_filter: str | None = Query(None, alias="status"),
 ) -> dict:
-    offset = (page - 1) * per_page
     query = select(Vehicle).where(Vehicle.deleted_at.is_(None))
-    count_query = select(func.count(Vehicle.id)).where(Vehicle.deleted_at.is_(None))
 
     if status_filter:
         query = query.where(Vehicle.status == status_filter)
-        count_query = count_query.where(Vehicle.status == status_filter)
 
-    total = (await db.execute(count_query)).scalar_one()
-    result = await db.execute(
-        query.order_by(Vehicle.registration_number).offset(offset).limit(per_page)
-    )
-    vehicles = result.scalars().unique().all()
+    vehicles, meta = await paginate(db, query, pagination, Vehicle.registration_number)
 
     return {
         "data": [VehicleResponse.model_validate(v) for v in vehicles],
-        "meta": {"page": page, "per_page": per_page, "total": total},
+        "meta": meta,
         "errors": None,
     }
 
@@ -94,31 +87,22 @@ async def update_vehicle(
 async def list_trips(
     db: DbSession,
     current_user: CurrentUser,
-    page: int = Query(1, ge=1),
-    per_page: int = Query(25, ge=1, le=100),
+    pagination: Pagination,
     status_filter: str | None = Query(None, alias="status"),
     vehicle_id: uuid.UUID | None = None,
 ) -> dict:
-    offset = (page - 1) * per_page
     query = select(Trip)
-    count_query = select(func.count(Trip.id))
 
     if status_filter:
         query = query.where(Trip.status == status_filter)
-        count_query = count_query.where(Trip.status == status_filter)
     if vehicle_id:
         query = query.where(Trip.vehicle_id == vehicle_id)
-        count_query = count_query.where(Trip.vehicle_id == vehicle_id)
 
-    total = (await db.execute(count_query)).scalar_one()
-    result = await db.execute(
-        query.order_by(Trip.created_at.desc()).offset(offset).limit(per_page)
-    )
-    trips = result.scalars().all()
+    trips, meta = await paginate(db, query, pagination, Trip.created_at, descending=True)
 
     return {
         "data": [TripResponse.model_validate(t) for t in trips],
-        "meta": {"page": page, "per_page": per_page, "total": total},
+        "meta": meta,
         "errors": None,
     }
 
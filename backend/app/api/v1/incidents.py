@@ -2,9 +2,10 @@ import uuid
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import func, select
+from sqlalchemy import select
 
 from app.api.deps import CurrentUser, DbSession
+from app.api.pagination import Pagination, paginate
 from app.core.constants import IncidentStatus
 from app.models.incident import EvidenceAttachment, Incident, SOPChecklist
 from app.schemas.incident import (
@@ -23,35 +24,27 @@ router = APIRouter()
 async def list_incidents(
     db: DbSession,
     current_user: CurrentUser,
-    page: int = Query(1, ge=1),
-    per_page: int = Query(25, ge=1, le=100),
+    pagination: Pagination,
     status_filter: str | None = Query(None, alias="status"),
     severity: str | None = None,
     asset_id: uuid.UUID | None = None,
 ) -> dict:
-    offset = (page - 1) * per_page
     query = select(Incident)
-    count_query = select(func.count(Incident.id))
 
     if status_filter:
         query = query.where(Incident.status == status_filter)
-        count_query = count_query.where(Incident.status == status_filter)
     if severity:
         query = query.where(Incident.severity == severity)
-        count_query = count_query.where(Incident.severity == severity)
     if asset_id:
         query = query.where(Incident.asset_id == asset_id)
-        count_query = count_query.where(Incident.asset_id == asset_id)
 
-    total = (await db.execute(count_query)).scalar_one()
-    result = await db.execute(
-        query.order_by(Incident.detected_at.desc()).offset(offset).limit(per_page)
+    incidents, meta = await paginate(
+        db, query, pagination, Incident.detected_at, descending=True
     )
-    incidents = result.scalars().unique().all()
 
     return {
         "data": [IncidentResponse.model_validate(i) for i in incidents],
-        "meta": {"page": page, "per_page": per_page, "total": total},
+        "meta": meta,
         "errors": None,
     }
 
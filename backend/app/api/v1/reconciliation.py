@@ -1,16 +1,22 @@
 import uuid
 
 from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import func, select
+from sqlalchemy import select
 
-from app.api.deps import CurrentUser, DbSession
+from app.api.deps import CurrentUser, DbSession, SessionFactory
+from app.api.pagination import Pagination, paginate
+from app.core.exceptions import ValidationException
 from app.models.reconciliation import ReconciliationRun, VarianceRecord
 from app.schemas.reconciliation import (
     ReconciliationRunResponse,
     ReconciliationTriggerRequest,
+    ToleranceWhatIfResult,
     VarianceRecordResponse,
 )
 from app.services.reconciliation_service import ReconciliationService
+from app.utils.tolerance import ToleranceEngine
+
+MAX_WHAT_IF_THRESHOLDS = 20
 
 router = APIRouter()
 
@@ -19,27 +25,24 @@ router = APIRouter()
 async def list_reconciliation_runs(
     db: DbSession,
     current_user: CurrentUser,
-    page: int = Query(1, ge=1),
-    per_page: int = Query(25, ge=1, le=100),
+    pagination: Pagination,
     status_filter: str | None = Query(None, alias="status"),
+    parent_run_id: uuid.UUID | None = Query(None),
 ) -> dict:
-    offset = (page - 1) * per_page
     query = select(ReconciliationRun)
-    count_query = select(func.count(ReconciliationRun.id))
 
     if status_filter:
         query = query.where(ReconciliationRun.status == status_filter)
-        count_query = count_query.where(ReconciliationRun.status == status_filter)
+    if parent_run_id:
+        query = query.where(ReconciliationRun.parent_run_id == parent_run_id)
 
-    total = (await db.execute(count_query)).scalar_one()
-    result = await db.execute(
-        query.order_by(ReconciliationRun.created_at.desc()).offset(offset).limit(per_page)
+    runs, meta = await paginate(
+        db, query, pagination, ReconciliationRun.created_at, descending=True
     )
-    runs = result.scalars().unique().all()
 
     return {
         "data": [ReconciliationRunResponse.model_validate(r) for r in runs],
-        "meta": {"page": page, "per_page": per_page, "total": total},
+        "meta": meta,
         "errors": None,
     }
 
@@ -61,9 +64,12 @@ async def get_reconciliation_run(
 
 @router.post("/trigger", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def trigger_reconciliation(
-    body: ReconciliationTriggerRequest, db: DbSession, current_user: CurrentUser
+    body: ReconciliationTriggerRequest,
+    db: DbSession,
+    session_factory: SessionFactory,
+    current_user: CurrentUser,
 ) -> dict:
-    service = ReconciliationService(db)
+    service = ReconciliationService(db, session_factory=session_factory)
     run = await service.trigger_reconciliation(
         name=body.name,
         period_start=body.period_start,
@@ -71,8 +77,53 @@ async def trigger_reconciliation(
         asset_id=body.asset_id,
         tolerance_threshold_pct=body.tolerance_threshold_pct,
         triggered_by_id=current_user.id,
+        incremental=body.incremental,
     )
-    return {"data": ReconciliationRunResponse.model_validate(run), "meta": None, "errors": None}
+    return {
+        "data": ReconciliationRunResponse.model_validate(run),
+        "meta": {"node_timings_s": service.node_timings},
+        "errors": None,
+    }
+
+
+@router.post("/{run_id}/refresh", response_model=dict)
+async def refresh_reconciliation_run(
+    run_id: uuid.UUID,
+    db: DbSession,
+    session_factory: SessionFactory,
+    current_user: CurrentUser,
+) -> dict:
+    service = ReconciliationService(db, session_factory=session_factory)
+    run = await service.refresh_reconciliation(run_id)
+    return {
+        "data": ReconciliationRunResponse.model_validate(run),
+        "meta": {"node_timings_s": service.node_timings},
+        "errors": None,
+    }
+
+
+@router.get("/{run_id}/what-if", response_model=dict)
+async def tolerance_what_if(
+    run_id: uuid.UUID,
+    db: DbSession,
+    current_user: CurrentUser,
+    thresholds: list[float] = Query(
+        [ToleranceEngine.TARGET_TOLERANCE_PCT, ToleranceEngine.DEFAULT_TOLERANCE_PCT],
+        alias="threshold",
+    ),
+) -> dict:
+    """Exception counts and volumes per node at candidate tolerances, from stored variances."""
+    if not 0 < len(thresholds) <= MAX_WHAT_IF_THRESHOLDS:
+        raise ValidationException(f"Give 1 to {MAX_WHAT_IF_THRESHOLDS} thresholds")
+    if any(threshold < 0 for threshold in thresholds):
+        raise ValidationException("Thresholds must not be negative")
+
+    results = await ReconciliationService(db).tolerance_what_if(run_id, thresholds)
+    return {
+        "data": [ToleranceWhatIfResult.model_validate(r) for r in results],
+        "meta": None,
+        "errors": None,
+    }
 
 
 @router.get("/{run_id}/variances", response_model=dict)
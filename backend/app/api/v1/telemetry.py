@@ -1,9 +1,16 @@
 import uuid
 from datetime import datetime
+from typing import Literal
 
-from fastapi import APIRouter, Query
+import orjson
+from fastapi import APIRouter, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 
 from app.api.deps import CurrentUser, DbSession
+from app.core.constants import ConflictPolicy
+from app.services.tag_registry import tag_registry
+from app.services.telemetry_cache import last_value_cache
 from app.services.telemetry_service import TelemetryService
 from app.schemas.telemetry import (
     TelemetryIngestRequest,
@@ -13,29 +20,87 @@ from app.schemas.telemetry import (
 
 router = APIRouter()
 
+COLUMNS_MEDIA_TYPE = "application/vnd.flowsquare.columns+json"
+
 
 @router.post("/ingest", response_model=dict)
 async def ingest_telemetry(
     body: TelemetryIngestRequest, db: DbSession, current_user: CurrentUser
 ) -> dict:
     service = TelemetryService(db)
-    result = await service.ingest(body.readings)
+    result = await service.ingest(body.readings, body.on_conflict)
     return {"data": result, "meta": None, "errors": None}
 
 
-@router.get("/query", response_model=dict)
+@router.post("/ingest/stream", response_model=dict)
+async def ingest_telemetry_stream(
+    request: Request,
+    db: DbSession,
+    current_user: CurrentUser,
+    on_conflict: ConflictPolicy = ConflictPolicy.ERROR,
+) -> dict:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    service = TelemetryService(db)
+    result = await service.ingest_stream(request.stream(), content_type, on_conflict)
+    return {"data": result, "meta": None, "errors": None}
+
+
+@router.get("/query")
 async def query_telemetry(
+    request: Request,
     db: DbSession,
     current_user: CurrentUser,
     tag_ids: str = Query(..., description="Comma-separated tag UUIDs"),
     start: datetime = Query(...),
     end: datetime = Query(...),
     downsample: str | None = None,
-) -> dict:
+    layout: Literal["rows", "columns"] | None = Query(
+        None, description="'columns' returns parallel time/value/quality arrays per tag"
+    ),
+) -> Response:
     parsed_tag_ids = [uuid.UUID(tid.strip()) for tid in tag_ids.split(",")]
     service = TelemetryService(db)
+
+    if layout == "columns" or (
+        layout is None and COLUMNS_MEDIA_TYPE in request.headers.get("accept", "")
+    ):
+        columns = await service.query_columns(parsed_tag_ids, start, end, downsample)
+        # Bypass jsonable_encoder; orjson serialises the NumPy arrays natively
+        return Response(
+            orjson.dumps(
+                {"data": columns, "meta": {"layout": "columns"}, "errors": None},
+                option=orjson.OPT_SERIALIZE_NUMPY,
+            ),
+            media_type=COLUMNS_MEDIA_TYPE,
+        )
+
     results = await service.query(parsed_tag_ids, start, end, downsample)
-    return {"data": results, "meta": None, "errors": None}
+    return JSONResponse(jsonable_encoder({"data": results, "meta": None, "errors": None}))
+
+
+@router.get("/latest", response_model=dict)
+async def get_latest_readings(
+    db: DbSession,
+    current_user: CurrentUser,
+    tag_ids: str = Query(..., description="Comma-separated tag UUIDs"),
+) -> dict:
+    parsed_tag_ids = [uuid.UUID(tid.strip()) for tid in tag_ids.split(",")]
+    service = TelemetryService(db)
+    latest = await service.get_latest_many(parsed_tag_ids)
+    return {
+        "data": [latest[tag_id] for tag_id in parsed_tag_ids if latest[tag_id] is not None],
+        "meta": {"missing": [tag_id for tag_id in parsed_tag_ids if latest[tag_id] is None]},
+        "errors": None,
+    }
+
+
+@router.get("/cache/stats", response_model=dict)
+async def get_cache_stats(current_user: CurrentUser) -> dict:
+    return {
+        "data": {"latest": last_value_cache.stats(), "tags": tag_registry.stats()},
+        "meta": None,
+        "errors": None,
+    }
 
 
 @router.get("/latest/{tag_id}", response_model=dict)
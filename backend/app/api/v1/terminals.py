@@ -1,20 +1,37 @@
 import uuid
+from datetime import datetime, timezone
 
-from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import func, select
+from fastapi import APIRouter, HTTPException, status
+from sqlalchemy import delete, insert, select, update
 
 from app.api.deps import CurrentUser, DbSession
-from app.models.terminal import GantryBay, LoadingRack, Tank, Terminal
+from app.api.pagination import Pagination, paginate
+from app.core.exceptions import ValidationException
+from app.models.terminal import (
+    GantryBay,
+    LoadingRack,
+    StrappingTablePoint,
+    Tank,
+    TankDip,
+    TankReceipt,
+    Terminal,
+)
 from app.schemas.terminal import (
     GantryBayResponse,
     LoadingRackResponse,
+    StrappingTableUpdate,
     TankCreate,
+    TankDipCreate,
+    TankDipResponse,
+    TankReceiptCreate,
+    TankReceiptResponse,
     TankResponse,
     TankUpdate,
     TerminalCreate,
     TerminalResponse,
     TerminalUpdate,
 )
+from app.services.strapping import strapping_tables
 
 router = APIRouter()
 
@@ -23,28 +40,15 @@ router = APIRouter()
 async def list_terminals(
     db: DbSession,
     current_user: CurrentUser,
-    page: int = Query(1, ge=1),
-    per_page: int = Query(25, ge=1, le=100),
+    pagination: Pagination,
 ) -> dict:
-    offset = (page - 1) * per_page
-    total = (
-        await db.execute(
-            select(func.count(Terminal.id)).where(Terminal.deleted_at.is_(None))
-        )
-    ).scalar_one()
-
-    result = await db.execute(
-        select(Terminal)
-        .where(Terminal.deleted_at.is_(None))
-        .order_by(Terminal.name)
-        .offset(offset)
-        .limit(per_page)
+    terminals, meta = await paginate(
+        db, select(Terminal).where(Terminal.deleted_at.is_(None)), pagination, Terminal.name
     )
-    terminals = result.scalars().unique().all()
 
     return {
         "data": [TerminalResponse.model_validate(t) for t in terminals],
-        "meta": {"page": page, "per_page": per_page, "total": total},
+        "meta": meta,
         "errors": None,
     }
 
@@ -128,6 +132,81 @@ async def update_tank(
     return {"data": TankResponse.model_validate(tank), "meta": None, "errors": None}
 
 
+async def _get_tank(db: DbSession, tank_id: uuid.UUID) -> Tank:
+    result = await db.execute(
+        select(Tank).where(Tank.id == tank_id, Tank.deleted_at.is_(None))
+    )
+    tank = result.scalar_one_or_none()
+    if tank is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tank not found")
+    return tank
+
+
+@router.post(
+    "/tanks/{tank_id}/dips", response_model=dict, status_code=status.HTTP_201_CREATED
+)
+async def create_tank_dips(
+    tank_id: uuid.UUID, body: list[TankDipCreate], db: DbSession, current_user: CurrentUser
+) -> dict:
+    await _get_tank(db, tank_id)
+    dips = [TankDip(tank_id=tank_id, **dip.model_dump()) for dip in body]
+    db.add_all(dips)
+    await db.flush()
+    return {
+        "data": [TankDipResponse.model_validate(d) for d in dips],
+        "meta": {"total": len(dips)},
+        "errors": None,
+    }
+
+
+@router.post(
+    "/tanks/{tank_id}/receipts", response_model=dict, status_code=status.HTTP_201_CREATED
+)
+async def create_tank_receipt(
+    tank_id: uuid.UUID, body: TankReceiptCreate, db: DbSession, current_user: CurrentUser
+) -> dict:
+    await _get_tank(db, tank_id)
+    if body.ended_at < body.started_at:
+        raise ValidationException("ended_at must not be before started_at")
+    receipt = TankReceipt(tank_id=tank_id, **body.model_dump())
+    db.add(receipt)
+    await db.flush()
+    await db.refresh(receipt)
+    return {"data": TankReceiptResponse.model_validate(receipt), "meta": None, "errors": None}
+
+
+# --- Strapping Tables ---
+@router.put("/strapping-tables/{table_ref}", response_model=dict)
+async def replace_strapping_table(
+    table_ref: str, body: StrappingTableUpdate, db: DbSession, current_user: CurrentUser
+) -> dict:
+    points = sorted(body.points, key=lambda p: p.level_mm)
+    for lower, upper in zip(points, points[1:], strict=False):
+        if upper.level_mm == lower.level_mm:
+            raise ValidationException(f"Duplicate level {upper.level_mm} mm")
+        if upper.volume_m3 < lower.volume_m3:
+            raise ValidationException("Volume must not decrease as level rises")
+
+    await db.execute(delete(StrappingTablePoint).where(StrappingTablePoint.table_ref == table_ref))
+    await db.execute(
+        insert(StrappingTablePoint),
+        [{"table_ref": table_ref, **p.model_dump()} for p in points],
+    )
+    # Tanks on this table now strap to new volumes; incremental reconciliation
+    # finds their receipts through Tank.updated_at
+    await db.execute(
+        update(Tank)
+        .where(Tank.strapping_table_ref == table_ref)
+        .values(updated_at=datetime.now(timezone.utc))
+    )
+    strapping_tables.invalidate_on_commit(db, table_ref)
+    return {
+        "data": {"table_ref": table_ref, "points": [p.model_dump() for p in points]},
+        "meta": {"total": len(points)},
+        "errors": None,
+    }
+
+
 # --- Loading Racks ---
 @router.get("/{terminal_id}/racks", response_model=dict)
 async def list_loading_racks(
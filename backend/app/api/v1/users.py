@@ -1,10 +1,11 @@
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import AdminUser, CurrentUser, DbSession
+from app.api.pagination import Pagination, paginate
 from app.core.security import hash_password
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, UserUpdate
@@ -16,25 +17,19 @@ router = APIRouter()
 async def list_users(
     db: DbSession,
     current_user: AdminUser,
-    page: int = Query(1, ge=1),
-    per_page: int = Query(25, ge=1, le=100),
+    pagination: Pagination,
 ) -> dict:
-    offset = (page - 1) * per_page
-    count_result = await db.execute(select(func.count(User.id)).where(User.deleted_at.is_(None)))
-    total = count_result.scalar_one()
-
-    result = await db.execute(
-        select(User)
-        .where(User.deleted_at.is_(None))
-        .order_by(User.created_at.desc())
-        .offset(offset)
-        .limit(per_page)
+    users, meta = await paginate(
+        db,
+        select(User).where(User.deleted_at.is_(None)),
+        pagination,
+        User.created_at,
+        descending=True,
     )
-    users = result.scalars().all()
 
     return {
         "data": [UserResponse.model_validate(u) for u in users],
-        "meta": {"page": page, "per_page": per_page, "total": total},
+        "meta": meta,
         "errors": None,
     }
 
@@ -1,9 +1,10 @@
 import uuid
 
 from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import func, select
+from sqlalchemy import select
 
 from app.api.deps import CurrentUser, DbSession
+from app.api.pagination import Pagination, paginate
 from app.models.vessel import BerthSchedule, DemurrageRecord, Vessel
 from app.schemas.vessel import (
     BerthScheduleCreate,
@@ -22,25 +23,19 @@ router = APIRouter()
 async def list_vessels(
     db: DbSession,
     current_user: CurrentUser,
-    page: int = Query(1, ge=1),
-    per_page: int = Query(25, ge=1, le=100),
+    pagination: Pagination,
     status_filter: str | None = Query(None, alias="status"),
 ) -> dict:
-    offset = (page - 1) * per_page
     query = select(Vessel).where(Vessel.deleted_at.is_(None))
-    count_query = select(func.count(Vessel.id)).where(Vessel.deleted_at.is_(None))
 
     if status_filter:
         query = query.where(Vessel.status == status_filter)
-        count_query = count_query.where(Vessel.status == status_filter)
 
-    total = (await db.execute(count_query)).scalar_one()
-    result = await db.execute(query.order_by(Vessel.created_at.desc()).offset(offset).limit(per_page))
-    vessels = result.scalars().unique().all()
+    vessels, meta = await paginate(db, query, pagination, Vessel.created_at, descending=True)
 
     return {
         "data": [VesselResponse.model_validate(v) for v in vessels],
-        "meta": {"page": page, "per_page": per_page, "total": total},
+        "meta": meta,
         "errors": None,
     }
 
@@ -28,6 +28,10 @@ class Settings(BaseSettings):
     # Set to "sqlite" to use local SQLite file instead of PostgreSQL
     DB_ENGINE: str = "postgresql"
 
+    # Telemetry rollup tiers are TimescaleDB continuous aggregates on
+    # PostgreSQL; set False to have Celery maintain plain rollup tables
+    TIMESCALE_ENABLED: bool = True
+
     @property
     def DATABASE_URL(self) -> str:
         if self.DB_ENGINE == "sqlite":
@@ -56,6 +60,26 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/2"
 
+    # Telemetry last-value cache; bounds staleness against other workers' ingest
+    TELEMETRY_LATEST_CACHE_TTL_SECONDS: float = 5.0
+
+    # Tag metadata registry; bounds staleness of tag edits made by other workers
+    TAG_REGISTRY_TTL_SECONDS: float = 300.0
+
+    # Tank strapping tables; bounds staleness of re-calibrations made by other workers
+    STRAPPING_TABLE_TTL_SECONDS: float = 300.0
+
+    # Fleet-wide noisy-sensor sweep: look-back window and crontab minute field
+    NOISY_SENSOR_WINDOW_MINUTES: int = 60
+    NOISY_SENSOR_SWEEP_MINUTE: str = "*/15"
+
+    # Incremental reconciliation re-reads rows updated this long before a node's
+    # watermark, covering transactions that committed after the previous pass
+    RECONCILIATION_WATERMARK_OVERLAP_SECONDS: int = 300
+
+    # Rendered compliance report files; must be shared by API and workers
+    REPORT_STORAGE_DIR: Path = Path(__file__).resolve().parent.parent / "reports"
+
     # JWT
     JWT_SECRET_KEY: str = "change-me-jwt-secret"
     JWT_ALGORITHM: str = "HS256"
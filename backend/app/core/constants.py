@@ -57,6 +57,7 @@ class ReconciliationStatus(str, enum.Enum):
     AUTO_CLOSED = "AUTO_CLOSED"
     EXCEPTION = "EXCEPTION"
     MANUALLY_CLOSED = "MANUALLY_CLOSED"
+    FAILED = "FAILED"
 
 
 class ReconciliationNode(str, enum.Enum):
@@ -66,6 +67,13 @@ class ReconciliationNode(str, enum.Enum):
     DELIVERY_EPOD = "DELIVERY_EPOD"
 
 
+class ReconciliationRunType(str, enum.Enum):
+    MANUAL = "MANUAL"
+    # Fanned out per asset: the parent holds totals, partitions hold the records
+    PARTITIONED = "PARTITIONED"
+    PARTITION = "PARTITION"
+
+
 class TripStatus(str, enum.Enum):
     SCHEDULED = "SCHEDULED"
     EN_ROUTE = "EN_ROUTE"
@@ -100,9 +108,31 @@ class TelemetrySource(str, enum.Enum):
     IOT = "iot"
 
 
+class ConflictPolicy(str, enum.Enum):
+    ERROR = "ERROR"
+    DO_NOTHING = "DO_NOTHING"
+    DO_UPDATE = "DO_UPDATE"
+
+
 class ComplianceReportType(str, enum.Enum):
     BPS_QUANTITY = "BPS_QUANTITY"
     WMA_REPORT = "WMA_REPORT"
     CUSTODY_TRAIL = "CUSTODY_TRAIL"
     MONTHLY_COMPLIANCE = "MONTHLY_COMPLIANCE"
     AUDIT_PACK = "AUDIT_PACK"
+
+
+class CountMode(str, enum.Enum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    XLSX = "xlsx"
+
+
+class ReportFormat(str, enum.Enum):
+    PDF = "PDF"
+    XLSX = "XLSX"
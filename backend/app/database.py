@@ -1,8 +1,15 @@
-from collections.abc import AsyncGenerator
+import asyncio
+import inspect
+from collections.abc import AsyncGenerator, Awaitable, Callable
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
 
 _engine_kwargs: dict = {
     "echo": settings.DEBUG,
@@ -35,3 +42,73 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Factory for work that outlives the request's session, e.g. streamed bodies."""
+    return async_session_factory
+
+
+_COMMIT_HOOKS = "commit_hooks"
+_ROLLBACK_HOOKS = "rollback_hooks"
+
+# Strong references to hook coroutines still running after their commit
+_pending_hooks: set[asyncio.Task] = set()
+
+
+def on_commit(session: AsyncSession, callback: Callable[[], Awaitable[None] | None]) -> None:
+    """Run ``callback`` once the session's current transaction commits.
+
+    Hooks are dropped if the transaction rolls back instead. ``callback``
+    runs synchronously inside the commit; if it returns an awaitable, that
+    is scheduled on the running loop (see ``drain_commit_hooks``).
+    """
+    session.info.setdefault(_COMMIT_HOOKS, []).append(callback)
+
+
+def on_rollback(session: AsyncSession, callback: Callable[[], Awaitable[None] | None]) -> None:
+    """Run ``callback`` if the session's current transaction rolls back instead.
+
+    The counterpart of ``on_commit``, for undoing work committed elsewhere on
+    the transaction's behalf. Savepoint rollbacks don't count.
+    """
+    session.info.setdefault(_ROLLBACK_HOOKS, []).append(callback)
+
+
+async def drain_commit_hooks() -> None:
+    """Wait for scheduled commit/rollback hooks, for callers whose loop stops after the task."""
+    while _pending_hooks:
+        await asyncio.gather(*_pending_hooks, return_exceptions=True)
+
+
+def _log_hook_failure(task: asyncio.Task) -> None:
+    _pending_hooks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("commit_hook_failed", exc_info=task.exception())
+
+
+def _run_hooks(callbacks: list[Callable[[], Awaitable[None] | None]]) -> None:
+    for callback in callbacks:
+        try:
+            result = callback()
+        except Exception:  # the transaction has already ended
+            logger.error("commit_hook_failed", exc_info=True)
+            continue
+        if inspect.isawaitable(result):
+            task = asyncio.ensure_future(result)
+            _pending_hooks.add(task)
+            task.add_done_callback(_log_hook_failure)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_hooks(session: Session) -> None:
+    session.info.pop(_ROLLBACK_HOOKS, None)
+    _run_hooks(session.info.pop(_COMMIT_HOOKS, []))
+
+
+@event.listens_for(Session, "after_rollback")
+def _run_rollback_hooks(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    session.info.pop(_COMMIT_HOOKS, None)
+    _run_hooks(session.info.pop(_ROLLBACK_HOOKS, []))
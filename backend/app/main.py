@@ -29,11 +29,11 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Auto-create tables when using SQLite (dev convenience)
     if settings.DB_ENGINE == "sqlite":
         from app.database import engine
-        from app.models.base import Base
+        from app.models.base import Base, schema_tables
         import app.models  # noqa: F401 — ensure all models are imported
 
         async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(Base.metadata.create_all, tables=schema_tables())
 
     yield
 
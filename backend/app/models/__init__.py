@@ -1,23 +1,39 @@
 from app.models.base import Base
 from app.models.user import User
-from app.models.asset import Asset, System, Tag
-from app.models.telemetry import TelemetryReading
+from app.models.asset import Asset, AssetClosure, System, Tag
+from app.models.telemetry import (
+    TelemetryReading,
+    TelemetryRollup1d,
+    TelemetryRollup1h,
+    TelemetryRollup1m,
+    TelemetryRollupState,
+)
 from app.models.vessel import Vessel, BerthSchedule, DemurrageRecord
-from app.models.terminal import Terminal, Tank, LoadingRack, GantryBay
+from app.models.terminal import (
+    Terminal,
+    Tank,
+    LoadingRack,
+    GantryBay,
+    StrappingTablePoint,
+    TankDip,
+    TankReceipt,
+)
 from app.models.fleet import Vehicle, Trip, EPod, GeofenceZone
 from app.models.incident import Incident, SOPChecklist, EvidenceAttachment
-from app.models.reconciliation import ReconciliationRun, VarianceRecord
+from app.models.reconciliation import ReconciliationRun, ReconciliationWatermark, VarianceRecord
 from app.models.compliance import ComplianceReport, AuditLog, CustodyTransfer
 
 __all__ = [
     "Base",
     "User",
-    "Asset", "System", "Tag",
-    "TelemetryReading",
+    "Asset", "System", "Tag", "AssetClosure",
+    "TelemetryReading", "TelemetryRollup1m", "TelemetryRollup1h", "TelemetryRollup1d",
+    "TelemetryRollupState",
     "Vessel", "BerthSchedule", "DemurrageRecord",
     "Terminal", "Tank", "LoadingRack", "GantryBay",
+    "StrappingTablePoint", "TankDip", "TankReceipt",
     "Vehicle", "Trip", "EPod", "GeofenceZone",
     "Incident", "SOPChecklist", "EvidenceAttachment",
-    "ReconciliationRun", "VarianceRecord",
+    "ReconciliationRun", "ReconciliationWatermark", "VarianceRecord",
     "ComplianceReport", "AuditLog", "CustodyTransfer",
 ]
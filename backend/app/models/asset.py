@@ -1,13 +1,19 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, String, Text
+from sqlalchemy import DDL, DateTime, Float, ForeignKey, Index, Integer, String, Text, event, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.constants import AssetType, QualityFlag, SystemType
 from app.models.base import Base, SoftDeleteMixin, TimestampMixin, UUIDMixin, UUIDType
 
 
+def _path_gist_index(table: str) -> Index:
+    return Index(
+        f"ix_{table}_path_gist", text("(path::ltree)"), postgresql_using="gist"
+    ).ddl_if(dialect="postgresql")
+
+
 class Asset(UUIDMixin, TimestampMixin, SoftDeleteMixin, Base):
     __tablename__ = "assets"
 
@@ -21,6 +27,8 @@ class Asset(UUIDMixin, TimestampMixin, SoftDeleteMixin, Base):
 
     systems: Mapped[list["System"]] = relationship(back_populates="asset", lazy="selectin")
 
+    __table_args__ = (_path_gist_index("assets"),)
+
 
 class System(UUIDMixin, TimestampMixin, SoftDeleteMixin, Base):
     __tablename__ = "systems"
@@ -36,6 +44,8 @@ class System(UUIDMixin, TimestampMixin, SoftDeleteMixin, Base):
     asset: Mapped[Asset] = relationship(back_populates="systems")
     tags: Mapped[list["Tag"]] = relationship(back_populates="system", lazy="selectin")
 
+    __table_args__ = (_path_gist_index("systems"),)
+
 
 class Tag(UUIDMixin, TimestampMixin, SoftDeleteMixin, Base):
     __tablename__ = "tags"
@@ -57,3 +67,42 @@ class Tag(UUIDMixin, TimestampMixin, SoftDeleteMixin, Base):
     path: Mapped[str | None] = mapped_column(String(1000), nullable=True)
 
     system: Mapped[System] = relationship(back_populates="tags")
+
+    __table_args__ = (
+        # Backs substring tag search on PostgreSQL; SQLite uses an in-memory index
+        Index(
+            "ix_tags_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        _path_gist_index("tags"),
+    )
+
+
+class AssetClosure(Base):
+    """Ancestor/descendant pairs (including self) of the asset hierarchy.
+
+    Maintained on SQLite only, which has no ltree; PostgreSQL answers subtree
+    queries from the ``path`` columns.
+    """
+
+    __tablename__ = "asset_closure"
+
+    ancestor_id: Mapped[uuid.UUID] = mapped_column(UUIDType, primary_key=True)
+    descendant_id: Mapped[uuid.UUID] = mapped_column(UUIDType, primary_key=True, index=True)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+    kind: Mapped[str] = mapped_column(String(10), nullable=False)  # descendant's node kind
+
+
+event.listen(
+    Asset.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS ltree").execute_if(dialect="postgresql"),
+)
+event.listen(
+    Tag.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
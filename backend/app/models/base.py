@@ -1,7 +1,8 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, JSON, String, TypeDecorator, func
+from sqlalchemy import ColumnElement, DateTime, JSON, String, TypeDecorator, func, literal_column
+from sqlalchemy.types import UserDefinedType
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 from app.config import settings
@@ -31,6 +32,15 @@ class GUID(TypeDecorator):
         return value
 
 
+class Ltree(UserDefinedType):
+    """PostgreSQL ``ltree``, for casting materialised path columns in queries."""
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw) -> str:
+        return "LTREE"
+
+
 # Portable types
 if settings.DB_ENGINE == "sqlite":
     UUIDType = GUID()
@@ -42,10 +52,37 @@ else:
     PortableJSON = JSONB
 
 
+def sql_uuid4() -> ColumnElement:
+    """A fresh random UUID per row, for ``id`` columns of ``INSERT ... SELECT``."""
+    if settings.DB_ENGINE == "sqlite":
+        # Same hyphenated v4 text that GUID stores
+        return literal_column(
+            "lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-4' || "
+            "substr(hex(randomblob(2)), 2) || '-' || substr('89ab', 1 + abs(random()) % 4, 1) || "
+            "substr(hex(randomblob(2)), 2) || '-' || hex(randomblob(6)))"
+        )
+    return func.gen_random_uuid()
+
+
 class Base(DeclarativeBase):
     pass
 
 
+def is_view(table) -> bool:
+    """Whether ``table`` is a view managed outside ``Base.metadata``.
+
+    Set with ``info={"is_view": ...}``; a callable is evaluated against the
+    current settings.
+    """
+    flag = table.info.get("is_view", False)
+    return bool(flag() if callable(flag) else flag)
+
+
+def schema_tables() -> list:
+    """Tables ``create_all`` should create, i.e. everything except views."""
+    return [table for table in Base.metadata.sorted_tables if not is_view(table)]
+
+
 class UUIDMixin:
     id: Mapped[uuid.UUID] = mapped_column(
         GUID() if settings.DB_ENGINE == "sqlite" else UUIDType,
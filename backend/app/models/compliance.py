@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.constants import ComplianceReportType
@@ -40,6 +40,9 @@ class AuditLog(UUIDMixin, TimestampMixin, Base):
     new_values: Mapped[dict | None] = mapped_column(PortableJSON, nullable=True)
     details: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    # Keyset pagination order (see app.api.pagination)
+    __table_args__ = (Index("ix_audit_logs_created_at_id", "created_at", "id"),)
+
 
 class CustodyTransfer(UUIDMixin, TimestampMixin, Base):
     __tablename__ = "custody_transfers"
@@ -59,3 +62,5 @@ class CustodyTransfer(UUIDMixin, TimestampMixin, Base):
     measurement_method: Mapped[str | None] = mapped_column(String(100), nullable=True)
     witness_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
     document_ref: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    __table_args__ = (Index("ix_custody_transfers_transfer_time_id", "transfer_time", "id"),)
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, String, Text
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.constants import TripStatus
@@ -61,6 +61,9 @@ class Trip(UUIDMixin, TimestampMixin, Base):
     vehicle: Mapped[Vehicle] = relationship(back_populates="trips")
     epod: Mapped["EPod | None"] = relationship(back_populates="trip", uselist=False)
 
+    # Change scans for incremental reconciliation
+    __table_args__ = (Index("ix_trips_updated_at", "updated_at"),)
+
 
 class EPod(UUIDMixin, TimestampMixin, Base):
     __tablename__ = "epods"
@@ -80,6 +83,9 @@ class EPod(UUIDMixin, TimestampMixin, Base):
 
     trip: Mapped[Trip] = relationship(back_populates="epod")
 
+    # Change scans for incremental reconciliation
+    __table_args__ = (Index("ix_epods_updated_at", "updated_at"),)
+
 
 class GeofenceZone(UUIDMixin, TimestampMixin, Base):
     __tablename__ = "geofence_zones"
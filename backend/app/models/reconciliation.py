@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, String, Text
+from sqlalchemy import DateTime, Float, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.constants import ReconciliationNode, ReconciliationStatus
@@ -24,6 +24,10 @@ class ReconciliationRun(UUIDMixin, TimestampMixin, Base):
     triggered_by_id: Mapped[uuid.UUID | None] = mapped_column(
         UUIDType, ForeignKey("users.id"), nullable=True
     )
+    # Set on the per-asset partitions of a PARTITIONED run
+    parent_run_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUIDType, ForeignKey("reconciliation_runs.id"), nullable=True, index=True
+    )
     total_expected_m3: Mapped[float | None] = mapped_column(Float, nullable=True)
     total_actual_m3: Mapped[float | None] = mapped_column(Float, nullable=True)
     total_variance_pct: Mapped[float | None] = mapped_column(Float, nullable=True)
@@ -60,3 +64,26 @@ class VarianceRecord(UUIDMixin, TimestampMixin, Base):
     reconciliation_run: Mapped[ReconciliationRun] = relationship(
         back_populates="variance_records"
     )
+
+    # Keyed lookup of a run's records by source reference (fraud checks, re-runs)
+    __table_args__ = (
+        Index(
+            "ix_variance_records_run_reference", "reconciliation_run_id", "reference_id", "node"
+        ),
+    )
+
+
+class ReconciliationWatermark(Base):
+    """Per-node change watermark of a reconciliation run.
+
+    Source rows of ``node`` updated before ``watermark`` are already
+    reflected in the run's variance records.
+    """
+
+    __tablename__ = "reconciliation_watermarks"
+
+    reconciliation_run_id: Mapped[uuid.UUID] = mapped_column(
+        UUIDType, ForeignKey("reconciliation_runs.id"), primary_key=True
+    )
+    node: Mapped[ReconciliationNode] = mapped_column(String(30), primary_key=True)
+    watermark: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
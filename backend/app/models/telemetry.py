@@ -1,13 +1,19 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, String
+from sqlalchemy import DateTime, Float, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
+from app.config import settings
 from app.core.constants import QualityFlag, TelemetrySource
 from app.models.base import Base, UUIDType
 
 
+def uses_timescale() -> bool:
+    """Whether rollup tiers are TimescaleDB continuous aggregates."""
+    return settings.DB_ENGINE != "sqlite" and settings.TIMESCALE_ENABLED
+
+
 class TelemetryReading(Base):
     __tablename__ = "telemetry_readings"
 
@@ -24,3 +30,47 @@ class TelemetryReading(Base):
     )
     raw_value: Mapped[float | None] = mapped_column(Float, nullable=True)
     source: Mapped[str | None] = mapped_column(String(50), nullable=True)
+
+
+class TelemetryRollupMixin:
+    """Per-tag aggregates for one fixed bucket width.
+
+    On TimescaleDB these relations are continuous aggregates created by
+    ``scripts.create_telemetry_rollups`` and kept out of ``create_all`` and
+    autogenerate; elsewhere they are plain tables refreshed by the
+    ``refresh_telemetry_rollups`` task.
+    """
+
+    __table_args__ = {"info": {"is_view": uses_timescale}}
+
+    tag_id: Mapped[uuid.UUID] = mapped_column(UUIDType, primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    value_min: Mapped[float] = mapped_column(Float, nullable=False)
+    value_max: Mapped[float] = mapped_column(Float, nullable=False)
+    value_avg: Mapped[float] = mapped_column(Float, nullable=False)
+    value_last: Mapped[float] = mapped_column(Float, nullable=False)
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    good_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    uncertain_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    bad_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class TelemetryRollup1m(TelemetryRollupMixin, Base):
+    __tablename__ = "telemetry_rollup_1m"
+
+
+class TelemetryRollup1h(TelemetryRollupMixin, Base):
+    __tablename__ = "telemetry_rollup_1h"
+
+
+class TelemetryRollup1d(TelemetryRollupMixin, Base):
+    __tablename__ = "telemetry_rollup_1d"
+
+
+class TelemetryRollupState(Base):
+    """Refresh watermark per rollup tier (table-backed rollups only)."""
+
+    __tablename__ = "telemetry_rollup_state"
+
+    tier: Mapped[str] = mapped_column(String(10), primary_key=True)
+    refreshed_until: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
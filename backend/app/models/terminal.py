@@ -1,6 +1,7 @@
 import uuid
+from datetime import datetime
 
-from sqlalchemy import Float, ForeignKey, Integer, String, Text
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, SoftDeleteMixin, TimestampMixin, UUIDMixin, UUIDType
@@ -40,6 +41,51 @@ class Tank(UUIDMixin, TimestampMixin, SoftDeleteMixin, Base):
     terminal: Mapped[Terminal] = relationship(back_populates="tanks")
 
 
+class StrappingTablePoint(Base):
+    """One calibration point of a tank strapping table (gauge level -> volume)."""
+
+    __tablename__ = "strapping_table_points"
+
+    table_ref: Mapped[str] = mapped_column(String(255), primary_key=True)
+    level_mm: Mapped[float] = mapped_column(Float, primary_key=True)
+    volume_m3: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class TankDip(UUIDMixin, TimestampMixin, Base):
+    """A gauged tank level (manual dip or automatic tank gauge)."""
+
+    __tablename__ = "tank_dips"
+
+    tank_id: Mapped[uuid.UUID] = mapped_column(
+        UUIDType, ForeignKey("tanks.id"), nullable=False
+    )
+    measured_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    level_mm: Mapped[float] = mapped_column(Float, nullable=False)
+    source: Mapped[str | None] = mapped_column(String(50), nullable=True)
+
+    # Opening/closing dip lookups for tank receipts
+    __table_args__ = (Index("ix_tank_dips_tank_measured_at", "tank_id", "measured_at"),)
+
+
+class TankReceipt(UUIDMixin, TimestampMixin, Base):
+    """Product received into a tank over a window, as measured by the shore meter."""
+
+    __tablename__ = "tank_receipts"
+
+    tank_id: Mapped[uuid.UUID] = mapped_column(
+        UUIDType, ForeignKey("tanks.id"), nullable=False, index=True
+    )
+    berth_schedule_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUIDType, ForeignKey("berth_schedules.id"), nullable=True
+    )
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
+    ended_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    metered_volume_m3: Mapped[float] = mapped_column(Float, nullable=False)
+    reference: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+
 class LoadingRack(UUIDMixin, TimestampMixin, SoftDeleteMixin, Base):
     __tablename__ = "loading_racks"
 
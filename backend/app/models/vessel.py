@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.constants import VesselStatus
@@ -47,6 +47,9 @@ class BerthSchedule(UUIDMixin, TimestampMixin, Base):
 
     vessel: Mapped[Vessel] = relationship(back_populates="berth_schedules")
 
+    # Change scans for incremental reconciliation
+    __table_args__ = (Index("ix_berth_schedules_updated_at", "updated_at"),)
+
 
 class DemurrageRecord(UUIDMixin, TimestampMixin, Base):
     __tablename__ = "demurrage_records"
@@ -101,3 +101,14 @@ class AssetResponse(BaseModel):
     systems: list[SystemResponse] = []
     created_at: datetime
     updated_at: datetime
+
+
+class SubtreeRollup(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    node_id: uuid.UUID
+    tag_count: int
+    reading_count: int
+    value_avg: float | None
+    value_min: float | None
+    value_max: float | None
@@ -26,6 +26,7 @@ class ReconciliationRunResponse(BaseModel):
     period_end: datetime
     asset_id: uuid.UUID | None
     triggered_by_id: uuid.UUID | None
+    parent_run_id: uuid.UUID | None
     total_expected_m3: float | None
     total_actual_m3: float | None
     total_variance_pct: float | None
@@ -61,3 +62,25 @@ class ReconciliationTriggerRequest(BaseModel):
     period_end: datetime
     asset_id: uuid.UUID | None = None
     tolerance_threshold_pct: float = 1.5
+    # Refresh the latest run for the same period, asset and tolerance if one exists
+    incremental: bool = False
+
+
+class ToleranceWhatIfNode(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    node: ReconciliationNode
+    records: int
+    exceptions: int
+    exception_expected_m3: float
+    exception_variance_m3: float
+
+
+class ToleranceWhatIfResult(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    threshold_pct: float
+    exceptions: int
+    exception_expected_m3: float
+    exception_variance_m3: float
+    nodes: list[ToleranceWhatIfNode]
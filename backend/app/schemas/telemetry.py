@@ -1,9 +1,9 @@
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from pydantic import BaseModel, ConfigDict, Field
 
-from app.core.constants import QualityFlag
+from app.core.constants import ConflictPolicy, QualityFlag
 
 
 class TelemetryPoint(BaseModel):
@@ -17,6 +17,7 @@ class TelemetryPoint(BaseModel):
 
 class TelemetryIngestRequest(BaseModel):
     readings: list[TelemetryPoint] = Field(max_length=10000)
+    on_conflict: ConflictPolicy = ConflictPolicy.ERROR
 
 
 class TelemetryIngestResponse(BaseModel):
@@ -24,6 +25,8 @@ class TelemetryIngestResponse(BaseModel):
 
     ingested: int
     rejected: int
+    duplicates: int = 0
+    limit_breaches: int = 0  # readings outside their tag's low/high limits
     errors: list[str] = []
 
 
@@ -31,10 +34,18 @@ class TelemetryQueryParams(BaseModel):
     tag_ids: list[uuid.UUID]
     start: datetime
     end: datetime
-    downsample: str | None = None  # e.g., "1m", "5m", "1h"
+    downsample: str | None = None  # e.g., "1m", "5m", "1h:max", "lttb:1000"
     quality_filter: QualityFlag | None = None
 
 
+class DownsampleSpec(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    interval: timedelta | None = None
+    agg: str = "avg"  # avg | min | max | first | last | count | lttb
+    max_points: int | None = None  # lttb only
+
+
 class TelemetryReadingResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True, frozen=True)
 
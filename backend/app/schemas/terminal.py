@@ -28,6 +28,7 @@ class TankCreate(BaseModel):
     current_level_m3: float = 0.0
     product_type: str | None = None
     tank_group: str | None = None
+    strapping_table_ref: str | None = Field(default=None, max_length=255)
 
 
 class TankUpdate(BaseModel):
@@ -36,6 +37,7 @@ class TankUpdate(BaseModel):
     current_level_m3: float | None = None
     product_type: str | None = None
     tank_group: str | None = None
+    strapping_table_ref: str | None = Field(default=None, max_length=255)
 
 
 class TankResponse(BaseModel):
@@ -48,6 +50,53 @@ class TankResponse(BaseModel):
     current_level_m3: float
     product_type: str | None
     tank_group: str | None
+    strapping_table_ref: str | None
+    created_at: datetime
+
+
+class StrappingPoint(BaseModel):
+    level_mm: float = Field(ge=0)
+    volume_m3: float = Field(ge=0)
+
+
+class StrappingTableUpdate(BaseModel):
+    points: list[StrappingPoint] = Field(min_length=2)
+
+
+class TankDipCreate(BaseModel):
+    measured_at: datetime
+    level_mm: float = Field(ge=0)
+    source: str | None = Field(default=None, max_length=50)
+
+
+class TankDipResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: uuid.UUID
+    tank_id: uuid.UUID
+    measured_at: datetime
+    level_mm: float
+    source: str | None
+
+
+class TankReceiptCreate(BaseModel):
+    started_at: datetime
+    ended_at: datetime
+    metered_volume_m3: float = Field(ge=0)
+    berth_schedule_id: uuid.UUID | None = None
+    reference: str | None = Field(default=None, max_length=255)
+
+
+class TankReceiptResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: uuid.UUID
+    tank_id: uuid.UUID
+    berth_schedule_id: uuid.UUID | None
+    started_at: datetime
+    ended_at: datetime
+    metered_volume_m3: float
+    reference: str | None
     created_at: datetime
 
 
@@ -0,0 +1,268 @@
+"""Subtree queries over the asset → system → tag hierarchy.
+
+Every node carries a materialised ``path``: the dot-joined hex ids from the
+asset down (``<asset>.<system>.<tag>``), so it is a valid ltree value and
+every ancestor can be read off it. ``place`` sets it when a node is created
+or re-parented. On PostgreSQL subtree membership is ``path::ltree <@ root``, served by the
+``ix_*_path_gist`` indexes; on SQLite it is a lookup in the
+``asset_closure`` table. Either way a subtree is one predicate, so listing
+or aggregating everything under a node is a single query instead of a
+walk through the ``selectin`` relationships.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import (
+    ColumnElement,
+    String,
+    and_,
+    cast,
+    delete,
+    distinct,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    true,
+    union_all,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.core.exceptions import NotFoundException
+from app.models.asset import Asset, AssetClosure, System, Tag
+from app.models.base import Ltree
+from app.models.telemetry import TelemetryReading
+from app.schemas.asset import SubtreeRollup
+
+NODE_KINDS = {Asset: "asset", System: "system", Tag: "tag"}
+
+# Parent model and the child's foreign key to it
+_PARENTS = {System: (Asset, "asset_id"), Tag: (System, "system_id")}
+
+
+def ltree(expr) -> ColumnElement:
+    return cast(expr, Ltree())
+
+
+def path_label(node_id: uuid.UUID) -> str:
+    return node_id.hex
+
+
+def hex_id(column: ColumnElement) -> ColumnElement:
+    """SQL form of ``path_label`` for a UUID column."""
+    return func.replace(cast(column, String), "-", "")
+
+
+def closure_rows(node_id: uuid.UUID, kind: str, path: str) -> list[dict]:
+    labels = path.split(".")
+    return [
+        {
+            "ancestor_id": uuid.UUID(hex=label),
+            "descendant_id": node_id,
+            "depth": len(labels) - 1 - level,
+            "kind": kind,
+        }
+        for level, label in enumerate(labels)
+    ]
+
+
+class AssetHierarchyService:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def place(self, node: Asset | System | Tag) -> None:
+        """Set a flushed node's ``path`` from its parent after an insert or re-parent.
+
+        A re-parented system takes its tags along, and on SQLite the closure
+        table follows. Nodes whose path is already right are left alone.
+        """
+        parent_id = None
+        if isinstance(node, Asset):
+            path = path_label(node.id)
+        else:
+            parent, key = _PARENTS[type(node)]
+            parent_id = getattr(node, key)
+            parent_path = await self.db.scalar(select(parent.path).where(parent.id == parent_id))
+            if parent_path is None:
+                return  # left for scripts.build_asset_hierarchy to backfill
+            path = f"{parent_path}.{path_label(node.id)}"
+
+        previous = node.path
+        if previous == path:
+            return
+        node.path = path
+        if previous is not None and isinstance(node, System):
+            await self.db.execute(
+                update(Tag)
+                .where(Tag.system_id == node.id)
+                .values(path=path + "." + hex_id(Tag.id))
+            )
+
+        if settings.DB_ENGINE == "sqlite":
+            if previous is None:
+                await self.db.execute(
+                    insert(AssetClosure), closure_rows(node.id, NODE_KINDS[type(node)], path)
+                )
+            else:
+                await self._move_closure(node.id, parent_id)
+        await self.db.flush()
+
+    async def _move_closure(self, node_id: uuid.UUID, parent_id: uuid.UUID) -> None:
+        """Re-parent ``node_id``'s subtree: drop links to old ancestors, link the new ones."""
+        subtree = select(AssetClosure.descendant_id).where(AssetClosure.ancestor_id == node_id)
+        await self.db.execute(
+            delete(AssetClosure).where(
+                AssetClosure.descendant_id.in_(subtree),
+                AssetClosure.ancestor_id.not_in(subtree),
+            )
+        )
+        above = aliased(AssetClosure)
+        below = aliased(AssetClosure)
+        await self.db.execute(
+            insert(AssetClosure).from_select(
+                ["ancestor_id", "descendant_id", "depth", "kind"],
+                select(
+                    above.ancestor_id,
+                    below.descendant_id,
+                    above.depth + below.depth + 1,
+                    below.kind,
+                )
+                # Every new ancestor pairs with every node of the moved subtree
+                .join_from(above, below, true())
+                .where(above.descendant_id == parent_id, below.ancestor_id == node_id),
+            )
+        )
+
+    async def resolve(self, node_id: uuid.UUID) -> str:
+        """Path of the asset or system ``node_id``."""
+        for model in (Asset, System):
+            path = (
+                await self.db.execute(
+                    select(model.path).where(model.id == node_id, model.deleted_at.is_(None))
+                )
+            ).scalar_one_or_none()
+            if path is not None:
+                return path
+        raise NotFoundException("Asset or system", str(node_id))
+
+    def within(
+        self, model: type[Asset | System | Tag], node_id: uuid.UUID, path: str
+    ) -> ColumnElement:
+        """Predicate selecting ``model`` rows in the subtree rooted at ``node_id``."""
+        if settings.DB_ENGINE == "sqlite":
+            return model.id.in_(
+                select(AssetClosure.descendant_id).where(AssetClosure.ancestor_id == node_id)
+            )
+        return ltree(model.path).op("<@")(ltree(literal(path)))
+
+    async def subtree_tags(self, node_id: uuid.UUID) -> list[Tag]:
+        path = await self.resolve(node_id)
+        result = await self.db.execute(
+            select(Tag)
+            .where(self.within(Tag, node_id, path), Tag.deleted_at.is_(None))
+            .order_by(Tag.name)
+        )
+        return list(result.scalars().all())
+
+    async def subtree_rollup(
+        self, node_id: uuid.UUID, start: datetime, end: datetime
+    ) -> list[SubtreeRollup]:
+        """Telemetry aggregates over ``[start, end]`` per direct child of ``node_id``."""
+        path = await self.resolve(node_id)
+        r = TelemetryReading
+
+        if settings.DB_ENGINE == "sqlite":
+            child_link = aliased(AssetClosure)
+            tag_link = aliased(AssetClosure)
+            child = child_link.descendant_id
+            stmt = (
+                select(child.label("child"))
+                .select_from(child_link)
+                .join(tag_link, tag_link.ancestor_id == child_link.descendant_id)
+                .join(Tag, Tag.id == tag_link.descendant_id)
+                .where(child_link.ancestor_id == node_id, child_link.depth == 1)
+            )
+        else:
+            # Inlined offsets so GROUP BY matches the selected expression exactly
+            level = literal_column(str(path.count(".") + 1))
+            child = cast(func.subpath(ltree(Tag.path), level, literal_column("1")), String)
+            stmt = (
+                select(child.label("child"))
+                .select_from(Tag)
+                .where(self.within(Tag, node_id, path))
+            )
+
+        result = await self.db.execute(
+            stmt.add_columns(
+                func.count(distinct(Tag.id)).label("tag_count"),
+                func.count(r.value).label("reading_count"),
+                func.avg(r.value).label("value_avg"),
+                func.min(r.value).label("value_min"),
+                func.max(r.value).label("value_max"),
+            )
+            .outerjoin(r, and_(r.tag_id == Tag.id, r.time >= start, r.time <= end))
+            .where(Tag.deleted_at.is_(None))
+            .group_by(child)
+        )
+        # The closure table yields child ids; ltree yields their path label
+        return [
+            SubtreeRollup(
+                node_id=(
+                    row.child if isinstance(row.child, uuid.UUID) else uuid.UUID(hex=row.child)
+                ),
+                tag_count=row.tag_count,
+                reading_count=row.reading_count,
+                value_avg=row.value_avg,
+                value_min=row.value_min,
+                value_max=row.value_max,
+            )
+            for row in result
+        ]
+
+    async def rebuild(self) -> None:
+        """Recompute every path (and the SQLite closure table) from parent ids."""
+        no_sync = {"synchronize_session": False}
+        await self.db.execute(
+            update(Asset).values(path=hex_id(Asset.id)), execution_options=no_sync
+        )
+        await self.db.execute(
+            update(System).values(
+                path=select(Asset.path).where(Asset.id == System.asset_id).scalar_subquery()
+                + "."
+                + hex_id(System.id)
+            ),
+            execution_options=no_sync,
+        )
+        await self.db.execute(
+            update(Tag).values(
+                path=select(System.path).where(System.id == Tag.system_id).scalar_subquery()
+                + "."
+                + hex_id(Tag.id)
+            ),
+            execution_options=no_sync,
+        )
+        if settings.DB_ENGINE != "sqlite":
+            return
+
+        await self.db.execute(delete(AssetClosure))
+        await self.db.execute(
+            insert(AssetClosure).from_select(
+                ["ancestor_id", "descendant_id", "depth", "kind"],
+                union_all(
+                    *(
+                        select(model.id, model.id, literal(0), literal(kind))
+                        for model, kind in NODE_KINDS.items()
+                    ),
+                    select(System.asset_id, System.id, literal(1), literal("system")),
+                    select(Tag.system_id, Tag.id, literal(1), literal("tag")),
+                    select(System.asset_id, Tag.id, literal(2), literal("tag")).join(
+                        System, System.id == Tag.system_id
+                    ),
+                ),
+            )
+        )
@@ -6,6 +6,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.exceptions import NotFoundException
 from app.models.asset import Asset, System, Tag
 from app.schemas.asset import AssetCreate, AssetUpdate, SystemCreate, TagCreate
+from app.services.asset_hierarchy import AssetHierarchyService
+from app.services.tag_registry import tag_registry
+from app.services.tag_search import TagSearchService
 
 
 class AssetService:
@@ -23,6 +26,7 @@ class AssetService:
         asset = Asset(**body.model_dump())
         self.db.add(asset)
         await self.db.flush()
+        await AssetHierarchyService(self.db).place(asset)
         await self.db.refresh(asset)
         return asset
 
@@ -31,6 +35,7 @@ class AssetService:
         for field, value in body.model_dump(exclude_unset=True).items():
             setattr(asset, field, value)
         await self.db.flush()
+        await AssetHierarchyService(self.db).place(asset)
         await self.db.refresh(asset)
         return asset
 
@@ -39,6 +44,7 @@ class AssetService:
         system = System(**body.model_dump())
         self.db.add(system)
         await self.db.flush()
+        await AssetHierarchyService(self.db).place(system)
         await self.db.refresh(system)
         return system
 
@@ -46,13 +52,10 @@ class AssetService:
         tag = Tag(**body.model_dump())
         self.db.add(tag)
         await self.db.flush()
+        await AssetHierarchyService(self.db).place(tag)
         await self.db.refresh(tag)
+        tag_registry.invalidate_on_commit(self.db, tag.id)
         return tag
 
     async def search_tags(self, query: str, limit: int = 20) -> list[Tag]:
-        result = await self.db.execute(
-            select(Tag)
-            .where(Tag.name.ilike(f"%{query}%"), Tag.deleted_at.is_(None))
-            .limit(limit)
-        )
-        return list(result.scalars().all())
+        return await TagSearchService(self.db).search(query, limit)
@@ -1,16 +1,23 @@
+import asyncio
 import uuid
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import Select, case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.constants import ComplianceReportType
+from app.core.constants import ComplianceReportType, ReportFormat
+from app.core.exceptions import NotFoundException, ValidationException
 from app.models.compliance import AuditLog, ComplianceReport, CustodyTransfer
+from app.models.incident import Incident
+from app.models.reconciliation import ReconciliationRun, VarianceRecord
+from app.services.report_artifacts import ReportArtifactStore
+from app.services.report_renderer import REPORT_SECTIONS, render_report, report_fingerprint
 
 
 class ComplianceService:
-    def __init__(self, db: AsyncSession) -> None:
+    def __init__(self, db: AsyncSession, artifacts: ReportArtifactStore | None = None) -> None:
         self.db = db
+        self.artifacts = artifacts or ReportArtifactStore()
 
     async def generate_report(
         self,
@@ -18,9 +25,16 @@ class ComplianceService:
         report_type: ComplianceReportType,
         period_start: datetime,
         period_end: datetime,
-        generated_by_id: uuid.UUID,
+        generated_by_id: uuid.UUID | None,
         file_format: str = "PDF",
+        reuse_existing: bool = False,
     ) -> ComplianceReport:
+        """Render the report for ``[period_start, period_end)`` and record it.
+
+        Content with an existing artifact (same fingerprint) is not rendered
+        again; with ``reuse_existing`` the matching report itself is returned
+        instead of a new version.
+        """
         report = ComplianceReport(
             title=title,
             report_type=report_type,
@@ -28,13 +42,172 @@ class ComplianceService:
             period_end=period_end,
             generated_by_id=generated_by_id,
             file_format=file_format,
-            status="GENERATED",
         )
+        cached = await self._render(report)
+        if cached is not None and reuse_existing:
+            return cached
         self.db.add(report)
         await self.db.flush()
         await self.db.refresh(report)
         return report
 
+    async def render_report(self, report_id: uuid.UUID) -> ComplianceReport:
+        """Render a report recorded as DRAFT (see ``POST /compliance/reports``)."""
+        report = await self.db.get(ComplianceReport, report_id)
+        if report is None:
+            raise NotFoundException("Compliance report", str(report_id))
+        if report.status != "GENERATED":
+            await self._render(report)
+            await self.db.flush()
+        return report
+
+    async def _render(self, report: ComplianceReport) -> ComplianceReport | None:
+        """Fill in ``report``'s file and version; returns the earlier report it matches."""
+        try:
+            report_format = ReportFormat((report.file_format or "PDF").upper())
+        except ValueError as exc:
+            raise ValidationException(f"Unsupported report format: {report.file_format}") from exc
+
+        content = await self.collect_report_data(
+            report.title, report.report_type, report.period_start, report.period_end
+        )
+        fingerprint = report_fingerprint(content, report_format)
+
+        previous = await self._previous_reports(
+            report.report_type, report.period_start, report.period_end
+        )
+        cached = next(
+            (
+                r
+                for r in previous
+                if r.file_format == report_format.value
+                and (r.metadata_json or {}).get("fingerprint") == fingerprint
+                and self.artifacts.exists(r.file_url)
+            ),
+            None,
+        )
+
+        if cached is not None:
+            key, artifact = cached.file_url, cached.metadata_json or {}
+        else:
+            data = await asyncio.to_thread(render_report, content, report_format)
+            key, digest = self.artifacts.put(data, report_format.value)
+            artifact = {"sha256": digest, "size_bytes": len(data)}
+
+        report.file_format = report_format.value
+        report.file_url = key
+        report.status = "GENERATED"
+        report.version = max((r.version for r in previous), default=0) + 1
+        report.metadata_json = {
+            "fingerprint": fingerprint,
+            "sha256": artifact["sha256"],
+            "size_bytes": artifact["size_bytes"],
+        }
+        return cached
+
+    async def collect_report_data(
+        self,
+        title: str,
+        report_type: ComplianceReportType,
+        period_start: datetime,
+        period_end: datetime,
+    ) -> dict:
+        """Report content as plain data: one grouped query per section."""
+        queries = {
+            "reconciliation_runs": self._reconciliation_runs_query,
+            "reconciliation": self._reconciliation_query,
+            "custody": self._custody_query,
+            "incidents": self._incidents_query,
+        }
+        sections = {}
+        for key in REPORT_SECTIONS[ComplianceReportType(report_type)]:
+            result = await self.db.execute(queries[key](period_start, period_end))
+            # Rounded so float summation order can't change the fingerprint
+            sections[key] = [
+                {k: round(v, 3) if isinstance(v, float) else v for k, v in row._mapping.items()}
+                for row in result
+            ]
+        return {
+            "title": title,
+            "report_type": ComplianceReportType(report_type).value,
+            "period_start": period_start.isoformat(),
+            "period_end": period_end.isoformat(),
+            "sections": sections,
+        }
+
+    async def _previous_reports(
+        self, report_type: ComplianceReportType, period_start: datetime, period_end: datetime
+    ) -> list[ComplianceReport]:
+        result = await self.db.execute(
+            select(ComplianceReport)
+            .where(
+                ComplianceReport.report_type == report_type,
+                ComplianceReport.period_start == period_start,
+                ComplianceReport.period_end == period_end,
+                ComplianceReport.status == "GENERATED",
+            )
+            .order_by(ComplianceReport.version.desc())
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    def _runs_in(start: datetime, end: datetime) -> tuple:
+        return (ReconciliationRun.period_start >= start, ReconciliationRun.period_end <= end)
+
+    def _reconciliation_runs_query(self, start: datetime, end: datetime) -> Select:
+        return (
+            select(ReconciliationRun.status, func.count().label("runs"))
+            # A PARTITIONED run stands for its partitions; count it once
+            .where(*self._runs_in(start, end), ReconciliationRun.parent_run_id.is_(None))
+            .group_by(ReconciliationRun.status)
+            .order_by(ReconciliationRun.status)
+        )
+
+    def _reconciliation_query(self, start: datetime, end: datetime) -> Select:
+        expected = func.sum(VarianceRecord.expected_volume_m3)
+        actual = func.sum(VarianceRecord.actual_volume_m3)
+        return (
+            select(
+                VarianceRecord.node,
+                func.count().label("records"),
+                func.sum(case((VarianceRecord.is_exception, 1), else_=0)).label("exceptions"),
+                expected.label("expected_m3"),
+                actual.label("actual_m3"),
+                case(
+                    (expected > 0, func.abs(actual - expected) / expected * 100), else_=0.0
+                ).label("variance_pct"),
+            )
+            .join(ReconciliationRun, ReconciliationRun.id == VarianceRecord.reconciliation_run_id)
+            .where(*self._runs_in(start, end))
+            .group_by(VarianceRecord.node)
+            .order_by(VarianceRecord.node)
+        )
+
+    def _custody_query(self, start: datetime, end: datetime) -> Select:
+        return (
+            select(
+                CustodyTransfer.product_type,
+                func.count().label("transfers"),
+                func.sum(CustodyTransfer.volume_m3).label("volume_m3"),
+            )
+            .where(CustodyTransfer.transfer_time >= start, CustodyTransfer.transfer_time < end)
+            .group_by(CustodyTransfer.product_type)
+            .order_by(CustodyTransfer.product_type)
+        )
+
+    def _incidents_query(self, start: datetime, end: datetime) -> Select:
+        return (
+            select(
+                Incident.incident_type,
+                Incident.severity,
+                func.count().label("incidents"),
+                func.sum(case((Incident.closed_at.is_not(None), 1), else_=0)).label("closed"),
+            )
+            .where(Incident.detected_at >= start, Incident.detected_at < end)
+            .group_by(Incident.incident_type, Incident.severity)
+            .order_by(Incident.incident_type, Incident.severity)
+        )
+
     async def log_audit(
         self,
         action: str,
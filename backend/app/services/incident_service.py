@@ -1,5 +1,5 @@
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -77,9 +77,9 @@ class IncidentService:
         location_lon: float | None = None,
         sla_hours: int = 24,
     ) -> Incident:
-        sla_deadline = datetime.now(timezone.utc).replace(
-            hour=datetime.now(timezone.utc).hour + sla_hours
-        ) if sla_hours else None
+        sla_deadline = (
+            datetime.now(timezone.utc) + timedelta(hours=sla_hours) if sla_hours else None
+        )
 
         incident = Incident(
             title=title,
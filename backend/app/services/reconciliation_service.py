@@ -1,25 +1,153 @@
+import asyncio
+import time
 import uuid
-from datetime import datetime, timezone
+from contextlib import AbstractAsyncContextManager, nullcontext
+from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+import numpy as np
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Select,
+    String,
+    and_,
+    case,
+    cast,
+    delete,
+    false,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.config import settings
 from app.core.constants import (
     IncidentSeverity,
     IncidentType,
     ReconciliationNode,
+    ReconciliationRunType,
     ReconciliationStatus,
 )
+from app.core.exceptions import NotFoundException, ReconciliationException
+from app.database import on_rollback
+from app.models.base import sql_uuid4
 from app.models.fleet import EPod, Trip
-from app.models.reconciliation import ReconciliationRun, VarianceRecord
-from app.models.terminal import Tank
+from app.models.reconciliation import (
+    ReconciliationRun,
+    ReconciliationWatermark,
+    VarianceRecord,
+)
+from app.models.terminal import Tank, TankDip, TankReceipt, Terminal
 from app.models.vessel import BerthSchedule
 from app.services.incident_service import IncidentService
+from app.services.strapping import strapping_tables
+
+# Watermark for nodes a run has never recorded one for: every row is "changed"
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _changed_rows(
+    node: ReconciliationNode, since: datetime
+) -> tuple[ColumnElement, ColumnElement]:
+    """``node``'s reference column and a filter for its source rows changed after ``since``."""
+    if node == ReconciliationNode.VESSEL_DISCHARGE:
+        return BerthSchedule.id, BerthSchedule.updated_at > since
+    if node == ReconciliationNode.TANK_RECEIPT:
+        # A new dip or a tank's strapping ref moves the strapped volume of its receipts
+        return TankReceipt.id, or_(
+            TankReceipt.updated_at > since,
+            TankReceipt.tank_id.in_(
+                select(TankDip.tank_id).where(TankDip.updated_at > since).correlate(None)
+            ),
+            TankReceipt.tank_id.in_(
+                select(Tank.id).where(Tank.updated_at > since).correlate(None)
+            ),
+        )
+    # Both trip nodes carry the trip's fraud flags, which depend on its ePOD
+    return Trip.id, or_(
+        Trip.updated_at > since,
+        Trip.id.in_(select(EPod.trip_id).where(EPod.updated_at > since).correlate(None)),
+    )
+
+
+def _run_records(run: ReconciliationRun) -> ColumnElement:
+    """Filter on the run's variance records; a PARTITIONED run's are its partitions'."""
+    if run.run_type == ReconciliationRunType.PARTITIONED:
+        return VarianceRecord.reconciliation_run_id.in_(
+            select(ReconciliationRun.id).where(ReconciliationRun.parent_run_id == run.id)
+        )
+    return VarianceRecord.reconciliation_run_id == run.id
+
+
+def _partition_filter(
+    node: ReconciliationNode, run: ReconciliationRun
+) -> ColumnElement | None:
+    """Filter on ``node``'s source rows for the run's asset, if it is scoped to one.
+
+    Rows belong to the asset of their terminal (a trip's origin terminal, a
+    receipt's tank). The asset-less partition of a PARTITIONED run takes
+    the rest, including berth schedules, which have no terminal.
+    """
+    if run.asset_id is None and run.parent_run_id is None:
+        return None
+    if node == ReconciliationNode.VESSEL_DISCHARGE:
+        return None if run.asset_id is None else false()
+    if node == ReconciliationNode.TANK_RECEIPT:
+        terminal_id = Tank.terminal_id
+    else:
+        terminal_id = Trip.origin_terminal_id
+    if run.asset_id is not None:
+        return terminal_id.in_(
+            select(Terminal.id).where(Terminal.asset_id == run.asset_id).correlate(None)
+        )
+    return or_(
+        terminal_id.is_(None),
+        terminal_id.not_in(
+            select(Terminal.id).where(Terminal.asset_id.isnot(None)).correlate(None)
+        ),
+    )
 
 
 class ReconciliationService:
-    def __init__(self, db: AsyncSession) -> None:
+    """Port-to-pump reconciliation.
+
+    Each node reconciler is one ``INSERT INTO variance_records ... SELECT``
+    that computes the variance columns in SQL from the source rows, and the
+    run totals come from one aggregate over the inserted records, so no ORM
+    objects are built per trip or berth schedule.
+
+    Given a ``session_factory``, the nodes read disjoint tables and run
+    concurrently, each in its own session, so a run takes as long as its
+    slowest node. Per-node wall times (seconds) are left in ``node_timings``.
+    The new run row is then committed in a session of its own so the node
+    sessions can reference it; everything else is left for the caller to
+    commit. If the run fails, or the caller rolls back, the run and its
+    records are deleted again.
+
+    Runs record a per-node change watermark. ``refresh_reconciliation``
+    replaces only the records of trips, berth schedules and tank receipts
+    updated since then, so late ePODs and corrections don't rescan a period.
+    """
+
+    NODE_RECONCILERS: tuple[tuple[ReconciliationNode, str], ...] = (
+        (ReconciliationNode.VESSEL_DISCHARGE, "_reconcile_vessel_discharge"),
+        (ReconciliationNode.TANK_RECEIPT, "_reconcile_tank_receipts"),
+        (ReconciliationNode.GANTRY_LOADING, "_reconcile_gantry_loading"),
+        (ReconciliationNode.DELIVERY_EPOD, "_reconcile_delivery_epod"),
+    )
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+    ) -> None:
         self.db = db
+        self.session_factory = session_factory
+        self.node_timings: dict[str, float] = {}
 
     async def trigger_reconciliation(
         self,
@@ -29,211 +157,759 @@ class ReconciliationService:
         asset_id: uuid.UUID | None = None,
         tolerance_threshold_pct: float = 1.5,
         triggered_by_id: uuid.UUID | None = None,
+        incremental: bool = False,
+        parent_run_id: uuid.UUID | None = None,
     ) -> ReconciliationRun:
+        """Reconcile a period; ``incremental`` refreshes the latest matching run instead.
+
+        ``asset_id`` limits the run to that asset's terminals. With
+        ``parent_run_id`` the run is a partition of that PARTITIONED run.
+        """
+        run_type = (
+            ReconciliationRunType.PARTITION if parent_run_id else ReconciliationRunType.MANUAL
+        )
+        if incremental:
+            previous = await self._latest_run(
+                run_type,
+                period_start,
+                period_end,
+                asset_id,
+                tolerance_threshold_pct,
+                parent_run_id,
+            )
+            if previous is not None:
+                return await self.refresh_reconciliation(previous)
+
         run = ReconciliationRun(
             name=name,
             status=ReconciliationStatus.IN_PROGRESS,
-            run_type="MANUAL",
+            run_type=run_type,
             period_start=period_start,
             period_end=period_end,
             asset_id=asset_id,
             tolerance_threshold_pct=tolerance_threshold_pct,
             triggered_by_id=triggered_by_id,
+            parent_run_id=parent_run_id,
+        )
+        run = await self._create_run(run)
+        run_id = run.id
+
+        try:
+            async with self._run_savepoint():
+                # Rows updated from here on are picked up by the next refresh
+                evaluated_at = datetime.now(timezone.utc)
+
+                # Run reconciliation checks
+                await self._reconcile_nodes(run, period_start, period_end)
+
+                # Run anti-fraud checks
+                await self._run_fraud_checks(run, period_start, period_end)
+
+                run = await self._finish_run(run, evaluated_at)
+        except Exception:
+            await self._discard_run(run_id)
+            raise
+        if self._concurrent_nodes():
+            # Nor may the run outlive a rollback of the caller's transaction
+            on_rollback(self.db, lambda: self._discard_run(run_id))
+        return run
+
+    async def start_partitioned_run(
+        self,
+        name: str,
+        period_start: datetime,
+        period_end: datetime,
+        tolerance_threshold_pct: float = 1.5,
+    ) -> tuple[ReconciliationRun, list[uuid.UUID | None]]:
+        """Create the parent of a per-asset reconciliation and list its partitions.
+
+        A parent already created for the same period is reused, so a retried
+        fan-out refreshes its partitions instead of duplicating them. The
+        ``None`` partition covers rows not attributable to any asset.
+        """
+        run_id = await self._latest_run(
+            ReconciliationRunType.PARTITIONED,
+            period_start,
+            period_end,
+            None,
+            tolerance_threshold_pct,
+            None,
+        )
+        if run_id is not None:
+            run = await self.db.get(ReconciliationRun, run_id)
+        else:
+            run = ReconciliationRun(
+                name=name,
+                status=ReconciliationStatus.IN_PROGRESS,
+                run_type=ReconciliationRunType.PARTITIONED,
+                period_start=period_start,
+                period_end=period_end,
+                tolerance_threshold_pct=tolerance_threshold_pct,
+            )
+            self.db.add(run)
+            await self.db.flush()
+
+        asset_ids = (
+            await self.db.scalars(
+                select(Terminal.asset_id).where(Terminal.asset_id.isnot(None)).distinct()
+            )
+        ).all()
+        return run, [*asset_ids, None]
+
+    async def reconcile_partition(
+        self, parent_run_id: uuid.UUID, asset_id: uuid.UUID | None
+    ) -> ReconciliationRun:
+        """Reconcile (or refresh) one asset partition of a PARTITIONED run."""
+        parent = await self.db.get(ReconciliationRun, parent_run_id)
+        if parent is None:
+            raise NotFoundException("Reconciliation run", str(parent_run_id))
+        return await self.trigger_reconciliation(
+            name=f"{parent.name} [{asset_id or 'unassigned'}]",
+            period_start=parent.period_start,
+            period_end=parent.period_end,
+            asset_id=asset_id,
+            tolerance_threshold_pct=parent.tolerance_threshold_pct,
+            incremental=True,
+            parent_run_id=parent.id,
         )
-        self.db.add(run)
+
+    async def fail_partitioned_run(self, run_id: uuid.UUID) -> ReconciliationRun:
+        """Mark a PARTITIONED run FAILED when one of its partitions couldn't finish.
+
+        Retrying the daily task reuses the run and finishes it as usual.
+        """
+        run = await self.db.get(ReconciliationRun, run_id)
+        if run is None:
+            raise NotFoundException("Reconciliation run", str(run_id))
+        run.status = ReconciliationStatus.FAILED
+        run.completed_at = datetime.now(timezone.utc)
+        await self.db.flush()
+        return run
+
+    async def finish_partitioned_run(self, run_id: uuid.UUID) -> ReconciliationRun:
+        """Roll the partitions' totals and exceptions up into their parent run."""
+        run = await self.db.get(ReconciliationRun, run_id)
+        if run is None:
+            raise NotFoundException("Reconciliation run", str(run_id))
+        exceptions = await self._compute_totals(run)
+        await self._close_run(run, exceptions)
         await self.db.flush()
         await self.db.refresh(run)
+        return run
 
-        # Run reconciliation checks
-        await self._reconcile_vessel_discharge(run, period_start, period_end)
-        await self._reconcile_tank_receipts(run, period_start, period_end)
-        await self._reconcile_gantry_loading(run, period_start, period_end)
-        await self._reconcile_delivery_epod(run, period_start, period_end)
+    async def tolerance_what_if(
+        self, run_id: uuid.UUID, thresholds: list[float]
+    ) -> list[dict]:
+        """Exceptions per node the run would have at each candidate tolerance.
 
-        # Calculate totals
-        await self._compute_totals(run)
+        One grouped aggregate over the stored variance columns, with a
+        ``FILTER`` per threshold; nothing is written. Fraud flags and
+        unstrappable tank receipts are exceptions at any tolerance, so at the
+        run's own threshold the counts match its stored ``is_exception``.
+        """
+        run = await self.db.get(ReconciliationRun, run_id)
+        if run is None:
+            raise NotFoundException("Reconciliation run", str(run_id))
 
-        # Run anti-fraud checks
-        await self._run_fraud_checks(run, period_start, period_end)
+        always = or_(
+            VarianceRecord.fraud_checks.isnot(None),
+            and_(
+                VarianceRecord.node == ReconciliationNode.TANK_RECEIPT,
+                VarianceRecord.notes.isnot(None),
+            ),
+        )
+        columns = []
+        for i, threshold in enumerate(thresholds):
+            exception = or_(VarianceRecord.variance_pct > threshold, always)
+            columns += [
+                func.count().filter(exception).label(f"exceptions_{i}"),
+                func.sum(VarianceRecord.expected_volume_m3).filter(exception).label(
+                    f"expected_m3_{i}"
+                ),
+                func.sum(func.abs(VarianceRecord.variance_m3)).filter(exception).label(
+                    f"variance_m3_{i}"
+                ),
+            ]
+        rows = (
+            await self.db.execute(
+                select(VarianceRecord.node, func.count().label("records"), *columns)
+                .where(_run_records(run))
+                .group_by(VarianceRecord.node)
+                .order_by(VarianceRecord.node)
+            )
+        ).mappings().all()
 
-        # Auto-close or flag as exception
-        has_exceptions = any(
-            vr.is_exception for vr in run.variance_records
+        results = []
+        for i, threshold in enumerate(thresholds):
+            nodes = [
+                {
+                    "node": row["node"],
+                    "records": row["records"],
+                    "exceptions": row[f"exceptions_{i}"],
+                    "exception_expected_m3": row[f"expected_m3_{i}"] or 0.0,
+                    "exception_variance_m3": row[f"variance_m3_{i}"] or 0.0,
+                }
+                for row in rows
+            ]
+            results.append(
+                {
+                    "threshold_pct": threshold,
+                    "exceptions": sum(node["exceptions"] for node in nodes),
+                    "exception_expected_m3": sum(node["exception_expected_m3"] for node in nodes),
+                    "exception_variance_m3": sum(node["exception_variance_m3"] for node in nodes),
+                    "nodes": nodes,
+                }
+            )
+        return results
+
+    async def _latest_run(
+        self,
+        run_type: ReconciliationRunType,
+        period_start: datetime,
+        period_end: datetime,
+        asset_id: uuid.UUID | None,
+        tolerance_threshold_pct: float,
+        parent_run_id: uuid.UUID | None,
+    ) -> uuid.UUID | None:
+        """The latest open run with these parameters, for incremental re-runs."""
+
+        def matches(column: ColumnElement, value: uuid.UUID | None) -> ColumnElement:
+            return column == value if value else column.is_(None)
+
+        return await self.db.scalar(
+            select(ReconciliationRun.id)
+            .where(
+                ReconciliationRun.run_type == run_type,
+                ReconciliationRun.period_start == period_start,
+                ReconciliationRun.period_end == period_end,
+                matches(ReconciliationRun.asset_id, asset_id),
+                matches(ReconciliationRun.parent_run_id, parent_run_id),
+                ReconciliationRun.tolerance_threshold_pct == tolerance_threshold_pct,
+                ReconciliationRun.status != ReconciliationStatus.MANUALLY_CLOSED,
+            )
+            .order_by(ReconciliationRun.created_at.desc())
+            .limit(1)
         )
-        if has_exceptions:
-            run.status = ReconciliationStatus.EXCEPTION
-            # Create incident for exceptions
-            incident_service = IncidentService(self.db)
-            await incident_service.create_incident(
-                title=f"Reconciliation exception: {name}",
-                incident_type=IncidentType.RECONCILIATION_EXCEPTION,
-                severity=IncidentSeverity.HIGH,
-                detected_at=datetime.now(timezone.utc),
-                description=f"Reconciliation run '{name}' flagged exceptions exceeding tolerance of ±{tolerance_threshold_pct}%",
-                asset_id=asset_id,
+
+    async def refresh_reconciliation(self, run_id: uuid.UUID) -> ReconciliationRun:
+        """Bring a run up to date with source rows changed since its watermarks.
+
+        Records of changed references are replaced (or dropped if the row
+        left the period), then fraud checks for changed trips, totals and
+        status are recomputed.
+        """
+        run = await self.db.get(ReconciliationRun, run_id)
+        if run is None:
+            raise NotFoundException("Reconciliation run", str(run_id))
+        if run.status == ReconciliationStatus.MANUALLY_CLOSED:
+            raise ReconciliationException("A manually closed run can't be refreshed")
+        if run.run_type == ReconciliationRunType.PARTITIONED:
+            partitions = await self.db.scalars(
+                select(ReconciliationRun.id).where(ReconciliationRun.parent_run_id == run.id)
             )
-        else:
-            run.status = ReconciliationStatus.AUTO_CLOSED
+            for partition_id in partitions.all():
+                await self.refresh_reconciliation(partition_id)
+            return await self.finish_partitioned_run(run.id)
 
-        run.completed_at = datetime.now(timezone.utc)
+        evaluated_at = datetime.now(timezone.utc)
+        overlap = timedelta(seconds=settings.RECONCILIATION_WATERMARK_OVERLAP_SECONDS)
+        watermarks = {
+            node: watermark.replace(tzinfo=watermark.tzinfo or timezone.utc) - overlap
+            for node, watermark in (
+                await self.db.execute(
+                    select(ReconciliationWatermark.node, ReconciliationWatermark.watermark).where(
+                        ReconciliationWatermark.reconciliation_run_id == run.id
+                    )
+                )
+            ).all()
+        }
+        changed_since = {
+            node: watermarks.get(node.value, _EPOCH) for node, _ in self.NODE_RECONCILERS
+        }
+
+        await self._reconcile_nodes(run, run.period_start, run.period_end, changed_since)
+        await self._run_fraud_checks(
+            run,
+            run.period_start,
+            run.period_end,
+            changed_since=min(
+                changed_since[ReconciliationNode.GANTRY_LOADING],
+                changed_since[ReconciliationNode.DELIVERY_EPOD],
+            ),
+        )
+        return await self._finish_run(run, evaluated_at)
+
+    async def _finish_run(
+        self, run: ReconciliationRun, evaluated_at: datetime
+    ) -> ReconciliationRun:
+        # Totals and exception count in one pass over the run's records
+        exceptions = await self._compute_totals(run)
+        await self._close_run(run, exceptions)
+        await self._save_watermarks(run, evaluated_at)
         await self.db.flush()
         await self.db.refresh(run)
         return run
 
-    async def _reconcile_vessel_discharge(
-        self, run: ReconciliationRun, start: datetime, end: datetime
+    async def _close_run(self, run: ReconciliationRun, exceptions: int) -> None:
+        # Auto-close or flag as exception
+        if exceptions:
+            # Create incident for exceptions, once per run; a partitioned run's
+            # incident is opened by its parent
+            if run.status != ReconciliationStatus.EXCEPTION and run.parent_run_id is None:
+                incident_service = IncidentService(self.db)
+                await incident_service.create_incident(
+                    title=f"Reconciliation exception: {run.name}",
+                    incident_type=IncidentType.RECONCILIATION_EXCEPTION,
+                    severity=IncidentSeverity.HIGH,
+                    detected_at=datetime.now(timezone.utc),
+                    description=(
+                        f"Reconciliation run '{run.name}' flagged exceptions exceeding "
+                        f"tolerance of ±{run.tolerance_threshold_pct}%"
+                    ),
+                    asset_id=run.asset_id,
+                )
+            run.status = ReconciliationStatus.EXCEPTION
+        else:
+            run.status = ReconciliationStatus.AUTO_CLOSED
+
+        run.completed_at = datetime.now(timezone.utc)
+
+    async def _save_watermarks(self, run: ReconciliationRun, evaluated_at: datetime) -> None:
+        existing = {
+            watermark.node: watermark
+            for watermark in (
+                await self.db.execute(
+                    select(ReconciliationWatermark).where(
+                        ReconciliationWatermark.reconciliation_run_id == run.id
+                    )
+                )
+            ).scalars()
+        }
+        for node, _ in self.NODE_RECONCILERS:
+            if node.value in existing:
+                existing[node.value].watermark = evaluated_at
+            else:
+                self.db.add(
+                    ReconciliationWatermark(
+                        reconciliation_run_id=run.id, node=node, watermark=evaluated_at
+                    )
+                )
+
+    def _concurrent_nodes(self) -> bool:
+        # SQLite has a single writer, so separate sessions would only queue
+        return self.session_factory is not None and settings.DB_ENGINE != "sqlite"
+
+    async def _create_run(self, run: ReconciliationRun) -> ReconciliationRun:
+        if not self._concurrent_nodes():
+            self.db.add(run)
+            await self.db.flush()
+            await self.db.refresh(run)
+            return run
+        # Node sessions insert records referencing the run, so it must be
+        # committed before they start, without committing the caller's work
+        async with self.session_factory() as session:
+            session.add(run)
+            await session.commit()
+        return await self.db.get_one(ReconciliationRun, run.id)
+
+    def _run_savepoint(self) -> AbstractAsyncContextManager:
+        # Rolling back to it releases the locks the caller's session took on
+        # the run and its records, so _discard_run doesn't wait on them
+        if not self._concurrent_nodes():
+            return nullcontext()
+        return self.db.begin_nested()
+
+    async def _discard_run(self, run_id: uuid.UUID) -> None:
+        """Delete a run committed by ``_create_run`` whose reconciliation failed."""
+        if not self._concurrent_nodes():
+            return  # the run goes with the caller's rollback
+        async with self.session_factory() as session:
+            await session.execute(
+                delete(VarianceRecord).where(VarianceRecord.reconciliation_run_id == run_id)
+            )
+            await session.execute(delete(ReconciliationRun).where(ReconciliationRun.id == run_id))
+            await session.commit()
+
+    async def _reconcile_nodes(
+        self,
+        run: ReconciliationRun,
+        start: datetime,
+        end: datetime,
+        changed_since: dict[ReconciliationNode, datetime] | None = None,
     ) -> None:
+        """Run every node reconciler; ``changed_since`` limits each to changed rows."""
+        since = changed_since or {}
+        if not self._concurrent_nodes():
+            for node, method in self.NODE_RECONCILERS:
+                started = time.perf_counter()
+                await self._reconcile_node(node, method, run, start, end, since.get(node))
+                self.node_timings[node.value] = round(time.perf_counter() - started, 3)
+            return
+
+        results = await asyncio.gather(
+            *(
+                self._reconcile_node_in_session(node, method, run, start, end, since.get(node))
+                for node, method in self.NODE_RECONCILERS
+            ),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            # Finished nodes committed whole: a new run is discarded by
+            # trigger_reconciliation, and on a refresh the unchanged
+            # watermarks make the next refresh redo them
+            raise errors[0]
+        self.node_timings = {
+            node.value: round(elapsed, 3)
+            for (node, _), elapsed in zip(self.NODE_RECONCILERS, results, strict=True)
+        }
+
+    async def _reconcile_node_in_session(
+        self,
+        node: ReconciliationNode,
+        method: str,
+        run: ReconciliationRun,
+        start: datetime,
+        end: datetime,
+        changed_since: datetime | None,
+    ) -> float:
+        """Run one node reconciler in a new session and commit; returns seconds taken."""
+        started = time.perf_counter()
+        async with self.session_factory() as session:
+            await ReconciliationService(session)._reconcile_node(
+                node, method, run, start, end, changed_since
+            )
+            await session.commit()
+        return time.perf_counter() - started
+
+    async def _reconcile_node(
+        self,
+        node: ReconciliationNode,
+        method: str,
+        run: ReconciliationRun,
+        start: datetime,
+        end: datetime,
+        changed_since: datetime | None,
+    ) -> None:
+        if changed_since is not None:
+            # Drop the records of changed references; the reconciler re-inserts
+            # those still in the period
+            reference, changed = _changed_rows(node, changed_since)
+            changed_references = select(cast(reference, String)).where(changed)
+            await self.db.execute(
+                delete(VarianceRecord).where(
+                    VarianceRecord.reconciliation_run_id == run.id,
+                    VarianceRecord.node == node,
+                    VarianceRecord.reference_id.in_(changed_references),
+                ),
+                execution_options={"synchronize_session": False},
+            )
+        await getattr(self, method)(run, start, end, changed_since)
+
+    async def _insert_variances(
+        self,
+        run: ReconciliationRun,
+        node: ReconciliationNode,
+        source: Select,
+        expected: ColumnElement,
+        actual: ColumnElement,
+        reference: ColumnElement,
+        changed_since: datetime | None = None,
+    ) -> int:
+        """Insert one variance record per ``source`` row; returns the row count.
+
+        ``expected``, ``actual`` (m³) and ``reference`` are expressions over
+        ``source``'s FROM clause. ``changed_since`` keeps only rows changed
+        after it.
+        """
+        if changed_since is not None:
+            source = source.where(_changed_rows(node, changed_since)[1])
+        partition = _partition_filter(node, run)
+        if partition is not None:
+            source = source.where(partition)
+        variance_pct = case(
+            (expected > 0, func.abs(actual - expected) / expected * 100), else_=0.0
+        )
+        now = literal(datetime.now(timezone.utc), DateTime(timezone=True))
+        columns = {
+            "id": sql_uuid4(),
+            "reconciliation_run_id": literal(run.id, VarianceRecord.reconciliation_run_id.type),
+            "node": literal(node.value),
+            "expected_volume_m3": expected,
+            "actual_volume_m3": actual,
+            "variance_m3": actual - expected,
+            "variance_pct": variance_pct,
+            "is_exception": variance_pct > run.tolerance_threshold_pct,
+            "reference_id": cast(reference, String),
+            "created_at": now,
+            "updated_at": now,
+        }
         result = await self.db.execute(
+            insert(VarianceRecord).from_select(
+                list(columns), source.with_only_columns(*columns.values())
+            )
+        )
+        return result.rowcount
+
+    async def _reconcile_vessel_discharge(
+        self,
+        run: ReconciliationRun,
+        start: datetime,
+        end: datetime,
+        changed_since: datetime | None = None,
+    ) -> None:
+        await self._insert_variances(
+            run,
+            ReconciliationNode.VESSEL_DISCHARGE,
             select(BerthSchedule).where(
                 BerthSchedule.eta >= start,
                 BerthSchedule.eta <= end,
                 BerthSchedule.bill_of_lading_volume_m3.isnot(None),
                 BerthSchedule.metered_volume_m3.isnot(None),
-            )
+            ),
+            expected=BerthSchedule.bill_of_lading_volume_m3,
+            actual=BerthSchedule.metered_volume_m3,
+            reference=BerthSchedule.id,
+            changed_since=changed_since,
         )
-        schedules = result.scalars().all()
 
-        for sched in schedules:
-            expected = sched.bill_of_lading_volume_m3 or 0
-            actual = sched.metered_volume_m3 or 0
-            variance = actual - expected
-            variance_pct = (abs(variance) / expected * 100) if expected > 0 else 0
+    async def _reconcile_tank_receipts(
+        self,
+        run: ReconciliationRun,
+        start: datetime,
+        end: datetime,
+        changed_since: datetime | None = None,
+    ) -> None:
+        """Metered receipt vs. the tank's inventory change over the receipt window.
 
-            record = VarianceRecord(
-                reconciliation_run_id=run.id,
-                node=ReconciliationNode.VESSEL_DISCHARGE,
-                expected_volume_m3=expected,
-                actual_volume_m3=actual,
-                variance_m3=variance,
-                variance_pct=variance_pct,
-                is_exception=variance_pct > run.tolerance_threshold_pct,
-                reference_id=str(sched.id),
+        Inventory is the strapped volume of the last dip at or before the
+        receipt starts and the first dip at or after it ends. Receipts whose
+        change can't be strapped are recorded as exceptions with a note.
+        """
+        opening = (
+            select(TankDip.level_mm)
+            .where(
+                TankDip.tank_id == TankReceipt.tank_id,
+                TankDip.measured_at <= TankReceipt.started_at,
+            )
+            .order_by(TankDip.measured_at.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        closing = (
+            select(TankDip.level_mm)
+            .where(
+                TankDip.tank_id == TankReceipt.tank_id,
+                TankDip.measured_at >= TankReceipt.ended_at,
+            )
+            .order_by(TankDip.measured_at)
+            .limit(1)
+            .scalar_subquery()
+        )
+        receipts = (
+            select(
+                TankReceipt.id,
+                Tank.strapping_table_ref,
+                TankReceipt.metered_volume_m3,
+                opening.label("opening_mm"),
+                closing.label("closing_mm"),
+            )
+            .join(Tank, Tank.id == TankReceipt.tank_id)
+            .where(
+                TankReceipt.started_at >= start,
+                TankReceipt.started_at <= end,
+                Tank.deleted_at.is_(None),
             )
-            self.db.add(record)
+        )
+        node = ReconciliationNode.TANK_RECEIPT
+        if changed_since is not None:
+            receipts = receipts.where(_changed_rows(node, changed_since)[1])
+        partition = _partition_filter(node, run)
+        if partition is not None:
+            receipts = receipts.where(partition)
+        rows = (await self.db.execute(receipts)).all()
+        if not rows:
+            return
 
-        await self.db.flush()
+        receipt_ids, refs, metered, opening_mm, closing_mm = zip(*rows, strict=True)
+        tables = await strapping_tables.get_many(self.db, {ref for ref in refs if ref})
+        refs = np.array(refs, dtype=object)
+        levels = np.array([opening_mm, closing_mm], dtype=float)  # None -> NaN
+        volumes = np.full_like(levels, np.nan)
+        for ref, table in tables.items():
+            mask = refs == ref
+            volumes[:, mask] = table.volumes(levels[:, mask])
 
-    async def _reconcile_tank_receipts(
-        self, run: ReconciliationRun, start: datetime, end: datetime
-    ) -> None:
-        # Tank level changes during period would be reconciled against metered receipts
-        # Simplified: compare aggregate tank level changes
-        pass
+        expected = np.array(metered, dtype=float)
+        received = volumes[1] - volumes[0]
+        unresolved = np.isnan(received)
+        actual = np.where(unresolved, 0.0, received)
+        variance = actual - expected
+        variance_pct = np.divide(
+            np.abs(variance) * 100, expected, out=np.zeros_like(expected), where=expected > 0
+        )
+        is_exception = (variance_pct > run.tolerance_threshold_pct) | unresolved
+
+        def note(i: int) -> str | None:
+            if not unresolved[i]:
+                return None
+            if refs[i] not in tables:
+                return "No strapping table for tank"
+            if np.isnan(levels[0, i]) or np.isnan(levels[1, i]):
+                return f"No {'opening' if np.isnan(levels[0, i]) else 'closing'} dip"
+            return "Dip level outside strapping table range"
+
+        await self.db.execute(
+            insert(VarianceRecord),
+            [
+                {
+                    "reconciliation_run_id": run.id,
+                    "node": ReconciliationNode.TANK_RECEIPT,
+                    "expected_volume_m3": float(expected[i]),
+                    "actual_volume_m3": float(actual[i]),
+                    "variance_m3": float(variance[i]),
+                    "variance_pct": float(variance_pct[i]),
+                    "is_exception": bool(is_exception[i]),
+                    "reference_id": str(receipt_id),
+                    "notes": note(i),
+                }
+                for i, receipt_id in enumerate(receipt_ids)
+            ],
+        )
 
     async def _reconcile_gantry_loading(
-        self, run: ReconciliationRun, start: datetime, end: datetime
+        self,
+        run: ReconciliationRun,
+        start: datetime,
+        end: datetime,
+        changed_since: datetime | None = None,
     ) -> None:
-        result = await self.db.execute(
+        # Trip volumes are litres; 1 m3 = 1000 litres
+        await self._insert_variances(
+            run,
+            ReconciliationNode.GANTRY_LOADING,
             select(Trip).where(
                 Trip.departure_time >= start,
                 Trip.departure_time <= end,
                 Trip.gantry_metered_litres.isnot(None),
                 Trip.loaded_volume_litres.isnot(None),
-            )
+            ),
+            expected=Trip.loaded_volume_litres / 1000.0,
+            actual=Trip.gantry_metered_litres / 1000.0,
+            reference=Trip.id,
+            changed_since=changed_since,
         )
-        trips = result.scalars().all()
-
-        for trip in trips:
-            expected = trip.loaded_volume_litres or 0
-            actual = trip.gantry_metered_litres or 0
-            # Convert litres to m3 (1 m3 = 1000 litres)
-            expected_m3 = expected / 1000
-            actual_m3 = actual / 1000
-            variance = actual_m3 - expected_m3
-            variance_pct = (abs(variance) / expected_m3 * 100) if expected_m3 > 0 else 0
-
-            record = VarianceRecord(
-                reconciliation_run_id=run.id,
-                node=ReconciliationNode.GANTRY_LOADING,
-                expected_volume_m3=expected_m3,
-                actual_volume_m3=actual_m3,
-                variance_m3=variance,
-                variance_pct=variance_pct,
-                is_exception=variance_pct > run.tolerance_threshold_pct,
-                reference_id=str(trip.id),
-            )
-            self.db.add(record)
-
-        await self.db.flush()
 
     async def _reconcile_delivery_epod(
-        self, run: ReconciliationRun, start: datetime, end: datetime
+        self,
+        run: ReconciliationRun,
+        start: datetime,
+        end: datetime,
+        changed_since: datetime | None = None,
     ) -> None:
-        result = await self.db.execute(
-            select(Trip, EPod)
+        await self._insert_variances(
+            run,
+            ReconciliationNode.DELIVERY_EPOD,
+            select(Trip)
             .join(EPod, Trip.id == EPod.trip_id)
             .where(
                 Trip.departure_time >= start,
                 Trip.departure_time <= end,
                 Trip.gantry_metered_litres.isnot(None),
-            )
+            ),
+            expected=Trip.gantry_metered_litres / 1000.0,
+            actual=EPod.delivered_volume_litres / 1000.0,
+            reference=Trip.id,
+            changed_since=changed_since,
         )
-        rows = result.all()
 
-        for trip, epod in rows:
-            expected_m3 = (trip.gantry_metered_litres or 0) / 1000
-            actual_m3 = epod.delivered_volume_litres / 1000
-            variance = actual_m3 - expected_m3
-            variance_pct = (abs(variance) / expected_m3 * 100) if expected_m3 > 0 else 0
-
-            record = VarianceRecord(
-                reconciliation_run_id=run.id,
-                node=ReconciliationNode.DELIVERY_EPOD,
-                expected_volume_m3=expected_m3,
-                actual_volume_m3=actual_m3,
-                variance_m3=variance,
-                variance_pct=variance_pct,
-                is_exception=variance_pct > run.tolerance_threshold_pct,
-                reference_id=str(trip.id),
+    async def _compute_totals(self, run: ReconciliationRun) -> int:
+        """Set the run's volume totals; returns its number of exception records."""
+        totals = (
+            await self.db.execute(
+                select(
+                    func.count().label("records"),
+                    func.sum(case((VarianceRecord.is_exception, 1), else_=0)).label("exceptions"),
+                    func.sum(VarianceRecord.expected_volume_m3).label("expected"),
+                    func.sum(VarianceRecord.actual_volume_m3).label("actual"),
+                ).where(_run_records(run))
             )
-            self.db.add(record)
-
-        await self.db.flush()
-
-    async def _compute_totals(self, run: ReconciliationRun) -> None:
-        await self.db.refresh(run, ["variance_records"])
-        if not run.variance_records:
-            return
+        ).one()
+        if not totals.records:
+            run.total_expected_m3 = run.total_actual_m3 = run.total_variance_pct = None
+            return 0
 
-        total_expected = sum(vr.expected_volume_m3 for vr in run.variance_records)
-        total_actual = sum(vr.actual_volume_m3 for vr in run.variance_records)
-        run.total_expected_m3 = total_expected
-        run.total_actual_m3 = total_actual
+        run.total_expected_m3 = totals.expected
+        run.total_actual_m3 = totals.actual
         run.total_variance_pct = (
-            (abs(total_actual - total_expected) / total_expected * 100)
-            if total_expected > 0
+            (abs(totals.actual - totals.expected) / totals.expected * 100)
+            if totals.expected > 0
             else 0
         )
         await self.db.flush()
+        return totals.exceptions
 
     async def _run_fraud_checks(
-        self, run: ReconciliationRun, start: datetime, end: datetime
+        self,
+        run: ReconciliationRun,
+        start: datetime,
+        end: datetime,
+        changed_since: datetime | None = None,
     ) -> None:
-        # Run anti-fraud checks on delivery records
-        result = await self.db.execute(
-            select(Trip, EPod)
-            .join(EPod, Trip.id == EPod.trip_id)
-            .where(Trip.departure_time >= start, Trip.departure_time <= end)
-        )
-        rows = result.all()
-
-        for trip, epod in rows:
-            fraud_flags: dict = {}
+        """Flag the run's records for trips with suspicious deliveries, in one UPDATE.
 
-            # Short-loading detection
-            if trip.gantry_metered_litres and epod.delivered_volume_litres:
-                if epod.delivered_volume_litres > trip.gantry_metered_litres:
-                    fraud_flags["short_load"] = True
+        - ``short_load``: the ePOD delivered more than the gantry metered.
+        - ``ghost_trip``: an ePOD with volume for a trip that never arrived.
 
-            # Ghost trip detection (no arrival time but has ePOD)
-            if trip.arrival_time is None and epod.delivered_volume_litres > 0:
-                fraud_flags["ghost_trip"] = True
+        Every record of a flagged trip (any node) becomes an exception; the
+        join on ``(reconciliation_run_id, reference_id)`` is served by
+        ``ix_variance_records_run_reference``. ``changed_since`` limits the
+        checks to trips changed after it.
+        """
+        short_load = and_(
+            Trip.gantry_metered_litres != 0,
+            EPod.delivered_volume_litres != 0,
+            EPod.delivered_volume_litres > Trip.gantry_metered_litres,
+        )
+        ghost_trip = and_(Trip.arrival_time.is_(None), EPod.delivered_volume_litres > 0)
+        flagged = (
+            select(
+                cast(Trip.id, String).label("reference_id"),
+                short_load.label("short_load"),
+                ghost_trip.label("ghost_trip"),
+            )
+            .join(EPod, Trip.id == EPod.trip_id)
+            .where(
+                Trip.departure_time >= start,
+                Trip.departure_time <= end,
+                or_(short_load, ghost_trip),
+            )
+        )
+        if changed_since is not None:
+            # Records of unchanged trips kept their flags
+            node = ReconciliationNode.DELIVERY_EPOD
+            flagged = flagged.where(_changed_rows(node, changed_since)[1])
+        flagged = flagged.subquery()
 
-            if fraud_flags:
-                # Update variance record with fraud check results
-                for vr in run.variance_records:
-                    if vr.reference_id == str(trip.id):
-                        vr.fraud_checks = fraud_flags
-                        vr.is_exception = True
+        def flags(**checks: bool) -> ColumnElement:
+            return literal(checks, VarianceRecord.fraud_checks.type)
 
-        await self.db.flush()
+        await self.db.execute(
+            update(VarianceRecord)
+            .where(
+                VarianceRecord.reconciliation_run_id == run.id,
+                VarianceRecord.reference_id == flagged.c.reference_id,
+            )
+            .values(
+                is_exception=True,
+                fraud_checks=case(
+                    (
+                        and_(flagged.c.short_load, flagged.c.ghost_trip),
+                        flags(short_load=True, ghost_trip=True),
+                    ),
+                    (flagged.c.short_load, flags(short_load=True)),
+                    else_=flags(ghost_trip=True),
+                ),
+            ),
+            execution_options={"synchronize_session": False},
+        )
@@ -0,0 +1,38 @@
+"""Content-addressed local storage for rendered report files.
+
+A file is stored under its SHA-256 (``<aa>/<sha256>.<ext>``) and that key
+is what ``ComplianceReport.file_url`` holds, so identical documents are
+stored once and a key always names the same bytes.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from app.config import settings
+
+
+class ReportArtifactStore:
+    def __init__(self, root: Path | None = None) -> None:
+        self.root = Path(root or settings.REPORT_STORAGE_DIR)
+
+    def put(self, data: bytes, extension: str) -> tuple[str, str]:
+        """Store ``data``; returns its key and SHA-256 hex digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        key = f"{digest[:2]}/{digest}.{extension.lower()}"
+        path = self.path(key)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so readers never see a partial file
+            fd, tmp = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp, path)
+        return key, digest
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    def exists(self, key: str | None) -> bool:
+        return key is not None and self.path(key).is_file()
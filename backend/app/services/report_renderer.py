@@ -0,0 +1,152 @@
+"""PDF and XLSX rendering of compliance report content.
+
+A document depends only on the content dict built by
+``ComplianceService.collect_report_data``, so ``report_fingerprint`` of
+that content decides whether a render is needed at all. Bump
+``REPORT_TEMPLATE_VERSION`` whenever the layout changes so cached
+artifacts are re-rendered.
+"""
+
+import hashlib
+import io
+from xml.sax.saxutils import escape
+
+import orjson
+from openpyxl import Workbook
+from openpyxl.styles import Font
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from app.core.constants import ComplianceReportType, ReportFormat
+
+REPORT_TEMPLATE_VERSION = 1
+
+# Section key -> (heading, ((column key, column header), ...))
+SECTIONS: dict[str, tuple[str, tuple[tuple[str, str], ...]]] = {
+    "reconciliation_runs": (
+        "Reconciliation runs",
+        (("status", "Status"), ("runs", "Runs")),
+    ),
+    "reconciliation": (
+        "Reconciliation variance by node",
+        (
+            ("node", "Node"),
+            ("records", "Records"),
+            ("exceptions", "Exceptions"),
+            ("expected_m3", "Expected (m3)"),
+            ("actual_m3", "Actual (m3)"),
+            ("variance_pct", "Variance (%)"),
+        ),
+    ),
+    "custody": (
+        "Custody transfers by product",
+        (("product_type", "Product"), ("transfers", "Transfers"), ("volume_m3", "Volume (m3)")),
+    ),
+    "incidents": (
+        "Incidents by type and severity",
+        (
+            ("incident_type", "Type"),
+            ("severity", "Severity"),
+            ("incidents", "Incidents"),
+            ("closed", "Closed"),
+        ),
+    ),
+}
+
+REPORT_SECTIONS: dict[ComplianceReportType, tuple[str, ...]] = {
+    ComplianceReportType.BPS_QUANTITY: ("reconciliation_runs", "reconciliation", "custody"),
+    ComplianceReportType.WMA_REPORT: ("reconciliation_runs", "reconciliation"),
+    ComplianceReportType.CUSTODY_TRAIL: ("custody",),
+    ComplianceReportType.MONTHLY_COMPLIANCE: tuple(SECTIONS),
+    ComplianceReportType.AUDIT_PACK: tuple(SECTIONS),
+}
+
+REPORT_MEDIA_TYPES = {
+    ReportFormat.PDF: "application/pdf",
+    ReportFormat.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def report_fingerprint(content: dict, report_format: ReportFormat) -> str:
+    """Hash of everything a rendered document depends on."""
+    payload = orjson.dumps(
+        {"template": REPORT_TEMPLATE_VERSION, "format": report_format.value, "content": content},
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+
+def render_report(content: dict, report_format: ReportFormat) -> bytes:
+    if report_format == ReportFormat.XLSX:
+        return render_xlsx(content)
+    return render_pdf(content)
+
+
+def _period(content: dict) -> str:
+    return f"Period: {content['period_start']} to {content['period_end']}"
+
+
+def render_pdf(content: dict) -> bytes:
+    styles = getSampleStyleSheet()
+    story = [
+        Paragraph(escape(content["title"]), styles["Title"]),
+        Paragraph(f"{content['report_type']} &middot; {_period(content)}", styles["Normal"]),
+    ]
+    table_style = TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1f3a5f")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+            ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+        ]
+    )
+    for key in content["sections"]:
+        heading, columns = SECTIONS[key]
+        story += [Spacer(1, 12), Paragraph(heading, styles["Heading2"])]
+        rows = content["sections"][key]
+        if not rows:
+            story.append(Paragraph("No records in period.", styles["Italic"]))
+            continue
+        table = Table(
+            [[header for _, header in columns]]
+            + [[_cell(row[column]) for column, _ in columns] for row in rows],
+            repeatRows=1,
+        )
+        table.setStyle(table_style)
+        story.append(table)
+
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=landscape(A4), title=content["title"]).build(story)
+    return buffer.getvalue()
+
+
+def render_xlsx(content: dict) -> bytes:
+    workbook = Workbook()
+    summary = workbook.active
+    summary.title = "Summary"
+    summary.append([content["title"]])
+    summary["A1"].font = Font(bold=True, size=14)
+    summary.append([content["report_type"]])
+    summary.append([_period(content)])
+
+    for key in content["sections"]:
+        heading, columns = SECTIONS[key]
+        sheet = workbook.create_sheet(heading[:31])
+        sheet.append([header for _, header in columns])
+        for cell in sheet[1]:
+            cell.font = Font(bold=True)
+        for row in content["sections"][key]:
+            sheet.append([row[column] for column, _ in columns])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def _cell(value: object) -> str:
+    if isinstance(value, float):
+        return f"{value:,.3f}"
+    return str(value)
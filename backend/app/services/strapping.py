@@ -0,0 +1,101 @@
+"""Tank strapping tables: gauge level (mm) -> observed volume (m³).
+
+Tables are read once per process, with one query for all the refs a
+caller needs, and kept as level-sorted NumPy arrays, so converting a whole
+series of dips is a single ``np.interp``. Levels outside a table's
+calibrated range have no defined volume and convert to NaN.
+
+Tables change only when a tank is re-calibrated. Writers in this process
+call ``strapping_tables.invalidate_on_commit(db, ref)``; other workers
+reload every table after ``STRAPPING_TABLE_TTL_SECONDS``.
+"""
+
+import time
+from collections.abc import Iterable
+from typing import NamedTuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import on_commit
+from app.models.terminal import StrappingTablePoint
+
+
+class StrappingTable(NamedTuple):
+    levels_mm: np.ndarray
+    volumes_m3: np.ndarray
+
+    def volumes(self, levels_mm: np.ndarray) -> np.ndarray:
+        """Linearly interpolated volumes for ``levels_mm``; NaN outside the table."""
+        return np.interp(
+            np.asarray(levels_mm, dtype=float),
+            self.levels_mm,
+            self.volumes_m3,
+            left=np.nan,
+            right=np.nan,
+        )
+
+
+class StrappingTableCache:
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._tables: dict[str, StrappingTable] = {}
+        self._absent: set[str] = set()
+        self._expires_at = 0.0
+
+    async def get_many(
+        self, db: AsyncSession, refs: Iterable[str]
+    ) -> dict[str, StrappingTable]:
+        """Tables for ``refs``; refs without calibration points are omitted."""
+        if time.monotonic() >= self._expires_at:
+            self.invalidate()
+            self._expires_at = time.monotonic() + self.ttl
+        refs = set(refs)
+        missing = refs - self._tables.keys() - self._absent
+        if missing:
+            await self._load(db, missing)
+        return {ref: self._tables[ref] for ref in refs if ref in self._tables}
+
+    def invalidate(self, ref: str | None = None) -> None:
+        if ref is None:
+            self._tables = {}
+            self._absent = set()
+        else:
+            self._tables.pop(ref, None)
+            self._absent.discard(ref)
+
+    def invalidate_on_commit(self, db: AsyncSession, ref: str | None = None) -> None:
+        """``invalidate`` once ``db`` commits, so a concurrent load cannot cache old points."""
+        on_commit(db, lambda: self.invalidate(ref))
+
+    async def _load(self, db: AsyncSession, refs: set[str]) -> None:
+        rows = (
+            await db.execute(
+                select(
+                    StrappingTablePoint.table_ref,
+                    StrappingTablePoint.level_mm,
+                    StrappingTablePoint.volume_m3,
+                )
+                .where(StrappingTablePoint.table_ref.in_(refs))
+                .order_by(StrappingTablePoint.table_ref, StrappingTablePoint.level_mm)
+            )
+        ).all()
+        if rows:
+            table_refs, levels, volumes = (
+                np.asarray(column) for column in zip(*rows, strict=True)
+            )
+            # Rows are grouped by ref, so each table is one contiguous slice
+            names, starts = np.unique(table_refs, return_index=True)
+            order = np.argsort(starts)
+            names, starts = names[order], starts[order]
+            bounds = [*starts[1:], len(rows)]
+            for name, lo, hi in zip(names, starts, bounds, strict=True):
+                self._tables[str(name)] = StrappingTable(
+                    levels[lo:hi].astype(float), volumes[lo:hi].astype(float)
+                )
+        self._absent.update(refs - self._tables.keys())
+
+
+strapping_tables = StrappingTableCache(ttl=settings.STRAPPING_TABLE_TTL_SECONDS)
@@ -0,0 +1,155 @@
+"""Process-wide registry of static tag metadata.
+
+Telemetry ingest, validation and analytics need a tag's unit, limits and
+place in the asset hierarchy far more often than that metadata changes.
+``TagRegistry`` loads every active tag with one flat ``tags JOIN systems``
+select (no ORM objects, so the ``selectin`` relationships never fire) and
+serves lookups from memory.
+
+The snapshot is reloaded after ``TAG_REGISTRY_TTL_SECONDS``. Tag writes in
+this process call ``invalidate_on_commit`` so they are visible as soon as
+they commit; other workers pick them up on their next reload.
+"""
+
+import time
+import uuid
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import on_commit
+from app.models.asset import System, Tag
+
+# Keeps ``IN (...)`` lookups for unseen tags under driver bind-parameter limits
+LOAD_CHUNK_SIZE = 10_000
+
+
+class TagInfo(NamedTuple):
+    id: uuid.UUID
+    name: str
+    unit: str
+    low_limit: float | None
+    high_limit: float | None
+    system_id: uuid.UUID
+    asset_id: uuid.UUID
+    path: str | None
+
+
+class TagRegistry:
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        # Bumped whenever entries change, so derived indexes know to rebuild
+        self.version = 0
+        self._entries: dict[uuid.UUID, TagInfo] = {}
+        self._absent: set[uuid.UUID] = set()
+        self._stale: set[uuid.UUID] = set()
+        self._expires_at = 0.0
+
+    async def get(self, db: AsyncSession, tag_id: uuid.UUID) -> TagInfo | None:
+        return (await self.get_many(db, [tag_id])).get(tag_id)
+
+    async def get_many(
+        self, db: AsyncSession, tag_ids: Iterable[uuid.UUID]
+    ) -> dict[uuid.UUID, TagInfo]:
+        """Metadata for the active tags among ``tag_ids``; unknown ids are omitted."""
+        tag_ids = set(tag_ids)
+        await self.ensure(db, tag_ids)
+        entries = self._entries
+        return {t: entries[t] for t in tag_ids if t in entries}
+
+    async def ensure(self, db: AsyncSession, tag_ids: Iterable[uuid.UUID]) -> None:
+        """Reload an expired snapshot, then fetch unseen and invalidated tags in one query."""
+        reloaded = time.monotonic() >= self._expires_at
+        if reloaded:
+            await self._reload(db)
+
+        tag_ids = set(tag_ids)
+        unseen = {t for t in tag_ids if t not in self._entries and t not in self._absent}
+        # Ids served by the reload just done came from the database, not the cache
+        self.hits += 0 if reloaded else len(tag_ids) - len(unseen)
+        self.misses += len(tag_ids) if reloaded else len(unseen)
+
+        pending = list(unseen | self._stale)
+        self._stale = set()
+        for offset in range(0, len(pending), LOAD_CHUNK_SIZE):
+            self._add(await self._fetch(db, pending[offset : offset + LOAD_CHUNK_SIZE]))
+        # Remember ids that are not tags so later lookups don't query for them again
+        self._absent.update(t for t in unseen if t not in self._entries)
+
+    def entries(self) -> dict[uuid.UUID, TagInfo]:
+        """The current snapshot; callers must not mutate it."""
+        return self._entries
+
+    def invalidate(self, tag_id: uuid.UUID | None = None) -> None:
+        """Re-read one tag (created, edited or deleted) on next use, or the whole snapshot."""
+        if tag_id is None:
+            self._expires_at = 0.0
+        else:
+            self._entries.pop(tag_id, None)
+            self._absent.discard(tag_id)
+            self._stale.add(tag_id)
+        self.version += 1
+
+    def invalidate_on_commit(self, db: AsyncSession, tag_id: uuid.UUID | None = None) -> None:
+        """``invalidate`` once ``db`` commits, so a concurrent reload cannot cache old rows."""
+        on_commit(db, lambda: self.invalidate(tag_id))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "hit_ratio": self.hits / lookups if lookups else None,
+        }
+
+    def clear(self) -> None:
+        self._entries = {}
+        self._absent = set()
+        self._stale = set()
+        self._expires_at = 0.0
+        self.hits = self.misses = self.loads = 0
+        self.version += 1
+
+    async def _reload(self, db: AsyncSession) -> None:
+        self._entries = {}
+        self._absent = set()
+        self._stale = set()
+        self._add(await self._fetch(db, None))
+        self._expires_at = time.monotonic() + self.ttl
+        self.loads += 1
+        self.version += 1
+
+    async def _fetch(self, db: AsyncSession, tag_ids: list[uuid.UUID] | None) -> list[TagInfo]:
+        stmt = (
+            select(
+                Tag.id,
+                Tag.name,
+                Tag.unit,
+                Tag.low_limit,
+                Tag.high_limit,
+                Tag.system_id,
+                System.asset_id,
+                Tag.path,
+            )
+            .join(System, System.id == Tag.system_id)
+            .where(Tag.deleted_at.is_(None))
+        )
+        if tag_ids is not None:
+            stmt = stmt.where(Tag.id.in_(tag_ids))
+        return [TagInfo(*row) for row in await db.execute(stmt)]
+
+    def _add(self, infos: list[TagInfo]) -> None:
+        if infos:
+            self._entries.update((info.id, info) for info in infos)
+            self.version += 1
+
+
+tag_registry = TagRegistry(ttl=settings.TAG_REGISTRY_TTL_SECONDS)
@@ -0,0 +1,156 @@
+"""Ranked substring search over tag names.
+
+A tag matches when the query occurs anywhere in its name, ignoring case.
+Matches are ranked prefix matches first, then by pg_trgm-style trigram
+similarity to the query, then by name.
+
+On PostgreSQL the ``ILIKE`` is served by the ``ix_tags_name_trgm`` GIN
+index and ranked with ``similarity()`` (both from the pg_trgm migration).
+SQLite has no trigram index, so ``TagNameIndex`` keeps a 3-gram inverted
+index over the names in the ``TagRegistry`` snapshot and is rebuilt
+whenever the registry changes. Each search first compares the active tag
+count and newest ``updated_at`` with the snapshot's and reloads the
+registry if they differ, so tags written by other workers or by direct SQL
+are found without waiting for the registry TTL.
+"""
+
+import heapq
+import re
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.asset import Tag
+from app.services.tag_registry import TagRegistry, tag_registry
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> set[str]:
+    """Trigrams as pg_trgm extracts them: per alphanumeric word, lower-cased and padded."""
+    grams = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def _like_escape(query: str) -> str:
+    return query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class TagNameIndex:
+    """Inverted index from raw 3-grams of lower-cased tag names to registry positions."""
+
+    def __init__(self, registry: TagRegistry = tag_registry) -> None:
+        self.registry = registry
+        self._ids: list[uuid.UUID] = []
+        self._names: list[str] = []
+        self._lowered: list[str] = []
+        self._trigrams: list[set[str] | None] = []
+        self._postings: dict[str, set[int]] = {}
+        self._version: int | None = None
+        self._fingerprint: tuple | None = None
+
+    async def search(self, db: AsyncSession, query: str, limit: int) -> list[uuid.UUID]:
+        """Ids of the ``limit`` best-ranked tags whose name contains ``query``."""
+        fingerprint = tuple(
+            (
+                await db.execute(
+                    select(func.count(), func.max(Tag.updated_at)).where(
+                        Tag.deleted_at.is_(None)
+                    )
+                )
+            ).one()
+        )
+        if fingerprint != self._fingerprint:
+            self.registry.invalidate()
+        await self.registry.ensure(db, ())
+        self._fingerprint = fingerprint
+        if self._version != self.registry.version:
+            self._rebuild()
+
+        needle = query.lower()
+        if len(needle) < 3:
+            matches = [i for i, name in enumerate(self._lowered) if needle in name]
+        else:
+            postings = sorted(
+                (self._postings.get(needle[i : i + 3], set()) for i in range(len(needle) - 2)),
+                key=len,
+            )
+            candidates = set.intersection(*postings)
+            matches = [i for i in candidates if needle in self._lowered[i]]
+
+        query_grams = trigrams(query)
+
+        def rank(i: int) -> tuple:
+            if self._trigrams[i] is None:
+                self._trigrams[i] = trigrams(self._names[i])
+            return (
+                not self._lowered[i].startswith(needle),
+                -similarity(query_grams, self._trigrams[i]),
+                self._names[i],
+            )
+
+        return [self._ids[i] for i in heapq.nsmallest(limit, matches, key=rank)]
+
+    def _rebuild(self) -> None:
+        infos = list(self.registry.entries().values())
+        self._ids = [info.id for info in infos]
+        self._names = [info.name for info in infos]
+        self._lowered = [name.lower() for name in self._names]
+        # Name trigram sets are computed lazily, only for names that get ranked
+        self._trigrams = [None] * len(infos)
+        postings: dict[str, set[int]] = {}
+        for i, name in enumerate(self._lowered):
+            for gram in {name[j : j + 3] for j in range(len(name) - 2)}:
+                postings.setdefault(gram, set()).add(i)
+        self._postings = postings
+        self._version = self.registry.version
+
+
+tag_name_index = TagNameIndex()
+
+
+class TagSearchService:
+    def __init__(self, db: AsyncSession, index: TagNameIndex = tag_name_index) -> None:
+        self.db = db
+        self.index = index
+
+    async def search(self, query: str, limit: int = 20) -> list[Tag]:
+        if settings.DB_ENGINE == "sqlite":
+            return await self._search_indexed(query, limit)
+
+        result = await self.db.execute(
+            select(Tag)
+            .where(
+                Tag.name.ilike(f"%{_like_escape(query)}%", escape="\\"),
+                Tag.deleted_at.is_(None),
+            )
+            .order_by(
+                Tag.name.ilike(f"{_like_escape(query)}%", escape="\\").desc(),
+                func.similarity(Tag.name, query).desc(),
+                Tag.name,
+            )
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def _search_indexed(self, query: str, limit: int) -> list[Tag]:
+        ids = await self.index.search(self.db, query, limit)
+        if not ids:
+            return []
+        result = await self.db.execute(
+            select(Tag).where(Tag.id.in_(ids), Tag.deleted_at.is_(None))
+        )
+        tags = {tag.id: tag for tag in result.scalars()}
+        return [tags[tag_id] for tag_id in ids if tag_id in tags]
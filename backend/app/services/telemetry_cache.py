@@ -0,0 +1,184 @@
+"""Last-value cache for telemetry tags.
+
+Keeps the newest reading per tag in process so ``get_latest`` rarely touches
+the database. The ingest write path updates it once its transaction
+commits, with the rows actually written; entries (including
+"no readings" markers from cold misses) expire after
+``TELEMETRY_LATEST_CACHE_TTL_SECONDS`` because other API workers and Celery
+ingest into the same table.
+
+With ``REDIS_ENABLED`` every update is mirrored to a Redis hash shared by
+all processes, and local misses consult Redis before the database. Writes
+go through a compare-and-set script, so a late or resynced batch never
+replaces a newer value.
+"""
+
+import time
+import uuid
+from collections.abc import Coroutine
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.schemas.telemetry import TelemetryReadingResponse
+from app.services.telemetry_writer import TELEMETRY_COLUMNS
+
+logger = get_logger(__name__)
+
+REDIS_VALUES_KEY = "telemetry:latest"
+REDIS_STAMPS_KEY = "telemetry:latest:ts"
+
+# KEYS: values hash, stamps hash. ARGV: overwrite flag, then (tag, stamp, payload) triples
+_CAS_SCRIPT = """
+local overwrite = ARGV[1] == '1'
+for i = 2, #ARGV, 3 do
+  local current = tonumber(redis.call('HGET', KEYS[2], ARGV[i]))
+  local stamp = tonumber(ARGV[i + 1])
+  if not current or stamp > current or (overwrite and stamp == current) then
+    redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 2])
+  end
+end
+"""
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _stamp(value: datetime) -> int:
+    """Epoch microseconds; naive datetimes are taken as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+class LastValueCache:
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        # tag_id -> (expires_at, stamp, reading); reading None caches "no readings"
+        self._entries: dict[uuid.UUID, tuple[float, int, TelemetryReadingResponse | None]] = {}
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+        self._redis = None
+        self._cas = None
+        if settings.REDIS_ENABLED:
+            import redis.asyncio as aioredis
+
+            self._redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+            self._cas = self._redis.register_script(_CAS_SCRIPT)
+
+    async def lookup(
+        self, tag_ids: list[uuid.UUID]
+    ) -> tuple[dict[uuid.UUID, TelemetryReadingResponse | None], list[uuid.UUID]]:
+        """Split ``tag_ids`` into cached readings and tags that need the database.
+
+        Cached tags known to have no readings map to None.
+        """
+        now = time.monotonic()
+        found: dict[uuid.UUID, TelemetryReadingResponse | None] = {}
+        missing: list[uuid.UUID] = []
+        for tag_id in tag_ids:
+            entry = self._entries.get(tag_id)
+            if entry is not None and entry[0] > now:
+                found[tag_id] = entry[2]
+            else:
+                missing.append(tag_id)
+        self.hits += len(found)
+
+        if missing and self._redis is not None:
+            try:
+                payloads = await self._redis.hmget(REDIS_VALUES_KEY, [str(t) for t in missing])
+            except Exception:  # the mirror is best-effort; fall through to the database
+                logger.warning("latest_cache_redis_unavailable", exc_info=True)
+            else:
+                remaining = []
+                for tag_id, payload in zip(missing, payloads, strict=True):
+                    if payload is None:
+                        remaining.append(tag_id)
+                        continue
+                    self._put(TelemetryReadingResponse.model_validate_json(payload), now)
+                    found[tag_id] = self._entries[tag_id][2]
+                self.redis_hits += len(missing) - len(remaining)
+                missing = remaining
+
+        self.misses += len(missing)
+        return found, missing
+
+    async def store(
+        self,
+        readings: list[TelemetryReadingResponse],
+        empty: list[uuid.UUID] | None = None,
+    ) -> None:
+        """Cache readings loaded from the database, and tags found to have none."""
+        now = time.monotonic()
+        for tag_id in empty or ():
+            self._entries[tag_id] = (now + self.ttl, -1, None)
+        fresh = [r for r in readings if self._put(r, now)]
+        await self._mirror(fresh, overwrite=False)
+
+    def record(self, rows: list[tuple], overwrite: bool = False) -> Coroutine[Any, Any, None]:
+        """Apply a committed batch of ``TELEMETRY_COLUMNS``-ordered rows.
+
+        Only the newest row per tag is considered. A row with the same
+        timestamp as the cached reading replaces it only when ``overwrite``
+        (i.e. the batch was written with ``DO_UPDATE``). The local cache is
+        updated immediately; await the result to mirror the change to Redis.
+        """
+        newest: dict[uuid.UUID, tuple[int, tuple]] = {}
+        for row in rows:
+            stamp = _stamp(row[1])
+            current = newest.get(row[0])
+            if current is None or stamp >= current[0]:
+                newest[row[0]] = (stamp, row)
+
+        now = time.monotonic()
+        fresh = []
+        for _, row in newest.values():
+            fields = dict(zip(TELEMETRY_COLUMNS, row, strict=True))
+            reading = TelemetryReadingResponse.model_validate(fields)
+            if self._put(reading, now, overwrite):
+                fresh.append(reading)
+        return self._mirror(fresh, overwrite)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.redis_hits) / lookups if lookups else None,
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.redis_hits = self.misses = 0
+
+    def _put(self, reading: TelemetryReadingResponse, now: float, overwrite: bool = False) -> bool:
+        """Cache ``reading`` unless a newer one is held; returns whether it was stored."""
+        stamp = _stamp(reading.time)
+        entry = self._entries.get(reading.tag_id)
+        if entry is not None and (entry[1] > stamp or (entry[1] == stamp and not overwrite)):
+            if entry[1] == stamp:
+                # Same reading re-read; keep it warm
+                self._entries[reading.tag_id] = (now + self.ttl, *entry[1:])
+            return False
+        self._entries[reading.tag_id] = (now + self.ttl, stamp, reading)
+        return True
+
+    async def _mirror(self, readings: list[TelemetryReadingResponse], overwrite: bool) -> None:
+        if self._cas is None or not readings:
+            return
+        args: list = ["1" if overwrite else "0"]
+        for reading in readings:
+            args += [str(reading.tag_id), _stamp(reading.time), reading.model_dump_json()]
+        try:
+            await self._cas(keys=[REDIS_VALUES_KEY, REDIS_STAMPS_KEY], args=args)
+        except Exception:  # the mirror is best-effort; the local cache is already updated
+            logger.warning("latest_cache_redis_unavailable", exc_info=True)
+
+
+last_value_cache = LastValueCache(ttl=settings.TELEMETRY_LATEST_CACHE_TTL_SECONDS)
@@ -0,0 +1,281 @@
+"""Backend-agnostic downsampling for telemetry queries.
+
+Bucketing is pushed into SQL wherever the backend can express the aggregate
+(``date_bin`` on PostgreSQL, integer epoch division on SQLite). Aggregates
+SQLite has no SQL form for (first/last) are computed with NumPy over a
+streamed, tag-ordered cursor, one tag at a time.
+
+Buckets are aligned to the Unix epoch on every backend, and each bucket
+reports the worst quality flag it contains (BAD > UNCERTAIN > GOOD).
+
+``lttb:<n>`` instead selects at most ``n`` raw readings per tag with
+Largest-Triangle-Three-Buckets, which bounds chart payloads regardless of
+the time range while keeping the peaks fixed-interval averaging flattens.
+"""
+
+import re
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+import numpy as np
+from sqlalchemy import ColumnElement, DateTime, Integer, case, cast, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.constants import QualityFlag
+from app.core.exceptions import ValidationException
+from app.models.telemetry import TelemetryReading
+from app.schemas.telemetry import DownsampleSpec
+
+AGGREGATES = ("avg", "min", "max", "first", "last", "count")
+
+LTTB_MAX_POINTS = 20_000
+
+_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+QUALITY_RANK = {
+    QualityFlag.GOOD.value: 0,
+    QualityFlag.UNCERTAIN.value: 1,
+    QualityFlag.BAD.value: 2,
+}
+_RANK_QUALITY = {rank: flag for flag, rank in QUALITY_RANK.items()}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class DownsampledRow(NamedTuple):
+    tag_id: uuid.UUID
+    time: datetime
+    value: float
+    quality: str
+    raw_value: float | None = None
+    source: str | None = None
+
+
+def parse_downsample(spec: str) -> DownsampleSpec:
+    """Parse ``"<n><s|m|h|d>[:<agg>]"`` (e.g. ``"5m"``, ``"1h:max"``) or ``"lttb:<n>"``."""
+    interval, _, agg = spec.partition(":")
+    if interval == "lttb":
+        if not agg.isdigit() or not 3 <= int(agg) <= LTTB_MAX_POINTS:
+            raise ValidationException(
+                f"Invalid downsample '{spec}': expected lttb:<n> with 3 <= n <= {LTTB_MAX_POINTS}"
+            )
+        return DownsampleSpec(agg="lttb", max_points=int(agg))
+
+    agg = agg or "avg"
+    match = re.fullmatch(r"(\d+)([smhd])", interval.strip())
+    if match is None or int(match[1]) == 0 or agg not in AGGREGATES:
+        raise ValidationException(
+            f"Invalid downsample '{spec}': expected <n><s|m|h|d>[:{'|'.join(AGGREGATES)}]"
+        )
+    return DownsampleSpec(interval=timedelta(**{_UNITS[match[2]]: int(match[1])}), agg=agg)
+
+
+def epoch_ms(times: tuple[datetime, ...] | list[datetime]) -> np.ndarray:
+    """Convert UTC datetimes (aware or naive) to int64 epoch milliseconds."""
+    naive = [t.astimezone(timezone.utc).replace(tzinfo=None) if t.tzinfo else t for t in times]
+    return np.array(naive, dtype="datetime64[ms]").astype(np.int64)
+
+
+def bucket_expr(column: ColumnElement, interval: timedelta) -> ColumnElement:
+    """Epoch-aligned bucket start for a timestamp column.
+
+    PostgreSQL returns a timestamptz; SQLite returns integer epoch seconds
+    (see ``bucket_time``).
+    """
+    if settings.DB_ENGINE == "sqlite":
+        seconds = int(interval.total_seconds())
+        return (cast(func.strftime("%s", column), Integer) // seconds) * seconds
+    return func.date_bin(
+        interval,
+        column,
+        literal(_EPOCH, DateTime(timezone=True)),
+        type_=DateTime(timezone=True),
+    )
+
+
+def bucket_time(value: datetime | int) -> datetime:
+    """Normalise a ``bucket_expr`` result to an aware UTC datetime."""
+    if isinstance(value, int):
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class DownsampleEngine:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def fetch(
+        self,
+        tag_ids: list[uuid.UUID],
+        start: datetime,
+        end: datetime,
+        spec: DownsampleSpec,
+    ) -> list[DownsampledRow]:
+        """Bucketed readings for all tags, ordered by (tag_id, bucket)."""
+        if spec.agg == "lttb":
+            return await self._fetch_numpy(tag_ids, start, end, spec, lttb_select)
+        if settings.DB_ENGINE == "sqlite" and spec.agg in ("first", "last"):
+            return await self._fetch_numpy(tag_ids, start, end, spec, aggregate_buckets)
+        return await self._fetch_sql(tag_ids, start, end, spec)
+
+    async def _fetch_sql(
+        self,
+        tag_ids: list[uuid.UUID],
+        start: datetime,
+        end: datetime,
+        spec: DownsampleSpec,
+    ) -> list[DownsampledRow]:
+        r = TelemetryReading
+        bucket = bucket_expr(r.time, spec.interval)
+
+        if spec.agg in ("first", "last"):
+            # PostgreSQL only; SQLite first/last go through NumPy
+            from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+            order = r.time.asc() if spec.agg == "first" else r.time.desc()
+            value_expr = func.array_agg(aggregate_order_by(r.value, order))[1]
+        else:
+            value_expr = {
+                "avg": func.avg(r.value),
+                "min": func.min(r.value),
+                "max": func.max(r.value),
+                "count": func.count(),
+            }[spec.agg]
+
+        quality_rank = func.max(
+            case(
+                (r.quality == QualityFlag.BAD.value, 2),
+                (r.quality == QualityFlag.UNCERTAIN.value, 1),
+                else_=0,
+            )
+        )
+
+        bucket = bucket.label("bucket")
+        result = await self.db.execute(
+            select(r.tag_id, bucket, value_expr.label("value"), quality_rank.label("rank"))
+            .where(r.tag_id.in_(tag_ids), r.time >= start, r.time <= end)
+            .group_by(r.tag_id, bucket)
+            .order_by(r.tag_id, bucket)
+        )
+        return [
+            DownsampledRow(
+                tag_id=row.tag_id,
+                time=bucket_time(row.bucket),
+                value=float(row.value),
+                quality=_RANK_QUALITY[row.rank],
+            )
+            for row in result
+        ]
+
+    async def _fetch_numpy(
+        self,
+        tag_ids: list[uuid.UUID],
+        start: datetime,
+        end: datetime,
+        spec: DownsampleSpec,
+        reduce: Callable[[uuid.UUID, list, DownsampleSpec], list[DownsampledRow]],
+    ) -> list[DownsampledRow]:
+        r = TelemetryReading
+        stream = await self.db.stream(
+            select(r.tag_id, r.time, r.value, r.quality)
+            .where(r.tag_id.in_(tag_ids), r.time >= start, r.time <= end)
+            .order_by(r.tag_id, r.time)
+        )
+
+        rows: list[DownsampledRow] = []
+        current: uuid.UUID | None = None
+        pending: list = []
+        async for partition in stream.partitions(10_000):
+            for row in partition:
+                if row.tag_id != current and pending:
+                    rows.extend(reduce(current, pending, spec))
+                    pending = []
+                current = row.tag_id
+                pending.append(row)
+        if pending:
+            rows.extend(reduce(current, pending, spec))
+        return rows
+
+
+def aggregate_buckets(
+    tag_id: uuid.UUID, readings: list, spec: DownsampleSpec
+) -> list[DownsampledRow]:
+    """Aggregate one tag's time-ordered (tag_id, time, value, quality) rows into buckets."""
+    _, times, values, qualities = zip(*readings, strict=True)
+    ms = epoch_ms(times)
+    values = np.array(values, dtype=np.float64)
+    ranks = np.array([QUALITY_RANK[q] for q in qualities], dtype=np.int8)
+
+    bucket_ms = int(spec.interval.total_seconds() * 1000)
+    buckets = ms // bucket_ms
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ms)]
+    counts = ends - starts
+
+    if spec.agg == "avg":
+        aggregated = np.add.reduceat(values, starts) / counts
+    elif spec.agg == "min":
+        aggregated = np.minimum.reduceat(values, starts)
+    elif spec.agg == "max":
+        aggregated = np.maximum.reduceat(values, starts)
+    elif spec.agg == "first":
+        aggregated = values[starts]
+    elif spec.agg == "last":
+        aggregated = values[ends - 1]
+    else:
+        aggregated = counts.astype(np.float64)
+    worst = np.maximum.reduceat(ranks, starts)
+
+    return [
+        DownsampledRow(
+            tag_id=tag_id,
+            time=_EPOCH + timedelta(milliseconds=int(b) * bucket_ms),
+            value=float(v),
+            quality=_RANK_QUALITY[int(q)],
+        )
+        for b, v, q in zip(buckets[starts], aggregated, worst, strict=True)
+    ]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """Indices of the ``n`` points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    selected point and the mean of the next bucket. Areas are computed with
+    NumPy per bucket, so the Python loop runs ``n`` times, not once per point.
+    """
+    size = len(x)
+    if size <= n:
+        return np.arange(size)
+
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    selected = np.empty(n, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else size
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def lttb_select(tag_id: uuid.UUID, readings: list, spec: DownsampleSpec) -> list[DownsampledRow]:
+    """Reduce one tag's time-ordered (tag_id, time, value, quality) rows with LTTB."""
+    _, times, values, qualities = zip(*readings, strict=True)
+    ms = epoch_ms(times)
+    x = (ms - ms[0]).astype(np.float64)
+    y = np.array(values, dtype=np.float64)
+    return [
+        DownsampledRow(tag_id=tag_id, time=times[i], value=values[i], quality=qualities[i])
+        for i in lttb_indices(x, y, spec.max_points).tolist()
+    ]
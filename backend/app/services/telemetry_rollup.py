@@ -0,0 +1,373 @@
+"""Rollup tiers for telemetry readings and the downsample query planner.
+
+Three tiers (1m, 1h, 1d) hold per-tag min/max/avg/last/count plus quality
+counts. On TimescaleDB they are hierarchical continuous aggregates with
+real-time aggregation, so they are always current. Elsewhere they are plain
+tables rebuilt by the ``refresh_telemetry_rollups`` task behind a per-tier
+watermark; each refresh recomputes ``LATE_DATA_WINDOW`` behind the
+watermark so late (resynced) readings are picked up.
+
+``plan_tier`` picks the coarsest tier whose bucket width divides the
+requested interval. Output buckets fully covered by that tier are read from
+it; the partial buckets at either end of the range, and anything past the
+watermark, are downsampled from raw readings, so results match a raw query.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from typing import NamedTuple
+
+from sqlalchemy import Select, and_, case, delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.core.constants import QualityFlag
+from app.models.telemetry import (
+    TelemetryReading,
+    TelemetryRollup1d,
+    TelemetryRollup1h,
+    TelemetryRollup1m,
+    TelemetryRollupMixin,
+    TelemetryRollupState,
+    uses_timescale,
+)
+from app.schemas.telemetry import DownsampleSpec
+from app.services.telemetry_downsample import (
+    DownsampledRow,
+    DownsampleEngine,
+    bucket_expr,
+    bucket_time,
+)
+
+ROLLUP_AGGREGATES = ("avg", "min", "max", "last", "count")
+
+LATE_DATA_WINDOW = timedelta(hours=2)
+
+# pg_advisory_xact_lock key serialising table-backed refreshes
+ROLLUP_REFRESH_LOCK_ID = 0x726F6C6C
+
+
+class RollupTier(NamedTuple):
+    name: str
+    interval: timedelta
+    model: type[TelemetryRollupMixin]
+
+
+# Coarsest first; each tier is built from the next finer one
+ROLLUP_TIERS = (
+    RollupTier("1d", timedelta(days=1), TelemetryRollup1d),
+    RollupTier("1h", timedelta(hours=1), TelemetryRollup1h),
+    RollupTier("1m", timedelta(minutes=1), TelemetryRollup1m),
+)
+
+ROLLUP_COLUMNS = (
+    "tag_id",
+    "bucket",
+    "value_min",
+    "value_max",
+    "value_avg",
+    "value_last",
+    "sample_count",
+    "good_count",
+    "uncertain_count",
+    "bad_count",
+)
+
+_VALUE_COLUMNS = {
+    "avg": "value_avg",
+    "min": "value_min",
+    "max": "value_max",
+    "last": "value_last",
+    "count": "sample_count",
+}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Raw downsample ranges are inclusive; this turns [start, head_end) into one
+_TICK = timedelta(microseconds=1)
+
+
+def plan_tier(spec: DownsampleSpec) -> RollupTier | None:
+    """Coarsest tier that answers ``spec`` exactly, or None to use raw readings."""
+    if spec.interval is None or spec.agg not in ROLLUP_AGGREGATES:
+        return None
+    for tier in ROLLUP_TIERS:
+        if spec.interval % tier.interval == timedelta(0):
+            return tier
+    return None
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _floor(value: datetime, interval: timedelta) -> datetime:
+    return _EPOCH + ((value - _EPOCH) // interval) * interval
+
+
+def _ceil(value: datetime, interval: timedelta) -> datetime:
+    floor = _floor(value, interval)
+    return floor if floor == value else floor + interval
+
+
+def _worst_quality(row) -> str:
+    if row.bad_count:
+        return QualityFlag.BAD.value
+    if row.uncertain_count:
+        return QualityFlag.UNCERTAIN.value
+    return QualityFlag.GOOD.value
+
+
+def _rollup_select(source, interval: timedelta, *where, stored: bool = False) -> Select:
+    """Aggregate raw readings or a finer tier into ``interval`` buckets.
+
+    Selects ``ROLLUP_COLUMNS``. ``value_last`` is joined back from the
+    latest source row of each bucket, which works on every backend. With
+    ``stored`` the SQLite bucket is rendered as a DateTime string so it can
+    be inserted into a tier table.
+    """
+    if source is TelemetryReading:
+        time_col, last_col = source.time, "value"
+        counted = {
+            flag: func.sum(case((source.quality == flag.value, 1), else_=0))
+            for flag in QualityFlag
+        }
+        stats = [
+            func.min(source.value).label("value_min"),
+            func.max(source.value).label("value_max"),
+            func.avg(source.value).label("value_avg"),
+            func.count().label("sample_count"),
+            counted[QualityFlag.GOOD].label("good_count"),
+            counted[QualityFlag.UNCERTAIN].label("uncertain_count"),
+            counted[QualityFlag.BAD].label("bad_count"),
+        ]
+    else:
+        time_col, last_col = source.bucket, "value_last"
+        stats = [
+            func.min(source.value_min).label("value_min"),
+            func.max(source.value_max).label("value_max"),
+            (
+                func.sum(source.value_avg * source.sample_count) / func.sum(source.sample_count)
+            ).label("value_avg"),
+            func.sum(source.sample_count).label("sample_count"),
+            func.sum(source.good_count).label("good_count"),
+            func.sum(source.uncertain_count).label("uncertain_count"),
+            func.sum(source.bad_count).label("bad_count"),
+        ]
+
+    bucket = bucket_expr(time_col, interval)
+    if stored and settings.DB_ENGINE == "sqlite":
+        bucket = func.strftime("%Y-%m-%d %H:%M:%S.000000", bucket, "unixepoch")
+
+    grouped = (
+        select(
+            source.tag_id.label("tag_id"),
+            bucket.label("bucket"),
+            *stats,
+            func.max(time_col).label("last_time"),
+        )
+        .where(*where)
+        .group_by(source.tag_id, bucket)
+        .subquery()
+    )
+    latest = aliased(source)
+    latest_time = latest.time if source is TelemetryReading else latest.bucket
+    return select(
+        grouped.c.tag_id,
+        grouped.c.bucket,
+        grouped.c.value_min,
+        grouped.c.value_max,
+        grouped.c.value_avg,
+        getattr(latest, last_col).label("value_last"),
+        grouped.c.sample_count,
+        grouped.c.good_count,
+        grouped.c.uncertain_count,
+        grouped.c.bad_count,
+    ).join(
+        latest,
+        and_(latest.tag_id == grouped.c.tag_id, latest_time == grouped.c.last_time),
+    )
+
+
+class TelemetryRollupService:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def fetch(
+        self,
+        tag_ids: list[uuid.UUID],
+        start: datetime,
+        end: datetime,
+        spec: DownsampleSpec,
+        tier: RollupTier,
+    ) -> list[DownsampledRow]:
+        """Downsampled readings served from ``tier``, ordered by (tag_id, bucket)."""
+        start, end = _as_utc(start), _as_utc(end)
+        body_start = _ceil(start, spec.interval)
+        body_end = _floor(end, spec.interval)
+        if not uses_timescale():
+            watermark = await self._watermark(tier)
+            body_end = min(body_end, _floor(watermark, spec.interval)) if watermark else start
+
+        raw = DownsampleEngine(self.db)
+        if body_end <= body_start:
+            return await raw.fetch(tag_ids, start, end, spec)
+
+        head = []
+        if start < body_start:
+            head = await raw.fetch(tag_ids, start, body_start - _TICK, spec)
+        body = await self._fetch_tier(tag_ids, body_start, body_end, spec, tier)
+        tail = await raw.fetch(tag_ids, body_end, end, spec)
+
+        by_tag: dict[uuid.UUID, list[DownsampledRow]] = {t: [] for t in sorted(tag_ids)}
+        for row in chain(head, body, tail):
+            by_tag[row.tag_id].append(row)
+        return list(chain.from_iterable(by_tag.values()))
+
+    async def _fetch_tier(
+        self,
+        tag_ids: list[uuid.UUID],
+        start: datetime,
+        end: datetime,
+        spec: DownsampleSpec,
+        tier: RollupTier,
+    ) -> list[DownsampledRow]:
+        t = tier.model
+        where = (t.tag_id.in_(tag_ids), t.bucket >= start, t.bucket < end)
+        if spec.interval == tier.interval:
+            stmt = select(*(getattr(t, c) for c in ROLLUP_COLUMNS)).where(*where)
+        else:
+            stmt = _rollup_select(t, spec.interval, *where)
+
+        value_col = _VALUE_COLUMNS[spec.agg]
+        result = await self.db.execute(stmt.order_by("tag_id", "bucket"))
+        return [
+            DownsampledRow(
+                tag_id=row.tag_id,
+                time=bucket_time(row.bucket),
+                value=float(getattr(row, value_col)),
+                quality=_worst_quality(row),
+            )
+            for row in result
+        ]
+
+    async def _watermark(self, tier: RollupTier) -> datetime | None:
+        state = await self.db.get(TelemetryRollupState, tier.name)
+        return _as_utc(state.refreshed_until) if state else None
+
+    async def refresh(
+        self, now: datetime | None = None, since: datetime | None = None
+    ) -> dict[str, int]:
+        """Rebuild table-backed tiers up to their last complete bucket.
+
+        Each tier is recomputed from ``LATE_DATA_WINDOW`` before its watermark,
+        or from ``since`` if that is earlier, finest tier first. Returns rows
+        written per tier. On PostgreSQL concurrent refreshes queue on a
+        transaction-scoped advisory lock, so run this in its own transaction.
+        """
+        now = _as_utc(now or datetime.now(timezone.utc))
+        if settings.DB_ENGINE != "sqlite":
+            await self.db.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"), {"key": ROLLUP_REFRESH_LOCK_ID}
+            )
+        written: dict[str, int] = {}
+        source = TelemetryReading
+        for tier in reversed(ROLLUP_TIERS):
+            written[tier.name] = await self._refresh_tier(tier, source, now, since)
+            source = tier.model
+        return written
+
+    async def _refresh_tier(
+        self, tier: RollupTier, source, now: datetime, since: datetime | None
+    ) -> int:
+        time_col = source.time if source is TelemetryReading else source.bucket
+        state = await self.db.get(TelemetryRollupState, tier.name)
+        if state is not None:
+            start = _as_utc(state.refreshed_until) - LATE_DATA_WINDOW
+        else:
+            earliest = (await self.db.execute(select(func.min(time_col)))).scalar_one_or_none()
+            if earliest is None:
+                return 0
+            start = _as_utc(earliest)
+        if since is not None:
+            start = min(start, _as_utc(since))
+
+        start, end = _floor(start, tier.interval), _floor(now, tier.interval)
+        if start >= end:
+            return 0
+
+        t = tier.model
+        await self.db.execute(delete(t).where(t.bucket >= start, t.bucket < end))
+        rollup = _rollup_select(
+            source, tier.interval, time_col >= start, time_col < end, stored=True
+        )
+        result = await self.db.execute(insert(t).from_select(ROLLUP_COLUMNS, rollup))
+
+        if state is None:
+            self.db.add(TelemetryRollupState(tier=tier.name, refreshed_until=end))
+        else:
+            state.refreshed_until = end
+        await self.db.flush()
+        return result.rowcount
+
+
+def _pg_interval(value: timedelta) -> str:
+    return f"INTERVAL '{int(value.total_seconds())} seconds'"
+
+
+def continuous_aggregate_ddl() -> list[str]:
+    """Statements creating the tiers as TimescaleDB continuous aggregates.
+
+    The 1m tier aggregates ``telemetry_readings``; coarser tiers aggregate
+    the next finer tier. Must run outside a transaction.
+    """
+    statements = []
+    source = None
+    for tier in reversed(ROLLUP_TIERS):
+        width = _pg_interval(tier.interval)
+        if source is None:
+            bucket = f"time_bucket({width}, time)"
+            body = (
+                f"SELECT tag_id, {bucket} AS bucket, "
+                "min(value) AS value_min, max(value) AS value_max, avg(value) AS value_avg, "
+                "last(value, time) AS value_last, count(*) AS sample_count, "
+                + ", ".join(
+                    f"count(*) FILTER (WHERE quality = '{flag.value}') AS {column}"
+                    for flag, column in (
+                        (QualityFlag.GOOD, "good_count"),
+                        (QualityFlag.UNCERTAIN, "uncertain_count"),
+                        (QualityFlag.BAD, "bad_count"),
+                    )
+                )
+                + f" FROM {TelemetryReading.__tablename__}"
+            )
+        else:
+            # GROUP BY repeats the expression: a bare "bucket" would bind to
+            # the source column, not the output alias
+            bucket = f"time_bucket({width}, bucket)"
+            body = (
+                f"SELECT tag_id, {bucket} AS bucket, "
+                "min(value_min) AS value_min, max(value_max) AS value_max, "
+                "sum(value_avg * sample_count) / sum(sample_count) AS value_avg, "
+                "last(value_last, bucket) AS value_last, "
+                "sum(sample_count)::bigint AS sample_count, "
+                "sum(good_count)::bigint AS good_count, "
+                "sum(uncertain_count)::bigint AS uncertain_count, "
+                "sum(bad_count)::bigint AS bad_count "
+                f"FROM {source}"
+            )
+        name = tier.model.__tablename__
+        statements.append(
+            f"CREATE MATERIALIZED VIEW IF NOT EXISTS {name} "
+            "WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS "
+            f"{body} GROUP BY tag_id, {bucket} WITH NO DATA"
+        )
+        statements.append(
+            f"SELECT add_continuous_aggregate_policy('{name}', "
+            f"start_offset => {_pg_interval(LATE_DATA_WINDOW + 2 * tier.interval)}, "
+            f"end_offset => {width}, schedule_interval => {width}, if_not_exists => true)"
+        )
+        source = name
+    return statements
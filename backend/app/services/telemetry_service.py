@@ -1,10 +1,18 @@
+import math
 import uuid
+from collections.abc import AsyncIterator, Callable
 from datetime import datetime
 
-from sqlalchemy import select, text
+import numpy as np
+import orjson
+from sqlalchemy import Row, and_, column, func, select, values
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from app.core.constants import QualityFlag
+from app.core.constants import ConflictPolicy, QualityFlag
+from app.core.exceptions import ValidationException
+from app.database import on_commit
+from app.models.base import UUIDType
 from app.models.telemetry import TelemetryReading
 from app.schemas.telemetry import (
     TelemetryIngestResponse,
@@ -12,40 +20,142 @@ from app.schemas.telemetry import (
     TelemetryQueryResponse,
     TelemetryReadingResponse,
 )
+from app.services.telemetry_cache import last_value_cache
+from app.services.telemetry_downsample import (
+    DownsampledRow,
+    DownsampleEngine,
+    epoch_ms,
+    parse_downsample,
+)
+from app.services.telemetry_rollup import TelemetryRollupService, plan_tier
+from app.services.telemetry_validation import LimitBreach, TelemetryValidator
+from app.services.telemetry_writer import TelemetryBulkWriter, point_to_row
+from app.utils.telemetry_stream import (
+    MSGPACK_CONTENT_TYPES,
+    NDJSON_CONTENT_TYPES,
+    iter_msgpack_records,
+    iter_ndjson_lines,
+    record_to_row,
+)
+
+STREAM_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
 
 
 class TelemetryService:
     def __init__(self, db: AsyncSession) -> None:
         self.db = db
 
-    async def ingest(self, readings: list[TelemetryPoint]) -> TelemetryIngestResponse:
-        ingested = 0
-        rejected = 0
+    async def ingest(
+        self,
+        readings: list[TelemetryPoint],
+        on_conflict: ConflictPolicy = ConflictPolicy.ERROR,
+    ) -> TelemetryIngestResponse:
+        rows = []
         errors: list[str] = []
 
         for reading in readings:
+            if not math.isfinite(reading.value):
+                errors.append(f"Tag {reading.tag_id}: non-finite value at {reading.time}")
+                continue
+            rows.append(point_to_row(reading))
+
+        validator = TelemetryValidator(self.db)
+        rows, breaches = await validator.validate(rows)
+        result = await TelemetryBulkWriter(self.db).upsert(rows, on_conflict)
+        self._on_commit(result.written, on_conflict, validator, breaches)
+
+        return TelemetryIngestResponse(
+            ingested=result.inserted,
+            rejected=len(errors),
+            duplicates=result.duplicates,
+            limit_breaches=sum(b.count for b in breaches),
+            errors=errors,
+        )
+
+    async def ingest_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        content_type: str,
+        on_conflict: ConflictPolicy = ConflictPolicy.ERROR,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> TelemetryIngestResponse:
+        """Ingest an NDJSON or msgpack body incrementally in bounded micro-batches."""
+        items: AsyncIterator[object]
+        decode: Callable[[object], object] | None
+        if content_type in MSGPACK_CONTENT_TYPES:
+            items = iter_msgpack_records(chunks)
+            decode = None
+        elif content_type in NDJSON_CONTENT_TYPES:
+            items = iter_ndjson_lines(chunks)
+            decode = orjson.loads
+        else:
+            raise ValidationException(f"Unsupported telemetry stream type '{content_type}'")
+
+        writer = TelemetryBulkWriter(self.db)
+        validator = TelemetryValidator(self.db)
+        ingested = duplicates = rejected = 0
+        errors: list[str] = []
+        batch: list[tuple] = []
+        record_no = 0
+        # Only the newest written row and one merged breach per tag outlive a
+        # batch, so the commit hooks don't grow with the upload
+        newest: dict[uuid.UUID, tuple] = {}
+        breaches: dict[uuid.UUID, LimitBreach] = {}
+
+        async def flush(rows: list[tuple]) -> None:
+            nonlocal ingested, duplicates
+            rows, batch_breaches = await validator.validate(rows)
+            result = await writer.upsert(rows, on_conflict)
+            ingested += result.inserted
+            duplicates += result.duplicates
+            for row in result.written:
+                current = newest.get(row[0])
+                if current is None or row[1] >= current[1]:
+                    newest[row[0]] = row
+            for breach in batch_breaches:
+                current = breaches.get(breach.tag_id)
+                breaches[breach.tag_id] = breach if current is None else current.merge(breach)
+
+        async for item in items:
+            record_no += 1
             try:
-                record = TelemetryReading(
-                    tag_id=reading.tag_id,
-                    time=reading.time,
-                    value=reading.value,
-                    quality=reading.quality,
-                    raw_value=reading.raw_value,
-                    source=reading.source,
-                )
-                self.db.add(record)
-                ingested += 1
-            except Exception as e:
+                batch.append(record_to_row(decode(item) if decode else item))
+            except (ValueError, KeyError, TypeError) as e:
                 rejected += 1
-                errors.append(f"Tag {reading.tag_id}: {str(e)}")
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(f"Record {record_no}: {e}")
+                continue
 
-        if ingested > 0:
-            await self.db.flush()
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = []
+
+        await flush(batch)
+        self._on_commit(list(newest.values()), on_conflict, validator, list(breaches.values()))
 
         return TelemetryIngestResponse(
-            ingested=ingested, rejected=rejected, errors=errors
+            ingested=ingested,
+            rejected=rejected,
+            duplicates=duplicates,
+            limit_breaches=sum(b.count for b in breaches.values()),
+            errors=errors,
         )
 
+    def _on_commit(
+        self,
+        written: list[tuple],
+        on_conflict: ConflictPolicy,
+        validator: TelemetryValidator,
+        breaches: list[LimitBreach],
+    ) -> None:
+        """Update the last-value cache and send limit alerts once the batch commits."""
+        overwrite = on_conflict == ConflictPolicy.DO_UPDATE
+        if written:
+            on_commit(self.db, lambda: last_value_cache.record(written, overwrite))
+        if breaches:
+            on_commit(self.db, lambda: validator.publish(breaches))
+
     async def query(
         self,
         tag_ids: list[uuid.UUID],
@@ -53,78 +163,124 @@ class TelemetryService:
         end: datetime,
         downsample: str | None = None,
     ) -> list[TelemetryQueryResponse]:
-        results = []
-
-        for tag_id in tag_ids:
-            if downsample:
-                interval = self._parse_downsample(downsample)
-                query = text(
-                    """
-                    SELECT time_bucket(:interval, time) AS bucket,
-                           tag_id,
-                           avg(value) AS value,
-                           mode() WITHIN GROUP (ORDER BY quality) AS quality
-                    FROM telemetry_readings
-                    WHERE tag_id = :tag_id AND time >= :start AND time <= :end
-                    GROUP BY bucket, tag_id
-                    ORDER BY bucket
-                    """
-                )
-                result = await self.db.execute(
-                    query,
-                    {"interval": interval, "tag_id": str(tag_id), "start": start, "end": end},
-                )
-                rows = result.fetchall()
-                readings = [
-                    TelemetryReadingResponse(
-                        tag_id=tag_id,
-                        time=row.bucket,
-                        value=row.value,
-                        quality=row.quality,
-                        raw_value=None,
-                        source=None,
-                    )
-                    for row in rows
-                ]
-            else:
-                result = await self.db.execute(
-                    select(TelemetryReading)
-                    .where(
-                        TelemetryReading.tag_id == tag_id,
-                        TelemetryReading.time >= start,
-                        TelemetryReading.time <= end,
-                    )
-                    .order_by(TelemetryReading.time)
-                )
-                rows = result.scalars().all()
-                readings = [TelemetryReadingResponse.model_validate(r) for r in rows]
+        # One statement for all tags; rows are partitioned per tag in Python
+        by_tag: dict[uuid.UUID, list[TelemetryReadingResponse]] = {t: [] for t in tag_ids}
+        for row in await self._fetch(tag_ids, start, end, downsample):
+            by_tag[row.tag_id].append(TelemetryReadingResponse.model_validate(row))
 
-            results.append(
-                TelemetryQueryResponse(tag_id=tag_id, readings=readings, count=len(readings))
+        return [
+            TelemetryQueryResponse(tag_id=tag_id, readings=readings, count=len(readings))
+            for tag_id, readings in by_tag.items()
+        ]
+
+    async def query_columns(
+        self,
+        tag_ids: list[uuid.UUID],
+        start: datetime,
+        end: datetime,
+        downsample: str | None = None,
+    ) -> list[dict]:
+        """Columnar variant of ``query``: one set of parallel arrays per tag.
+
+        ``time`` is epoch milliseconds (int64), ``value`` float64, ``quality``
+        a list of flags. Arrays are NumPy and meant to be serialised with
+        ``orjson.OPT_SERIALIZE_NUMPY``; no per-reading model is built.
+        """
+        rows = await self._fetch(tag_ids, start, end, downsample)
+        columns = {
+            tag_id: {
+                "tag_id": tag_id,
+                "count": 0,
+                "time": np.empty(0, dtype=np.int64),
+                "value": np.empty(0, dtype=np.float64),
+                "quality": [],
+            }
+            for tag_id in tag_ids
+        }
+        if not rows:
+            return list(columns.values())
+
+        tag_col, time_col, value_col, quality_col = list(zip(*rows, strict=True))[:4]
+        tags = np.array(tag_col, dtype=object)
+        times = epoch_ms(time_col)
+        values = np.array(value_col, dtype=np.float64)
+
+        # Rows arrive ordered by tag_id, so each tag is one contiguous slice
+        bounds = np.concatenate(([0], np.flatnonzero(tags[1:] != tags[:-1]) + 1, [len(tags)]))
+        for lo, hi in zip(bounds[:-1], bounds[1:], strict=True):
+            columns[tags[lo]].update(
+                count=int(hi - lo),
+                time=times[lo:hi],
+                value=values[lo:hi],
+                quality=list(quality_col[lo:hi]),
             )
+        return list(columns.values())
 
-        return results
+    async def _fetch(
+        self,
+        tag_ids: list[uuid.UUID],
+        start: datetime,
+        end: datetime,
+        downsample: str | None,
+    ) -> list[Row] | list[DownsampledRow]:
+        """Readings for all tags in one statement, ordered by (tag_id, time)."""
+        if downsample:
+            spec = parse_downsample(downsample)
+            # Serve from the coarsest rollup tier that can answer the request
+            tier = plan_tier(spec)
+            if tier is not None:
+                return await TelemetryRollupService(self.db).fetch(tag_ids, start, end, spec, tier)
+            return await DownsampleEngine(self.db).fetch(tag_ids, start, end, spec)
 
-    async def get_latest(self, tag_id: uuid.UUID) -> TelemetryReadingResponse | None:
         result = await self.db.execute(
-            select(TelemetryReading)
-            .where(TelemetryReading.tag_id == tag_id)
-            .order_by(TelemetryReading.time.desc())
-            .limit(1)
+            select(
+                TelemetryReading.tag_id,
+                TelemetryReading.time,
+                TelemetryReading.value,
+                TelemetryReading.quality,
+                TelemetryReading.raw_value,
+                TelemetryReading.source,
+            )
+            .where(
+                TelemetryReading.tag_id.in_(tag_ids),
+                TelemetryReading.time >= start,
+                TelemetryReading.time <= end,
+            )
+            .order_by(TelemetryReading.tag_id, TelemetryReading.time)
         )
-        reading = result.scalar_one_or_none()
-        if reading is None:
-            return None
-        return TelemetryReadingResponse.model_validate(reading)
-
-    @staticmethod
-    def _parse_downsample(downsample: str) -> str:
-        mapping = {
-            "1m": "1 minute",
-            "5m": "5 minutes",
-            "15m": "15 minutes",
-            "1h": "1 hour",
-            "6h": "6 hours",
-            "1d": "1 day",
-        }
-        return mapping.get(downsample, "5 minutes")
+        return list(result.all())
+
+    async def get_latest(self, tag_id: uuid.UUID) -> TelemetryReadingResponse | None:
+        return (await self.get_latest_many([tag_id]))[tag_id]
+
+    async def get_latest_many(
+        self, tag_ids: list[uuid.UUID]
+    ) -> dict[uuid.UUID, TelemetryReadingResponse | None]:
+        """Newest reading per tag (None if a tag has none), served from the last-value cache.
+
+        Only cold misses reach the database, all in one statement.
+        """
+        latest, missing = await last_value_cache.lookup(tag_ids)
+        if missing:
+            r, inner = TelemetryReading, aliased(TelemetryReading)
+            ids = (
+                values(column("tag_id", UUIDType), name="ids")
+                .data([(t,) for t in missing])
+                .cte()
+            )
+            # One max(time) index probe per tag, then a primary-key join
+            newest = (
+                select(func.max(inner.time)).where(inner.tag_id == ids.c.tag_id).scalar_subquery()
+            )
+            keys = select(ids.c.tag_id, newest.label("time")).subquery()
+            result = await self.db.execute(
+                select(r.tag_id, r.time, r.value, r.quality, r.raw_value, r.source).join(
+                    keys, and_(r.tag_id == keys.c.tag_id, r.time == keys.c.time)
+                )
+            )
+            fetched = [TelemetryReadingResponse.model_validate(row) for row in result]
+            found = {reading.tag_id for reading in fetched}
+            await last_value_cache.store(fetched, empty=[t for t in missing if t not in found])
+            latest.update({t: None for t in missing})
+            latest.update({reading.tag_id: reading for reading in fetched})
+        return latest
@@ -0,0 +1,172 @@
+"""Limit validation on the telemetry write path.
+
+``TagLimitIndex`` holds every active tag's low/high limits in flat NumPy
+arrays, rebuilt from the process-wide ``TagRegistry`` whenever the registry
+changes, so validation never looks tags up row by row.
+``TelemetryValidator`` range-checks a whole batch with array operations,
+downgrades GOOD readings outside their tag's limits to UNCERTAIN and
+summarises breaches per tag for alerting.
+"""
+
+import uuid
+from collections.abc import Iterable
+from datetime import datetime
+from typing import NamedTuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import QualityFlag
+from app.core.logging import get_logger
+from app.services.notifications import NotificationService
+from app.services.tag_registry import TagRegistry, tag_registry
+
+logger = get_logger(__name__)
+
+ALERT_CHANNEL = "alerts:telemetry"
+
+
+class LimitBreach(NamedTuple):
+    tag_id: uuid.UUID
+    tag_name: str
+    count: int
+    min_value: float
+    max_value: float
+    low_limit: float | None
+    high_limit: float | None
+    first_time: datetime
+
+    def merge(self, other: "LimitBreach") -> "LimitBreach":
+        """Combine two breaches of the same tag, keeping the later limits."""
+        return other._replace(
+            count=self.count + other.count,
+            min_value=min(self.min_value, other.min_value),
+            max_value=max(self.max_value, other.max_value),
+            first_time=min(self.first_time, other.first_time),
+        )
+
+
+class TagLimitIndex:
+    """Tag limits as parallel arrays; the last slot is a NaN sentinel for unknown tags."""
+
+    def __init__(self, registry: TagRegistry = tag_registry) -> None:
+        self.registry = registry
+        self.clear()
+
+    def clear(self) -> None:
+        self._positions: dict[uuid.UUID, int] = {}
+        self.names: list[str] = []
+        self.low = np.array([np.nan])
+        self.high = np.array([np.nan])
+        self._version: int | None = None
+
+    async def ensure(self, db: AsyncSession, tag_ids: Iterable[uuid.UUID]) -> None:
+        """Make sure ``tag_ids`` are in the registry, rebuilding the arrays if it changed."""
+        await self.registry.ensure(db, tag_ids)
+        if self._version != self.registry.version:
+            self._rebuild()
+
+    def positions(self, tag_ids: Iterable[uuid.UUID], count: int) -> np.ndarray:
+        sentinel = len(self.names)
+        get = self._positions.get
+        return np.fromiter((get(t, sentinel) for t in tag_ids), dtype=np.intp, count=count)
+
+    def _rebuild(self) -> None:
+        infos = list(self.registry.entries().values())
+        self._positions = {info.id: i for i, info in enumerate(infos)}
+        self.names = [info.name for info in infos]
+        limits = np.array(
+            [(info.low_limit, info.high_limit) for info in infos], dtype=np.float64
+        ).reshape(-1, 2)
+        self.low = np.append(limits[:, 0], np.nan)
+        self.high = np.append(limits[:, 1], np.nan)
+        self._version = self.registry.version
+
+
+tag_limit_index = TagLimitIndex()
+
+_notifications: NotificationService | None = None
+
+
+class TelemetryValidator:
+    def __init__(self, db: AsyncSession, index: TagLimitIndex = tag_limit_index) -> None:
+        self.db = db
+        self.index = index
+
+    async def validate(self, rows: list[tuple]) -> tuple[list[tuple], list[LimitBreach]]:
+        """Range-check ``TELEMETRY_COLUMNS``-ordered rows against their tag limits.
+
+        Returns the rows with out-of-limit GOOD readings marked UNCERTAIN, and
+        one ``LimitBreach`` per tag that breached. Readings for unknown tags,
+        or tags without limits, pass through unchanged.
+        """
+        if not rows:
+            return rows, []
+        await self.index.ensure(self.db, (row[0] for row in rows))
+
+        positions = self.index.positions((row[0] for row in rows), len(rows))
+        values = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+        # NaN limits compare False, so missing limits never breach
+        breached = np.flatnonzero(
+            (values < self.index.low[positions]) | (values > self.index.high[positions])
+        )
+        if breached.size == 0:
+            return rows, []
+
+        rows = list(rows)
+        by_tag: dict[int, list[int]] = {}
+        for i in breached.tolist():
+            row = rows[i]
+            if row[3] == QualityFlag.GOOD.value:
+                rows[i] = (*row[:3], QualityFlag.UNCERTAIN.value, *row[4:])
+            by_tag.setdefault(int(positions[i]), []).append(i)
+
+        breaches = []
+        for position, indices in by_tag.items():
+            tag_values = values[indices]
+            low, high = self.index.low[position], self.index.high[position]
+            breaches.append(
+                LimitBreach(
+                    tag_id=rows[indices[0]][0],
+                    tag_name=self.index.names[position],
+                    count=len(indices),
+                    min_value=float(tag_values.min()),
+                    max_value=float(tag_values.max()),
+                    low_limit=None if np.isnan(low) else float(low),
+                    high_limit=None if np.isnan(high) else float(high),
+                    first_time=min(rows[i][1] for i in indices),
+                )
+            )
+        return rows, breaches
+
+    async def publish(self, breaches: list[LimitBreach]) -> None:
+        """Log and publish one alert event per breaching tag."""
+        global _notifications
+        if not breaches:
+            return
+        if _notifications is None:
+            _notifications = NotificationService()
+
+        for breach in breaches:
+            logger.warning(
+                "telemetry_limit_breach",
+                tag_id=str(breach.tag_id),
+                tag_name=breach.tag_name,
+                count=breach.count,
+                min_value=breach.min_value,
+                max_value=breach.max_value,
+            )
+            await _notifications.publish_alert(
+                ALERT_CHANNEL,
+                {
+                    "type": "limit_breach",
+                    "tag_id": str(breach.tag_id),
+                    "tag_name": breach.tag_name,
+                    "count": breach.count,
+                    "min_value": breach.min_value,
+                    "max_value": breach.max_value,
+                    "low_limit": breach.low_limit,
+                    "high_limit": breach.high_limit,
+                    "first_time": breach.first_time.isoformat(),
+                },
+            )
@@ -0,0 +1,181 @@
+"""Bulk write path for telemetry readings.
+
+PostgreSQL/asyncpg streams batches with binary ``COPY ... FROM STDIN``;
+SQLite falls back to a single ``executemany`` core insert. Both skip the ORM
+unit of work entirely, so per-row cost is just encoding.
+
+Conflict-tolerant writes load the batch into a session-local staging table
+and resolve duplicates against ``telemetry_readings`` with one
+``INSERT ... SELECT ... ON CONFLICT`` statement.
+"""
+
+from typing import NamedTuple
+
+from sqlalchemy import Boolean, Column, MetaData, Table, column, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.constants import ConflictPolicy
+from app.models.telemetry import TelemetryReading
+from app.schemas.telemetry import TelemetryPoint
+
+TELEMETRY_COLUMNS = ("tag_id", "time", "value", "quality", "raw_value", "source")
+
+_STAGING_TABLE = "telemetry_staging"
+
+# Core mirror of the staging table so executemany gets the same type
+# processing (GUID, DateTime) as the target table.
+_staging = Table(
+    _STAGING_TABLE,
+    MetaData(),
+    *(Column(c.name, c.type) for c in TelemetryReading.__table__.columns),
+)
+
+_column_list = ", ".join(TELEMETRY_COLUMNS)
+
+_CONFLICT_ACTIONS = {
+    ConflictPolicy.DO_NOTHING: "DO NOTHING",
+    ConflictPolicy.DO_UPDATE: (
+        "DO UPDATE SET value = excluded.value, quality = excluded.quality, "
+        "raw_value = excluded.raw_value, source = excluded.source"
+    ),
+}
+
+
+class UpsertResult(NamedTuple):
+    inserted: int
+    duplicates: int
+    # Rows as stored, including overwritten ones; skipped duplicates are absent
+    written: list[tuple]
+
+
+def point_to_row(point: TelemetryPoint) -> tuple:
+    """Flatten a validated point into a ``TELEMETRY_COLUMNS``-ordered tuple."""
+    return (
+        point.tag_id,
+        point.time,
+        point.value,
+        point.quality.value,
+        point.raw_value,
+        point.source,
+    )
+
+
+class TelemetryBulkWriter:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def write(self, rows: list[tuple]) -> int:
+        """Write ``TELEMETRY_COLUMNS``-ordered tuples and return the row count.
+
+        Any duplicate ``(tag_id, time)`` aborts the whole batch.
+        """
+        if not rows:
+            return 0
+        await self._load(TelemetryReading.__table__, rows)
+        return len(rows)
+
+    async def upsert(self, rows: list[tuple], policy: ConflictPolicy) -> UpsertResult:
+        """Write rows, resolving ``(tag_id, time)`` conflicts per ``policy``.
+
+        Duplicates are keys already present in the table or repeated within
+        the batch; under ``DO_UPDATE`` the stored reading is overwritten, under
+        ``DO_NOTHING`` it is kept and left out of ``written``. Keys repeated
+        within the batch resolve the same way: the last reading wins under
+        ``DO_UPDATE``, the first under ``DO_NOTHING``.
+
+        Counts come from the insert itself, so concurrent writers to the same
+        keys can't skew them.
+        """
+        if policy == ConflictPolicy.ERROR:
+            return UpsertResult(await self.write(rows), 0, rows)
+        if not rows:
+            return UpsertResult(0, 0, [])
+
+        unique: dict[tuple, tuple] = {}
+        for row in rows:
+            if policy == ConflictPolicy.DO_UPDATE:
+                unique[row[0], row[1]] = row
+            else:
+                unique.setdefault((row[0], row[1]), row)
+
+        await self._prepare_staging()
+        await self._load(_staging, list(unique.values()))
+
+        if policy == ConflictPolicy.DO_NOTHING:
+            written = await self._insert_staged(policy)
+            return UpsertResult(len(written), len(rows) - len(written), written)
+
+        if settings.DB_ENGINE == "sqlite":
+            # SQLite serialises writers, so this count and the insert below
+            # see the same table
+            stored = await self.db.execute(
+                text(
+                    f"SELECT count(*) FROM {_STAGING_TABLE} s "
+                    "JOIN telemetry_readings t ON t.tag_id = s.tag_id AND t.time = s.time"
+                )
+            )
+            inserted = len(unique) - stored.scalar_one()
+            written = await self._insert_staged(policy)
+        else:
+            # xmax is 0 only on row versions the insert created, not on updated ones
+            result = await self._insert_staged(policy, returning_inserted=True)
+            inserted = sum(row[-1] for row in result)
+            written = [row[:-1] for row in result]
+        return UpsertResult(inserted, len(rows) - inserted, written)
+
+    async def _insert_staged(
+        self, policy: ConflictPolicy, returning_inserted: bool = False
+    ) -> list[tuple]:
+        returning = [_staging.c[name] for name in TELEMETRY_COLUMNS]
+        if returning_inserted:
+            returning.append(column("inserted", Boolean))
+        result = await self.db.execute(
+            text(
+                f"INSERT INTO telemetry_readings ({_column_list}) "
+                f"SELECT {_column_list} FROM {_STAGING_TABLE} WHERE true "
+                f"ON CONFLICT (tag_id, time) {_CONFLICT_ACTIONS[policy]} "
+                f"RETURNING {_column_list}"
+                + (", (xmax = 0) AS inserted" if returning_inserted else "")
+            ).columns(*returning)
+        )
+        return [tuple(row) for row in result]
+
+    async def _prepare_staging(self) -> None:
+        if settings.DB_ENGINE == "sqlite":
+            await self.db.execute(
+                text(
+                    f"CREATE TEMP TABLE IF NOT EXISTS {_STAGING_TABLE} AS "
+                    "SELECT * FROM telemetry_readings WHERE 0"
+                )
+            )
+            await self.db.execute(text(f"DELETE FROM {_STAGING_TABLE}"))
+        else:
+            await self.db.execute(
+                text(
+                    f"CREATE TEMP TABLE IF NOT EXISTS {_STAGING_TABLE} "
+                    "(LIKE telemetry_readings INCLUDING DEFAULTS)"
+                )
+            )
+            await self.db.execute(text(f"TRUNCATE {_STAGING_TABLE}"))
+
+    async def _load(self, table: Table, rows: list[tuple]) -> None:
+        if settings.DB_ENGINE == "sqlite":
+            await self._executemany(table, rows)
+        else:
+            await self._copy(table.name, rows)
+
+    async def _copy(self, table_name: str, rows: list[tuple]) -> None:
+        conn = await self.db.connection()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table_name,
+            records=rows,
+            columns=list(TELEMETRY_COLUMNS),
+        )
+
+    async def _executemany(self, table: Table, rows: list[tuple]) -> None:
+        await self.db.execute(
+            insert(table),
+            [dict(zip(TELEMETRY_COLUMNS, row, strict=True)) for row in rows],
+        )
@@ -0,0 +1,94 @@
+"""Incremental decoders for streamed telemetry uploads.
+
+Records are decoded one at a time from the request body and converted
+straight to ``TELEMETRY_COLUMNS``-ordered tuples, skipping pydantic model
+construction on the hot path.
+"""
+
+import math
+import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+
+import msgpack
+
+from app.core.constants import QualityFlag
+from app.core.exceptions import ValidationException
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack")
+
+_QUALITY_VALUES = {q.value for q in QualityFlag}
+
+
+def _parse_time(value: object) -> datetime:
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    elif isinstance(value, str):
+        parsed = datetime.fromisoformat(value)
+    else:
+        raise ValueError(f"invalid time {value!r}")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def record_to_row(record: object) -> tuple:
+    """Validate a decoded point and return it as a row tuple.
+
+    Mirrors ``TelemetryPoint`` validation; raises ``ValueError`` (or
+    ``KeyError``/``TypeError``) for malformed records.
+    """
+    if not isinstance(record, dict):
+        raise TypeError(f"expected an object, got {type(record).__name__}")
+    source = record.get("source")
+    if source is not None and not isinstance(source, str):
+        raise TypeError(f"invalid source {source!r}")
+    quality = record.get("quality", QualityFlag.GOOD.value)
+    if quality not in _QUALITY_VALUES:
+        raise ValueError(f"invalid quality {quality!r}")
+    value = float(record["value"])
+    if not math.isfinite(value):
+        raise ValueError("non-finite value")
+    raw_value = record.get("raw_value")
+    return (
+        uuid.UUID(str(record["tag_id"])),
+        _parse_time(record["time"]),
+        value,
+        quality,
+        float(raw_value) if raw_value is not None else None,
+        source,
+    )
+
+
+async def iter_ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Yield each non-empty line of an NDJSON byte stream, undecoded.
+
+    Decoding is left to the caller so one malformed line can be rejected
+    without abandoning the rest of the stream.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+async def iter_msgpack_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[object]:
+    """Yield objects from a stream of concatenated msgpack values.
+
+    A corrupt stream cannot be resynchronised, so it fails the whole upload
+    with ``ValidationException`` rather than one record.
+    """
+    unpacker = msgpack.Unpacker(raw=False, timestamp=3)
+    try:
+        async for chunk in chunks:
+            unpacker.feed(chunk)
+            for record in unpacker:
+                yield record
+    except (msgpack.UnpackException, ValueError) as e:
+        raise ValidationException(f"Malformed msgpack stream: {e}") from e
@@ -36,6 +36,14 @@ celery_app.conf.beat_schedule = {
         "task": "app.workers.telemetry_tasks.check_stale_tags",
         "schedule": crontab(minute="*/5"),
     },
+    "noisy-sensor-sweep": {
+        "task": "app.workers.telemetry_tasks.sweep_noisy_sensors",
+        "schedule": crontab(minute=settings.NOISY_SENSOR_SWEEP_MINUTE),
+    },
+    "telemetry-rollup-refresh": {
+        "task": "app.workers.telemetry_tasks.refresh_telemetry_rollups",
+        "schedule": crontab(minute="*"),
+    },
     "monthly-compliance-report": {
         "task": "app.workers.report_tasks.generate_monthly_compliance",
         "schedule": crontab(day_of_month=1, hour=6, minute=0),
@@ -1,18 +1,34 @@
 import asyncio
 from datetime import datetime, timedelta, timezone
 
-from app.workers.celery_app import celery_app
+from celery import chord
+
 from app.core.logging import get_logger
+from app.workers.celery_app import celery_app
 
 logger = get_logger(__name__)
 
 
 @celery_app.task(name="app.workers.reconciliation_tasks.run_daily_reconciliation")
 def run_daily_reconciliation() -> dict:
-    return asyncio.get_event_loop().run_until_complete(_run_daily_reconciliation())
+    """Fan yesterday's reconciliation out as one task per asset partition.
+
+    A chord callback rolls the partitions up into the parent run, so each
+    task stays well inside the time limit however many terminals there are.
+    If a partition fails or times out, the parent is marked FAILED instead.
+    """
+    run_id, asset_ids = asyncio.get_event_loop().run_until_complete(
+        _start_daily_reconciliation()
+    )
+    chord(reconcile_partition.s(run_id, asset_id) for asset_id in asset_ids)(
+        finish_partitioned_reconciliation.s(run_id).on_error(
+            fail_partitioned_reconciliation.s(run_id)
+        )
+    )
+    return {"run_id": run_id, "partitions": len(asset_ids)}
 
 
-async def _run_daily_reconciliation() -> dict:
+async def _start_daily_reconciliation() -> tuple[str, list[str | None]]:
     from app.database import async_session_factory
     from app.services.reconciliation_service import ReconciliationService
 
@@ -22,19 +38,87 @@ async def _run_daily_reconciliation() -> dict:
 
     async with async_session_factory() as session:
         service = ReconciliationService(session)
-        run = await service.trigger_reconciliation(
+        run, asset_ids = await service.start_partitioned_run(
             name=f"Daily Reconciliation {period_start.date()}",
             period_start=period_start,
             period_end=period_end,
         )
         await session.commit()
+        return str(run.id), [str(a) if a else None for a in asset_ids]
+
+
+@celery_app.task(name="app.workers.reconciliation_tasks.reconcile_partition")
+def reconcile_partition(run_id: str, asset_id: str | None) -> dict:
+    return asyncio.get_event_loop().run_until_complete(_reconcile_partition(run_id, asset_id))
+
+
+async def _reconcile_partition(run_id: str, asset_id: str | None) -> dict:
+    import uuid
+
+    from app.database import async_session_factory
+    from app.services.reconciliation_service import ReconciliationService
+
+    async with async_session_factory() as session:
+        service = ReconciliationService(session, session_factory=async_session_factory)
+        partition = await service.reconcile_partition(
+            uuid.UUID(run_id), uuid.UUID(asset_id) if asset_id else None
+        )
+        await session.commit()
+        return {
+            "run_id": str(partition.id),
+            "asset_id": asset_id,
+            "status": partition.status,
+            "node_timings_s": service.node_timings,
+        }
+
+
+@celery_app.task(name="app.workers.reconciliation_tasks.finish_partitioned_reconciliation")
+def finish_partitioned_reconciliation(partitions: list[dict], run_id: str) -> dict:
+    return asyncio.get_event_loop().run_until_complete(
+        _finish_partitioned_reconciliation(partitions, run_id)
+    )
+
+
+async def _finish_partitioned_reconciliation(partitions: list[dict], run_id: str) -> dict:
+    import uuid
+
+    from app.database import async_session_factory
+    from app.services.reconciliation_service import ReconciliationService
+
+    async with async_session_factory() as session:
+        run = await ReconciliationService(session).finish_partitioned_run(uuid.UUID(run_id))
+        await session.commit()
 
         logger.info(
             "daily_reconciliation_complete",
-            run_id=str(run.id),
+            run_id=run_id,
             status=run.status,
+            partitions=partitions,
         )
-        return {"run_id": str(run.id), "status": run.status}
+        return {"run_id": run_id, "status": run.status, "partitions": partitions}
+
+
+@celery_app.task(name="app.workers.reconciliation_tasks.fail_partitioned_reconciliation")
+def fail_partitioned_reconciliation(request, exc: Exception, traceback: str, run_id: str) -> None:
+    """Chord error callback: a partition raised, so the parent won't be finished."""
+    logger.error(
+        "daily_reconciliation_failed",
+        run_id=run_id,
+        task_id=request.id,
+        error=str(exc),
+    )
+    asyncio.get_event_loop().run_until_complete(_fail_partitioned_reconciliation(run_id))
+
+
+async def _fail_partitioned_reconciliation(run_id: str) -> None:
+    import uuid
+
+    from app.database import async_session_factory
+    from app.services.reconciliation_service import ReconciliationService
+
+    async with async_session_factory() as session:
+        await ReconciliationService(session).fail_partitioned_run(uuid.UUID(run_id))
+        await session.commit()
 
 
 @celery_app.task(name="app.workers.reconciliation_tasks.run_reconciliation")
@@ -45,9 +129,12 @@ def run_reconciliation(
     asset_id: str | None = None,
     tolerance_pct: float = 1.5,
     triggered_by_id: str | None = None,
+    incremental: bool = False,
 ) -> dict:
     return asyncio.get_event_loop().run_until_complete(
-        _run_reconciliation(name, period_start, period_end, asset_id, tolerance_pct, triggered_by_id)
+        _run_reconciliation(
+            name, period_start, period_end, asset_id, tolerance_pct, triggered_by_id, incremental
+        )
     )
 
 
@@ -58,8 +145,10 @@ async def _run_reconciliation(
     asset_id: str | None,
     tolerance_pct: float,
     triggered_by_id: str | None,
+    incremental: bool = False,
 ) -> dict:
     import uuid
+
     from app.database import async_session_factory
     from app.services.reconciliation_service import ReconciliationService
 
@@ -67,7 +156,7 @@ async def _run_reconciliation(
     period_end = datetime.fromisoformat(period_end_str)
 
     async with async_session_factory() as session:
-        service = ReconciliationService(session)
+        service = ReconciliationService(session, session_factory=async_session_factory)
         run = await service.trigger_reconciliation(
             name=name,
             period_start=period_start,
@@ -75,6 +164,11 @@ async def _run_reconciliation(
             asset_id=uuid.UUID(asset_id) if asset_id else None,
             tolerance_threshold_pct=tolerance_pct,
             triggered_by_id=uuid.UUID(triggered_by_id) if triggered_by_id else None,
+            incremental=incremental,
         )
         await session.commit()
-        return {"run_id": str(run.id), "status": run.status}
+        return {
+            "run_id": str(run.id),
+            "status": run.status,
+            "node_timings_s": service.node_timings,
+        }
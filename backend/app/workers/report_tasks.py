@@ -30,6 +30,8 @@ async def _generate_monthly_compliance() -> dict:
             period_end=period_end,
             generated_by_id=None,  # System-generated
             file_format="PDF",
+            # An unchanged period keeps its existing report instead of a re-render
+            reuse_existing=True,
         )
         await session.commit()
 
@@ -37,8 +39,10 @@ async def _generate_monthly_compliance() -> dict:
             "monthly_compliance_generated",
             report_id=str(report.id),
             period=period_start.strftime("%Y-%m"),
+            version=report.version,
+            file_url=report.file_url,
         )
-        return {"report_id": str(report.id), "status": report.status}
+        return {"report_id": str(report.id), "status": report.status, "version": report.version}
 
 
 @celery_app.task(name="app.workers.report_tasks.generate_report")
@@ -79,4 +83,22 @@ async def _generate_report(
             file_format=file_format,
         )
         await session.commit()
-        return {"report_id": str(report.id), "status": report.status}
+        return {"report_id": str(report.id), "status": report.status, "file_url": report.file_url}
+
+
+@celery_app.task(name="app.workers.report_tasks.render_report")
+def render_report(report_id: str) -> dict:
+    return asyncio.get_event_loop().run_until_complete(_render_report(report_id))
+
+
+async def _render_report(report_id: str) -> dict:
+    import uuid
+
+    from app.database import async_session_factory
+    from app.services.compliance_service import ComplianceService
+
+    async with async_session_factory() as session:
+        report = await ComplianceService(session).render_report(uuid.UUID(report_id))
+        await session.commit()
+        logger.info("compliance_report_rendered", report_id=report_id, version=report.version)
+        return {"report_id": report_id, "status": report.status, "file_url": report.file_url}
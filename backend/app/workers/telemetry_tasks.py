@@ -1,8 +1,11 @@
 import asyncio
 from datetime import datetime, timedelta, timezone
 
-from app.workers.celery_app import celery_app
+import numpy as np
+
+from app.config import settings
 from app.core.logging import get_logger
+from app.workers.celery_app import celery_app
 
 logger = get_logger(__name__)
 
@@ -13,48 +16,168 @@ def check_stale_tags() -> dict:
 
 
 async def _check_stale_tags() -> dict:
-    from sqlalchemy import select, func
+    import time
+
+    from sqlalchemy import func, select, update
+
+    from app.core.constants import QualityFlag
     from app.database import async_session_factory
     from app.models.asset import Tag
     from app.models.telemetry import TelemetryReading
-    from app.core.constants import QualityFlag
 
+    started = time.perf_counter()
     stale_threshold = datetime.now(timezone.utc) - timedelta(minutes=10)
-    flagged_count = 0
+    candidates = (Tag.deleted_at.is_(None), Tag.quality_flag != QualityFlag.BAD)
+    # One max(time) index probe per tag, evaluated inside a single statement
+    last_reading = (
+        select(func.max(TelemetryReading.time))
+        .where(TelemetryReading.tag_id == Tag.id)
+        .scalar_subquery()
+    )
 
     async with async_session_factory() as session:
-        # Find tags with no recent readings
+        checked_count = (
+            await session.execute(select(func.count()).select_from(Tag).where(*candidates))
+        ).scalar_one()
+
+        # Tags that never reported are left alone, as before
         result = await session.execute(
-            select(Tag).where(Tag.deleted_at.is_(None), Tag.quality_flag != QualityFlag.BAD)
+            update(Tag)
+            .where(*candidates, last_reading < stale_threshold)
+            .values(quality_flag=QualityFlag.BAD)
+            .returning(Tag.id, Tag.name, last_reading.label("last_reading"))
+            .execution_options(synchronize_session=False)
+        )
+        flagged = result.all()
+        await session.commit()
+
+    for tag in flagged:
+        logger.warning(
+            "stale_tag_flagged",
+            tag_id=str(tag.id),
+            tag_name=tag.name,
+            last_reading=str(tag.last_reading),
         )
-        tags = result.scalars().all()
 
-        for tag in tags:
-            latest = await session.execute(
-                select(func.max(TelemetryReading.time)).where(
-                    TelemetryReading.tag_id == tag.id
-                )
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(
+        "stale_tag_check_complete",
+        checked_count=checked_count,
+        flagged_count=len(flagged),
+        elapsed_ms=elapsed_ms,
+    )
+    return {
+        "checked_count": checked_count,
+        "flagged_count": len(flagged),
+        "elapsed_ms": elapsed_ms,
+    }
+
+
+# A tag is noisy when its windowed stddev exceeds 3% of |mean| (3σ at 1% of reading)
+NOISE_STDDEV_RATIO = 3 * 0.01
+
+# Keeps bulk UPDATE ... IN (...) under driver bind-parameter limits
+UPDATE_CHUNK_SIZE = 10_000
+
+
+def noisy_sensor_stats(
+    counts: np.ndarray, sums: np.ndarray, sums_sq: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized noise rule over per-tag (count, sum, sum of squares).
+
+    Returns ``(mean, sample stddev, noisy mask)``; tags with fewer than two
+    readings are never noisy.
+    """
+    counts = counts.astype(np.float64)
+    mean = sums / counts
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = (sums_sq - sums * mean) / (counts - 1)
+    std = np.sqrt(np.clip(np.nan_to_num(variance), 0.0, None))
+    noisy = (counts > 1) & (std > NOISE_STDDEV_RATIO * np.abs(mean))
+    return mean, std, noisy
+
+
+@celery_app.task(name="app.workers.telemetry_tasks.sweep_noisy_sensors")
+def sweep_noisy_sensors(window_minutes: int | None = None) -> dict:
+    return asyncio.get_event_loop().run_until_complete(
+        _sweep_noisy_sensors(window_minutes or settings.NOISY_SENSOR_WINDOW_MINUTES)
+    )
+
+
+async def _sweep_noisy_sensors(window_minutes: int, tag_ids: list | None = None) -> dict:
+    """Flag every GOOD tag whose readings over the window are noisy as UNCERTAIN.
+
+    One grouped query computes count/sum/sum-of-squares for all tags, the
+    rule is applied with NumPy, and flagged tags are updated in bulk.
+    """
+    import time
+
+    from sqlalchemy import func, select, update
+
+    from app.core.constants import QualityFlag
+    from app.database import async_session_factory
+    from app.models.asset import Tag
+    from app.models.telemetry import TelemetryReading
+
+    started = time.perf_counter()
+    window_start = datetime.now(timezone.utc) - timedelta(minutes=window_minutes)
+    r = TelemetryReading
+    stmt = (
+        select(r.tag_id, func.count(), func.sum(r.value), func.sum(r.value * r.value))
+        .join(Tag, Tag.id == r.tag_id)
+        .where(
+            Tag.deleted_at.is_(None),
+            Tag.quality_flag == QualityFlag.GOOD,
+            r.time >= window_start,
+        )
+        .group_by(r.tag_id)
+    )
+    if tag_ids is not None:
+        stmt = stmt.where(r.tag_id.in_(tag_ids))
+
+    async with async_session_factory() as session:
+        rows = (await session.execute(stmt)).all()
+        flagged: list[tuple] = []
+        if rows:
+            ids, counts, sums, sums_sq = zip(*rows, strict=True)
+            _, std, noisy = noisy_sensor_stats(
+                np.array(counts),
+                np.array(sums, dtype=np.float64),
+                np.array(sums_sq, dtype=np.float64),
             )
-            last_reading_time = latest.scalar_one_or_none()
-
-            if last_reading_time and last_reading_time < stale_threshold:
-                tag.quality_flag = QualityFlag.BAD
-                flagged_count += 1
-                logger.warning(
-                    "stale_tag_flagged",
-                    tag_id=str(tag.id),
-                    tag_name=tag.name,
-                    last_reading=str(last_reading_time),
-                )
+            flagged = [(ids[i], float(std[i])) for i in np.flatnonzero(noisy)]
 
+        for offset in range(0, len(flagged), UPDATE_CHUNK_SIZE):
+            chunk = [tag_id for tag_id, _ in flagged[offset : offset + UPDATE_CHUNK_SIZE]]
+            await session.execute(
+                update(Tag)
+                .where(Tag.id.in_(chunk))
+                .values(quality_flag=QualityFlag.UNCERTAIN)
+                .execution_options(synchronize_session=False)
+            )
         await session.commit()
 
-    logger.info("stale_tag_check_complete", flagged_count=flagged_count)
-    return {"flagged_count": flagged_count}
+    for tag_id, std_dev in flagged:
+        logger.warning("noisy_sensor_flagged", tag_id=str(tag_id), std_dev=std_dev)
+
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(
+        "noisy_sensor_sweep_complete",
+        checked_count=len(rows),
+        flagged_count=len(flagged),
+        elapsed_ms=elapsed_ms,
+    )
+    return {
+        "checked_count": len(rows),
+        "flagged_count": len(flagged),
+        "flagged": {str(tag_id): std_dev for tag_id, std_dev in flagged},
+        "elapsed_ms": elapsed_ms,
+    }
 
 
 @celery_app.task(name="app.workers.telemetry_tasks.flag_noisy_sensors")
 def flag_noisy_sensors(tag_id: str, window_minutes: int = 60) -> dict:
+    """Single-tag check, kept for existing callers; prefer ``sweep_noisy_sensors``."""
     return asyncio.get_event_loop().run_until_complete(
         _flag_noisy_sensors(tag_id, window_minutes)
     )
@@ -62,44 +185,32 @@ def flag_noisy_sensors(tag_id: str, window_minutes: int = 60) -> dict:
 
 async def _flag_noisy_sensors(tag_id_str: str, window_minutes: int) -> dict:
     import uuid
-    from sqlalchemy import select, func
+
+    result = await _sweep_noisy_sensors(window_minutes, tag_ids=[uuid.UUID(tag_id_str)])
+    if tag_id_str in result["flagged"]:
+        return {"status": "flagged", "std_dev": result["flagged"][tag_id_str]}
+    return {"status": "ok"}
+
+
+@celery_app.task(name="app.workers.telemetry_tasks.refresh_telemetry_rollups")
+def refresh_telemetry_rollups() -> dict:
+    return asyncio.get_event_loop().run_until_complete(_refresh_telemetry_rollups())
+
+
+async def _refresh_telemetry_rollups(since: datetime | None = None) -> dict:
     from app.database import async_session_factory
-    from app.models.asset import Tag
-    from app.models.telemetry import TelemetryReading
-    from app.core.constants import QualityFlag
+    from app.services.telemetry_rollup import TelemetryRollupService, uses_timescale
 
-    tag_id = uuid.UUID(tag_id_str)
-    window_start = datetime.now(timezone.utc) - timedelta(minutes=window_minutes)
+    # TimescaleDB refreshes its continuous aggregates through its own policies
+    if uses_timescale():
+        return {"status": "skipped"}
 
     async with async_session_factory() as session:
-        stats = await session.execute(
-            select(
-                func.avg(TelemetryReading.value),
-                func.stddev(TelemetryReading.value),
-            ).where(
-                TelemetryReading.tag_id == tag_id,
-                TelemetryReading.time >= window_start,
-            )
-        )
-        row = stats.one()
-        avg_val = row[0]
-        std_dev = row[1]
-
-        if avg_val is not None and std_dev is not None and std_dev > 3 * abs(avg_val) * 0.01:
-            # Standard deviation exceeds 3σ — flag as UNCERTAIN
-            tag_result = await session.execute(select(Tag).where(Tag.id == tag_id))
-            tag = tag_result.scalar_one_or_none()
-            if tag:
-                tag.quality_flag = QualityFlag.UNCERTAIN
-                logger.warning(
-                    "noisy_sensor_flagged",
-                    tag_id=tag_id_str,
-                    std_dev=std_dev,
-                )
-                await session.commit()
-                return {"status": "flagged", "std_dev": std_dev}
+        written = await TelemetryRollupService(session).refresh(since=since)
+        await session.commit()
 
-    return {"status": "ok"}
+    logger.info("telemetry_rollups_refreshed", **written)
+    return written
 
 
 @celery_app.task(name="app.workers.telemetry_tasks.resync_buffered_readings")
@@ -110,9 +221,10 @@ def resync_buffered_readings(readings: list[dict]) -> dict:
 
 
 async def _resync_buffered_readings(readings: list[dict]) -> dict:
-    from app.database import async_session_factory
-    from app.services.telemetry_service import TelemetryService
+    from app.core.constants import ConflictPolicy
+    from app.database import async_session_factory, drain_commit_hooks
     from app.schemas.telemetry import TelemetryPoint
+    from app.services.telemetry_service import TelemetryService
 
     points = [TelemetryPoint(**r) for r in readings]
 
@@ -120,12 +232,25 @@ async def _resync_buffered_readings(readings: list[dict]) -> dict:
         service = TelemetryService(session)
         for point in points:
             point.source = "resync"
-        result = await service.ingest(points)
+        # Edge gateways re-send overlapping windows; already-stored points are skipped
+        result = await service.ingest(points, on_conflict=ConflictPolicy.DO_NOTHING)
         await session.commit()
+    # Cache mirroring and limit alerts run after commit; finish them before the loop stops
+    await drain_commit_hooks()
+
+    # Resynced windows can predate the rollup late-data window. Refreshed in a
+    # separate transaction so a failed refresh cannot roll back the readings
+    if result.ingested:
+        await _refresh_telemetry_rollups(since=min(p.time for p in points))
 
     logger.info(
         "buffered_readings_resynced",
         ingested=result.ingested,
+        duplicates=result.duplicates,
         rejected=result.rejected,
     )
-    return {"ingested": result.ingested, "rejected": result.rejected}
+    return {
+        "ingested": result.ingested,
+        "duplicates": result.duplicates,
+        "rejected": result.rejected,
+    }
@@ -10,7 +10,7 @@ from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
 from app.config import settings
-from app.database import get_db
+from app.database import get_db, get_session_factory
 from app.main import app
 from app.models.base import Base
 from app.core.security import hash_password
@@ -49,6 +49,7 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: async_session_test
 
     async with AsyncClient(
         transport=ASGITransport(app=app),
@@ -109,17 +110,19 @@ async def operator_token(client: AsyncClient, db_session: AsyncSession) -> str:
 async def sample_asset(db_session: AsyncSession):
     """Create a sample asset hierarchy."""
     from app.models.asset import Asset, System, Tag
+    from app.services.asset_hierarchy import AssetHierarchyService
 
+    hierarchy = AssetHierarchyService(db_session)
     asset = Asset(
         id=uuid4(),
         name="Test Terminal",
         asset_type="terminal",
-        location="Test Location",
-        latitude=-6.8,
-        longitude=39.28,
+        location_lat=-6.8,
+        location_lon=39.28,
     )
     db_session.add(asset)
     await db_session.flush()
+    await hierarchy.place(asset)
 
     system = System(
         id=uuid4(),
@@ -129,6 +132,7 @@ async def sample_asset(db_session: AsyncSession):
     )
     db_session.add(system)
     await db_session.flush()
+    await hierarchy.place(system)
 
     tag = Tag(
         id=uuid4(),
@@ -138,6 +142,8 @@ async def sample_asset(db_session: AsyncSession):
         quality_flag="GOOD",
     )
     db_session.add(tag)
+    await db_session.flush()
+    await hierarchy.place(tag)
     await db_session.commit()
 
     return {"asset": asset, "system": system, "tag": tag}
@@ -92,3 +92,102 @@ class TestTagSearch:
         data = resp.json()["data"]
         assert len(data) >= 1
         assert data[0]["name"].startswith("FT")
+
+    async def test_search_ranks_prefix_first(
+        self, client: AsyncClient, admin_token: str, sample_asset
+    ):
+        """Substring matches are returned, with prefix matches ranked ahead."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        resp = await client.post(
+            "/api/v1/assets/tags",
+            json={"name": "XFT-0019", "unit": "bar", "system_id": str(sample_asset["system"].id)},
+            headers=headers,
+        )
+        assert resp.status_code == 201
+
+        resp = await client.get("/api/v1/assets/tags/search?q=ft-0", headers=headers)
+        assert resp.status_code == 200
+        assert [t["name"] for t in resp.json()["data"]] == ["FT-001", "XFT-0019"]
+
+    async def test_search_sees_tags_written_elsewhere(self, db_session, sample_asset):
+        """Tags inserted without invalidating the registry are still found."""
+        from sqlalchemy import insert
+
+        from app.models.asset import Tag
+        from app.services.tag_search import TagSearchService
+
+        service = TagSearchService(db_session)
+        assert [t.name for t in await service.search("PT-")] == []
+
+        # e.g. another worker or a seed script; bypasses TagRegistry.invalidate
+        await db_session.execute(
+            insert(Tag).values(name="PT-100", unit="bar", system_id=sample_asset["system"].id)
+        )
+        assert [t.name for t in await service.search("PT-")] == ["PT-100"]
+
+
+@pytest.mark.asyncio
+class TestTagRegistry:
+    async def test_patch_invalidates_registry(
+        self, client: AsyncClient, admin_token: str, db_session, sample_asset
+    ):
+        """Registry lookups are cached until the tag is patched."""
+        from app.services.tag_registry import tag_registry
+
+        tag = sample_asset["tag"]
+        tag_registry.clear()
+        info = await tag_registry.get(db_session, tag.id)
+        assert info.asset_id == sample_asset["asset"].id
+        await tag_registry.get(db_session, tag.id)
+        assert tag_registry.stats()["hits"] == 1
+
+        resp = await client.patch(
+            f"/api/v1/assets/tags/{tag.id}",
+            json={"high_limit": 42.0},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert resp.status_code == 200
+        # get_db commits after the response; the registry is invalidated then
+        assert (await tag_registry.get(db_session, tag.id)).high_limit is None
+        await db_session.commit()
+        assert (await tag_registry.get(db_session, tag.id)).high_limit == 42.0
+
+
+@pytest.mark.asyncio
+class TestAssetHierarchy:
+    async def test_subtree_tags(self, client: AsyncClient, admin_token: str, sample_asset):
+        """Tags are found under their asset through the materialised hierarchy."""
+        asset, system, tag = sample_asset["asset"], sample_asset["system"], sample_asset["tag"]
+        assert tag.path == f"{asset.id.hex}.{system.id.hex}.{tag.id.hex}"
+
+        resp = await client.get(
+            f"/api/v1/assets/{asset.id}/tags",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert resp.status_code == 200
+        assert [t["id"] for t in resp.json()["data"]] == [str(tag.id)]
+
+    async def test_moved_system_takes_its_tags(self, db_session, sample_asset):
+        """Re-parenting a system re-paths its tags and moves them to the new asset's subtree."""
+        from app.models.asset import Asset
+        from app.services.asset_hierarchy import AssetHierarchyService
+
+        old_asset, system, tag = (
+            sample_asset["asset"],
+            sample_asset["system"],
+            sample_asset["tag"],
+        )
+        hierarchy = AssetHierarchyService(db_session)
+        new_asset = Asset(name="Other Terminal", asset_type="terminal")
+        db_session.add(new_asset)
+        await db_session.flush()
+        await hierarchy.place(new_asset)
+
+        system.asset_id = new_asset.id
+        await db_session.flush()
+        await hierarchy.place(system)
+        await db_session.refresh(tag)
+
+        assert tag.path == f"{new_asset.id.hex}.{system.id.hex}.{tag.id.hex}"
+        assert [t.id for t in await hierarchy.subtree_tags(new_asset.id)] == [tag.id]
+        assert await hierarchy.subtree_tags(old_asset.id) == []
@@ -1,7 +1,56 @@
 """Tests for compliance and audit trail endpoints."""
 
+import uuid
+from datetime import datetime, timezone
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pagination import _Explain
+from app.config import settings
+from app.core.constants import ComplianceReportType, ReportFormat
+from app.database import drain_commit_hooks
+from app.models.compliance import AuditLog
+from app.models.reconciliation import ReconciliationRun
+from app.services.compliance_service import ComplianceService
+from app.services.report_renderer import render_report, report_fingerprint
+from app.workers.report_tasks import render_report as render_report_task
+
+REPORT_CONTENT = {
+    "title": "Monthly Compliance Report - September 2026",
+    "report_type": "MONTHLY_COMPLIANCE",
+    "period_start": "2026-09-01T00:00:00+00:00",
+    "period_end": "2026-10-01T00:00:00+00:00",
+    "sections": {
+        "custody": [{"product_type": "PMS", "transfers": 3, "volume_m3": 201.0}],
+        "incidents": [],
+    },
+}
+
+
+class TestReportRenderer:
+    def test_fingerprint_tracks_content_and_format(self):
+        fingerprint = report_fingerprint(REPORT_CONTENT, ReportFormat.PDF)
+        assert fingerprint == report_fingerprint(dict(REPORT_CONTENT), ReportFormat.PDF)
+        assert fingerprint != report_fingerprint(REPORT_CONTENT, ReportFormat.XLSX)
+        changed = {**REPORT_CONTENT, "sections": {"custody": [], "incidents": []}}
+        assert fingerprint != report_fingerprint(changed, ReportFormat.PDF)
+
+    def test_render_formats(self):
+        assert render_report(REPORT_CONTENT, ReportFormat.PDF).startswith(b"%PDF")
+        assert render_report(REPORT_CONTENT, ReportFormat.XLSX).startswith(b"PK")
+
+
+class TestCountEstimate:
+    def test_explain_keeps_parameters_bound(self):
+        query = select(AuditLog).where(AuditLog.action == "x'; DROP TABLE audit_logs; --")
+        compiled = _Explain(query).compile(dialect=postgresql.asyncpg.dialect())
+        assert str(compiled).startswith("EXPLAIN (FORMAT JSON) SELECT")
+        assert "DROP TABLE" not in str(compiled)
+        assert "x'; DROP TABLE audit_logs; --" in compiled.params.values()
 
 
 @pytest.mark.asyncio
@@ -22,6 +71,35 @@ class TestComplianceAPI:
         )
         assert resp.status_code == 200
 
+    async def test_audit_logs_cursor_pages(self, client: AsyncClient, admin_token: str):
+        """Cursor pages follow on from each other without a total."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        first = await client.get(
+            "/api/v1/compliance/audit",
+            params={"per_page": 1, "count": "none"},
+            headers=headers,
+        )
+        assert first.status_code == 200
+        meta = first.json()["meta"]
+        assert meta["total"] is None
+        if meta["next_cursor"] is not None:
+            second = await client.get(
+                "/api/v1/compliance/audit",
+                params={"per_page": 1, "cursor": meta["next_cursor"]},
+                headers=headers,
+            )
+            assert second.status_code == 200
+            assert second.json()["meta"]["page"] is None
+            assert second.json()["data"] != first.json()["data"]
+
+    async def test_invalid_cursor(self, client: AsyncClient, admin_token: str):
+        resp = await client.get(
+            "/api/v1/compliance/audit",
+            params={"cursor": "not-a-cursor"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert resp.status_code == 422
+
     async def test_list_custody_transfers(self, client: AsyncClient, admin_token: str):
         """List custody transfer records."""
         resp = await client.get(
@@ -30,6 +108,109 @@ class TestComplianceAPI:
         )
         assert resp.status_code == 200
 
+    async def test_export_custody_transfers_csv(self, client: AsyncClient, admin_token: str):
+        """Export streams a CSV attachment starting with the header row."""
+        resp = await client.get(
+            "/api/v1/compliance/custody/export",
+            params={"format": "csv"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/csv")
+        assert "attachment" in resp.headers["content-disposition"]
+        assert resp.text.splitlines()[0].startswith("id,transfer_time,batch_id")
+
+    async def test_created_report_renders_after_commit(
+        self,
+        client: AsyncClient,
+        admin_token: str,
+        db_session: AsyncSession,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path,
+    ):
+        """The render is dispatched once the report is committed, then downloadable."""
+        monkeypatch.setattr(settings, "REPORT_STORAGE_DIR", str(tmp_path))
+        dispatched: list[str] = []
+        monkeypatch.setattr(render_report_task, "delay", dispatched.append)
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        resp = await client.post(
+            "/api/v1/compliance/reports",
+            json={
+                "title": "Custody trail",
+                "report_type": "CUSTODY_TRAIL",
+                "period_start": "2026-09-01T00:00:00+00:00",
+                "period_end": "2026-10-01T00:00:00+00:00",
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 201
+        report_id = resp.json()["data"]["id"]
+        await drain_commit_hooks()
+        assert dispatched == []
+
+        await db_session.commit()
+        await drain_commit_hooks()
+        assert dispatched == [report_id]
+
+        report = await ComplianceService(db_session).render_report(uuid.UUID(report_id))
+        assert report.status == "GENERATED"
+        resp = await client.get(f"/api/v1/compliance/reports/{report_id}/file", headers=headers)
+        assert resp.status_code == 200
+        assert resp.content.startswith(b"%PDF")
+
+    async def test_partitioned_run_counted_once(self, db_session: AsyncSession):
+        start = datetime(2026, 9, 1, tzinfo=timezone.utc)
+        end = datetime(2026, 10, 1, tzinfo=timezone.utc)
+        parent = ReconciliationRun(
+            name="fan-out", run_type="PARTITIONED", period_start=start, period_end=end
+        )
+        db_session.add(parent)
+        await db_session.flush()
+        for _ in range(2):
+            db_session.add(
+                ReconciliationRun(
+                    name="partition",
+                    run_type="PARTITION",
+                    period_start=start,
+                    period_end=end,
+                    parent_run_id=parent.id,
+                )
+            )
+        await db_session.flush()
+
+        content = await ComplianceService(db_session).collect_report_data(
+            "WMA", ComplianceReportType.WMA_REPORT, start, end
+        )
+        assert sum(row["runs"] for row in content["sections"]["reconciliation_runs"]) == 1
+
+    async def test_export_escapes_formulas(
+        self, client: AsyncClient, admin_token: str, db_session: AsyncSession
+    ):
+        """Cells a spreadsheet would evaluate are exported as text."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        resp = await client.post(
+            "/api/v1/compliance/custody",
+            json={
+                "batch_id": "B-FORMULA",
+                "from_entity": "=HYPERLINK(\"http://example.com\")",
+                "to_entity": "Depot",
+                "product_type": "AGO",
+                "volume_m3": 10.0,
+                "transfer_time": "2026-09-15T08:00:00+00:00",
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 201
+        await db_session.commit()
+
+        resp = await client.get(
+            "/api/v1/compliance/custody/export",
+            params={"format": "csv", "batch_id": "B-FORMULA"},
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        assert "'=HYPERLINK" in resp.text
+
 
 @pytest.mark.asyncio
 class TestAnalyticsAPI:
@@ -3,8 +3,17 @@
 import pytest
 from datetime import datetime, timezone
 from uuid import uuid4
+import numpy as np
 from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core.constants import ReconciliationStatus
+from app.database import drain_commit_hooks
+from app.models.reconciliation import ReconciliationRun
+from app.models.terminal import Tank, Terminal
+from app.services.reconciliation_service import ReconciliationService
+from app.services.strapping import StrappingTable, strapping_tables
 from app.utils.tolerance import ToleranceEngine
 
 
@@ -66,6 +75,24 @@ class TestToleranceEngine:
         assert result["variance_pct"] == pytest.approx(0.6, abs=0.01)
 
 
+class TestStrappingTable:
+    """Unit tests for strapping table interpolation."""
+
+    table = StrappingTable(np.array([0.0, 1000.0, 2000.0]), np.array([0.0, 50.0, 120.0]))
+
+    def test_interpolates_between_points(self):
+        volumes = self.table.volumes([0.0, 500.0, 1000.0, 1500.0])
+        assert volumes.tolist() == pytest.approx([0.0, 25.0, 50.0, 85.0])
+
+    def test_outside_range_is_nan(self):
+        volumes = self.table.volumes([-1.0, 2000.0, 2000.1])
+        assert np.isnan(volumes[0]) and np.isnan(volumes[2])
+        assert volumes[1] == 120.0
+
+    def test_missing_level_is_nan(self):
+        assert np.isnan(self.table.volumes(np.array([None], dtype=float))[0])
+
+
 @pytest.mark.asyncio
 class TestReconciliationAPI:
     async def test_list_reconciliation_runs(self, client: AsyncClient, admin_token: str):
@@ -89,3 +116,168 @@ class TestReconciliationAPI:
         )
         # May succeed or fail depending on available data
         assert resp.status_code in [200, 201, 400, 404, 422]
+
+    async def test_incremental_refresh(self, client: AsyncClient, admin_token: str):
+        """An incremental trigger refreshes the previous run for the same period."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        body = {
+            "name": "Incremental",
+            "period_start": "2025-01-01T00:00:00+00:00",
+            "period_end": "2025-01-02T00:00:00+00:00",
+        }
+        first = await client.post("/api/v1/reconciliation/trigger", json=body, headers=headers)
+        assert first.status_code == 201
+        run_id = first.json()["data"]["id"]
+
+        again = await client.post(
+            "/api/v1/reconciliation/trigger",
+            json={**body, "incremental": True},
+            headers=headers,
+        )
+        assert again.json()["data"]["id"] == run_id
+
+        refreshed = await client.post(
+            f"/api/v1/reconciliation/{run_id}/refresh", headers=headers
+        )
+        assert refreshed.status_code == 200
+        assert set(refreshed.json()["meta"]["node_timings_s"]) == {
+            "VESSEL_DISCHARGE", "TANK_RECEIPT", "GANTRY_LOADING", "DELIVERY_EPOD"
+        }
+
+    async def test_replace_strapping_table(
+        self, client: AsyncClient, admin_token: str, db_session: AsyncSession
+    ):
+        """A re-calibration reaches the cache on commit and marks its tanks changed."""
+        terminal = Terminal(name="Strapping Terminal")
+        db_session.add(terminal)
+        await db_session.flush()
+        tank = Tank(
+            name="TK-9",
+            terminal_id=terminal.id,
+            capacity_m3=1000.0,
+            strapping_table_ref="TK-9-2025",
+            updated_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        )
+        db_session.add(tank)
+        await db_session.commit()
+
+        async def replace(full_volume: float) -> None:
+            resp = await client.put(
+                "/api/v1/terminals/strapping-tables/TK-9-2025",
+                json={
+                    "points": [
+                        {"level_mm": 0.0, "volume_m3": 0.0},
+                        {"level_mm": 1000.0, "volume_m3": full_volume},
+                    ]
+                },
+                headers={"Authorization": f"Bearer {admin_token}"},
+            )
+            assert resp.status_code == 200
+
+        async def half_full() -> float:
+            tables = await strapping_tables.get_many(db_session, ["TK-9-2025"])
+            return float(tables["TK-9-2025"].volumes([500.0])[0])
+
+        await replace(50.0)
+        await db_session.commit()
+        assert await half_full() == 25.0
+
+        await replace(100.0)
+        assert await half_full() == 25.0  # not committed yet
+        await db_session.commit()
+        assert await half_full() == 50.0
+
+        await db_session.refresh(tank)
+        assert tank.updated_at.replace(tzinfo=None) > datetime(2025, 1, 2)
+
+    async def test_concurrent_nodes_leave_commit_to_caller(
+        self, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Only the new run row is committed for the node sessions; its outcome is not."""
+        monkeypatch.setattr(ReconciliationService, "_concurrent_nodes", lambda self: True)
+        factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+        service = ReconciliationService(db_session, session_factory=factory)
+        run = await service.trigger_reconciliation(
+            name="Concurrent",
+            period_start=datetime(2025, 3, 1, tzinfo=timezone.utc),
+            period_end=datetime(2025, 3, 2, tzinfo=timezone.utc),
+        )
+        run_id = run.id
+        assert run.status == ReconciliationStatus.AUTO_CLOSED
+        async with factory() as session:
+            assert await session.get(ReconciliationRun, run_id) is not None
+
+        # Rolling back the caller's transaction takes the committed run with it
+        await db_session.rollback()
+        await drain_commit_hooks()
+        async with factory() as session:
+            assert await session.get(ReconciliationRun, run_id) is None
+
+    async def test_concurrent_run_discarded_on_failure(
+        self, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+    ):
+        """A run that fails after its row was committed doesn't stay IN_PROGRESS."""
+        monkeypatch.setattr(ReconciliationService, "_concurrent_nodes", lambda self: True)
+
+        async def fail(self, run, start, end):
+            raise RuntimeError("fraud checks failed")
+
+        monkeypatch.setattr(ReconciliationService, "_run_fraud_checks", fail)
+        factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+        service = ReconciliationService(db_session, session_factory=factory)
+        with pytest.raises(RuntimeError):
+            await service.trigger_reconciliation(
+                name="Concurrent failure",
+                period_start=datetime(2025, 3, 1, tzinfo=timezone.utc),
+                period_end=datetime(2025, 3, 2, tzinfo=timezone.utc),
+            )
+
+        async with factory() as session:
+            runs = await session.execute(
+                select(ReconciliationRun).where(ReconciliationRun.name == "Concurrent failure")
+            )
+        assert runs.first() is None
+
+    async def test_failed_partition_fails_parent(self, db_session: AsyncSession):
+        """The daily chord's error callback leaves the parent FAILED, not IN_PROGRESS."""
+        service = ReconciliationService(db_session)
+        run, _ = await service.start_partitioned_run(
+            name="Daily",
+            period_start=datetime(2025, 3, 1, tzinfo=timezone.utc),
+            period_end=datetime(2025, 3, 2, tzinfo=timezone.utc),
+        )
+        assert run.status == ReconciliationStatus.IN_PROGRESS
+
+        failed = await service.fail_partitioned_run(run.id)
+        assert failed.status == ReconciliationStatus.FAILED
+        assert failed.completed_at is not None
+
+    async def test_refresh_unknown_run(self, client: AsyncClient, admin_token: str):
+        resp = await client.post(
+            f"/api/v1/reconciliation/{uuid4()}/refresh",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert resp.status_code == 404
+
+    async def test_tolerance_what_if(self, client: AsyncClient, admin_token: str):
+        """What-if thresholds are evaluated without creating runs."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        now = datetime.now(timezone.utc).isoformat()
+        run = await client.post(
+            "/api/v1/reconciliation/trigger",
+            json={"name": "What-if", "period_start": now, "period_end": now},
+            headers=headers,
+        )
+        run_id = run.json()["data"]["id"]
+
+        resp = await client.get(
+            f"/api/v1/reconciliation/{run_id}/what-if?threshold=0.5&threshold=1.5",
+            headers=headers,
+        )
+        assert resp.status_code == 200
+        assert [r["threshold_pct"] for r in resp.json()["data"]] == [0.5, 1.5]
+
+        resp = await client.get(
+            f"/api/v1/reconciliation/{run_id}/what-if?threshold=-1", headers=headers
+        )
+        assert resp.status_code == 422
@@ -1,7 +1,8 @@
 """Tests for telemetry ingestion and query endpoints."""
 
-import pytest
 from datetime import datetime, timezone
+
+import pytest
 from httpx import AsyncClient
 
 
@@ -55,3 +56,464 @@ class TestTelemetryQuery:
             headers={"Authorization": f"Bearer {admin_token}"},
         )
         assert resp.status_code in [200, 404]  # 404 if no readings yet
+
+    async def test_get_latest_batch(self, client: AsyncClient, admin_token: str, sample_asset):
+        """Batch latest lists tags without readings under meta.missing."""
+        from uuid import uuid4
+
+        tag_id = str(sample_asset["tag"].id)
+        unknown = str(uuid4())
+        resp = await client.get(
+            f"/api/v1/telemetry/latest?tag_ids={tag_id},{unknown}",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert resp.status_code == 200
+        assert unknown in resp.json()["meta"]["missing"]
+
+
+@pytest.mark.asyncio
+class TestTelemetryBulkWriter:
+    async def test_ingest_writes_all_rows(self, db_session, sample_asset):
+        """Bulk ingest persists every point in the batch."""
+        from datetime import timedelta
+
+        from sqlalchemy import func, select
+
+        from app.models.telemetry import TelemetryReading
+        from app.schemas.telemetry import TelemetryPoint
+        from app.services.telemetry_service import TelemetryService
+
+        tag_id = sample_asset["tag"].id
+        start = datetime.now(timezone.utc)
+        points = [
+            TelemetryPoint(tag_id=tag_id, time=start + timedelta(seconds=i), value=float(i))
+            for i in range(500)
+        ]
+
+        result = await TelemetryService(db_session).ingest(points)
+        assert result.ingested == 500
+        assert result.rejected == 0
+
+        count = await db_session.execute(
+            select(func.count()).where(TelemetryReading.tag_id == tag_id)
+        )
+        assert count.scalar_one() == 500
+
+    async def test_resent_batch_counts_duplicates(self, db_session, sample_asset):
+        """DO_NOTHING skips already-stored (tag_id, time) keys instead of failing."""
+        from app.core.constants import ConflictPolicy
+        from app.schemas.telemetry import TelemetryPoint
+        from app.services.telemetry_service import TelemetryService
+
+        tag_id = sample_asset["tag"].id
+        now = datetime.now(timezone.utc)
+        points = [TelemetryPoint(tag_id=tag_id, time=now, value=1.0)]
+        service = TelemetryService(db_session)
+
+        await service.ingest(points)
+        result = await service.ingest(points, on_conflict=ConflictPolicy.DO_NOTHING)
+        assert result.ingested == 0
+        assert result.duplicates == 1
+
+    async def test_repeated_keys_in_batch(self, db_session, sample_asset):
+        """Within a batch the first reading of a key is kept under DO_NOTHING, the last
+        under DO_UPDATE, and each repeat counts as a duplicate."""
+        from app.core.constants import ConflictPolicy
+        from app.services.telemetry_writer import TelemetryBulkWriter
+
+        tag_id = sample_asset["tag"].id
+        now = datetime.now(timezone.utc)
+        writer = TelemetryBulkWriter(db_session)
+
+        def row(value):
+            return (tag_id, now, value, "GOOD", None, None)
+
+        result = await writer.upsert([row(1.0), row(2.0)], ConflictPolicy.DO_NOTHING)
+        assert (result.inserted, result.duplicates) == (1, 1)
+        assert [r[2] for r in result.written] == [1.0]
+
+        result = await writer.upsert([row(3.0), row(4.0), row(5.0)], ConflictPolicy.DO_UPDATE)
+        assert (result.inserted, result.duplicates) == (0, 3)
+        assert [r[2] for r in result.written] == [5.0]
+
+    async def test_stream_rejects_malformed_records(self, db_session, sample_asset):
+        """Non-object lines and non-string sources are rejected one record at a time."""
+        import orjson
+
+        from app.services.telemetry_service import TelemetryService
+
+        point = {"tag_id": str(sample_asset["tag"].id), "time": "2025-01-01T00:00:00Z"}
+        lines = [
+            {**point, "value": 1.0},
+            [1, 2],
+            123,
+            "x",
+            {**point, "time": "2025-01-01T00:00:01Z", "value": 2.0, "source": 7},
+        ]
+
+        async def body():
+            yield b"\n".join(orjson.dumps(line) for line in lines)
+
+        result = await TelemetryService(db_session).ingest_stream(body(), "application/x-ndjson")
+        assert result.ingested == 1
+        assert result.rejected == 4
+
+    async def test_stream_malformed_msgpack(self, db_session):
+        """A corrupt msgpack body fails the upload with a validation error."""
+        from app.core.exceptions import ValidationException
+        from app.services.telemetry_service import TelemetryService
+
+        async def body():
+            yield b"\xc1"
+
+        with pytest.raises(ValidationException):
+            await TelemetryService(db_session).ingest_stream(body(), "application/msgpack")
+
+    async def test_query_columns_layout(self, db_session, sample_asset):
+        """Columnar query returns parallel arrays matching the row layout."""
+        from datetime import timedelta
+
+        from app.schemas.telemetry import TelemetryPoint
+        from app.services.telemetry_service import TelemetryService
+
+        tag_id = sample_asset["tag"].id
+        start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        service = TelemetryService(db_session)
+        await service.ingest(
+            [
+                TelemetryPoint(tag_id=tag_id, time=start + timedelta(seconds=i), value=float(i))
+                for i in range(3)
+            ]
+        )
+
+        [columns] = await service.query_columns([tag_id], start, start + timedelta(minutes=1))
+        assert columns["count"] == 3
+        assert columns["time"].tolist() == [1735689600000, 1735689601000, 1735689602000]
+        assert columns["value"].tolist() == [0.0, 1.0, 2.0]
+        assert columns["quality"] == ["GOOD", "GOOD", "GOOD"]
+
+
+class TestDownsampling:
+    def test_parse_downsample(self):
+        from datetime import timedelta
+
+        from app.services.telemetry_downsample import parse_downsample
+
+        assert parse_downsample("5m").interval == timedelta(minutes=5)
+        assert parse_downsample("5m").agg == "avg"
+        assert parse_downsample("1h:last").agg == "last"
+
+    def test_invalid_downsample(self):
+        from app.core.exceptions import ValidationException
+        from app.services.telemetry_downsample import parse_downsample
+
+        with pytest.raises(ValidationException):
+            parse_downsample("1h:median")
+
+    def test_aggregate_buckets(self):
+        """NumPy bucketing keeps first/last/extremes and worst quality per bucket."""
+        from datetime import timedelta
+        from uuid import uuid4
+
+        from app.services.telemetry_downsample import aggregate_buckets, parse_downsample
+
+        tag_id = uuid4()
+        start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        readings = [
+            (tag_id, start + timedelta(seconds=20 * i), float(i), "BAD" if i == 1 else "GOOD")
+            for i in range(6)
+        ]
+
+        first = aggregate_buckets(tag_id, readings, parse_downsample("1m:first"))
+        last = aggregate_buckets(tag_id, readings, parse_downsample("1m:last"))
+        avg = aggregate_buckets(tag_id, readings, parse_downsample("1m"))
+
+        assert [r.value for r in first] == [0.0, 3.0]
+        assert [r.value for r in last] == [2.0, 5.0]
+        assert [r.value for r in avg] == [1.0, 4.0]
+        assert [r.quality for r in avg] == ["BAD", "GOOD"]
+        assert avg[1].time == start + timedelta(minutes=1)
+
+    def test_lttb_keeps_spike(self):
+        """LTTB bounds the point count but keeps an isolated peak."""
+        import numpy as np
+
+        from app.services.telemetry_downsample import lttb_indices
+
+        x = np.arange(10_000, dtype=np.float64)
+        y = np.sin(x / 200)
+        y[4321] = 100.0
+
+        selected = lttb_indices(x, y, 200)
+        assert len(selected) == 200
+        assert selected[0] == 0 and selected[-1] == 9_999
+        assert 4321 in selected
+
+    def test_plan_tier_picks_coarsest(self):
+        from app.services.telemetry_downsample import parse_downsample
+        from app.services.telemetry_rollup import plan_tier
+
+        assert plan_tier(parse_downsample("1m")).name == "1m"
+        assert plan_tier(parse_downsample("15m:max")).name == "1m"
+        assert plan_tier(parse_downsample("6h")).name == "1h"
+        assert plan_tier(parse_downsample("2d:last")).name == "1d"
+        assert plan_tier(parse_downsample("30s")) is None
+        assert plan_tier(parse_downsample("1h:first")) is None
+        assert plan_tier(parse_downsample("lttb:500")) is None
+
+
+@pytest.mark.asyncio
+class TestTelemetryRollups:
+    async def test_timescale_tiers_excluded_from_schema(self, monkeypatch):
+        """Continuous-aggregate tiers are left to the rollup script, not create_all."""
+        from app.config import settings
+        from app.models.base import schema_tables
+
+        monkeypatch.setattr(settings, "DB_ENGINE", "postgresql")
+        monkeypatch.setattr(settings, "TIMESCALE_ENABLED", True)
+        names = {table.name for table in schema_tables()}
+        assert "telemetry_rollup_1m" not in names
+        assert "telemetry_readings" in names
+
+        monkeypatch.setattr(settings, "TIMESCALE_ENABLED", False)
+        assert "telemetry_rollup_1m" in {table.name for table in schema_tables()}
+
+    async def test_rollup_query_matches_raw(self, db_session, sample_asset, monkeypatch):
+        """Table-backed tiers give the same buckets as downsampling raw readings."""
+        from datetime import timedelta
+
+        from app.config import settings
+        from app.schemas.telemetry import TelemetryPoint
+        from app.services.telemetry_downsample import DownsampleEngine, parse_downsample
+        from app.services.telemetry_rollup import TelemetryRollupService
+        from app.services.telemetry_service import TelemetryService
+
+        monkeypatch.setattr(settings, "TIMESCALE_ENABLED", False)
+        tag_id = sample_asset["tag"].id
+        start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        service = TelemetryService(db_session)
+        await service.ingest(
+            [
+                TelemetryPoint(
+                    tag_id=tag_id,
+                    time=start + timedelta(seconds=37 * i),
+                    value=float(i % 50),
+                    quality="BAD" if i % 97 == 0 else "GOOD",
+                )
+                for i in range(5_000)
+            ]
+        )
+        written = await TelemetryRollupService(db_session).refresh(now=start + timedelta(days=1))
+        assert written["1h"] == 24
+
+        # Unaligned range: edges and the tail past the watermark come from raw rows
+        query_start = start + timedelta(minutes=7, seconds=3)
+        query_end = start + timedelta(days=2)
+        for downsample in ("5m:max", "1h", "2h:last", "1h:count"):
+            served = await service.query([tag_id], query_start, query_end, downsample)
+            raw = await DownsampleEngine(db_session).fetch(
+                [tag_id], query_start, query_end, parse_downsample(downsample)
+            )
+            assert [(r.time, r.quality) for r in served[0].readings] == [
+                (r.time, r.quality) for r in raw
+            ]
+            assert [r.value for r in served[0].readings] == pytest.approx([r.value for r in raw])
+
+
+@pytest.mark.asyncio
+class TestLastValueCache:
+    async def test_newest_reading_wins(self):
+        """Older or duplicate rows never replace a newer cached reading."""
+        from datetime import timedelta
+        from uuid import uuid4
+
+        from app.services.telemetry_cache import LastValueCache
+
+        cache = LastValueCache(ttl=60)
+        tag_id = uuid4()
+        now = datetime.now(timezone.utc)
+
+        await cache.record([(tag_id, now, 2.0, "GOOD", None, None)])
+        await cache.record([(tag_id, now - timedelta(seconds=5), 1.0, "GOOD", None, None)])
+        await cache.record([(tag_id, now, 3.0, "GOOD", None, None)])
+        found, missing = await cache.lookup([tag_id, uuid4()])
+        assert found[tag_id].value == 2.0
+        assert len(missing) == 1
+
+        await cache.record([(tag_id, now, 3.0, "BAD", None, None)], overwrite=True)
+        found, _ = await cache.lookup([tag_id])
+        assert found[tag_id].value == 3.0
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["misses"] == 1
+
+    async def test_get_latest_served_from_cache(self, db_session, sample_asset):
+        """Ingest warms the cache; cold misses are cached after one query."""
+        from app.schemas.telemetry import TelemetryPoint
+        from app.services.telemetry_cache import last_value_cache
+        from app.services.telemetry_service import TelemetryService
+
+        last_value_cache.clear()
+        tag_id = sample_asset["tag"].id
+        service = TelemetryService(db_session)
+        await service.ingest(
+            [TelemetryPoint(tag_id=tag_id, time=datetime.now(timezone.utc), value=42.0)]
+        )
+        await db_session.commit()
+
+        assert (await service.get_latest(tag_id)).value == 42.0
+        assert last_value_cache.stats()["misses"] == 0
+
+        last_value_cache.clear()
+        assert (await service.get_latest(tag_id)).value == 42.0
+        assert (await service.get_latest(tag_id)).value == 42.0
+        assert last_value_cache.stats()["misses"] == 1
+
+    async def test_cache_follows_committed_rows(self, db_session, sample_asset):
+        """Rolled-back batches and skipped duplicates never reach the cache."""
+        from app.core.constants import ConflictPolicy
+        from app.schemas.telemetry import TelemetryPoint
+        from app.services.telemetry_cache import last_value_cache
+        from app.services.telemetry_service import TelemetryService
+
+        last_value_cache.clear()
+        tag_id = sample_asset["tag"].id
+        now = datetime.now(timezone.utc)
+        service = TelemetryService(db_session)
+
+        await service.ingest([TelemetryPoint(tag_id=tag_id, time=now, value=1.0)])
+        await db_session.rollback()
+        found, _ = await last_value_cache.lookup([tag_id])
+        assert tag_id not in found
+
+        await service.ingest([TelemetryPoint(tag_id=tag_id, time=now, value=2.0)])
+        await db_session.commit()
+        await service.ingest(
+            [TelemetryPoint(tag_id=tag_id, time=now, value=3.0)],
+            on_conflict=ConflictPolicy.DO_NOTHING,
+        )
+        await db_session.commit()
+        found, _ = await last_value_cache.lookup([tag_id])
+        assert found[tag_id].value == 2.0
+
+
+class TestNoisySensorSweep:
+    def test_noise_rule_is_vectorized(self):
+        """Stddev above 3% of |mean| is noisy; single readings never are."""
+        import numpy as np
+
+        from app.workers.telemetry_tasks import noisy_sensor_stats
+
+        quiet = np.array([100.0, 100.5, 99.5])
+        noisy = np.array([100.0, 120.0, 80.0])
+        counts = np.array([3, 3, 1])
+        sums = np.array([quiet.sum(), noisy.sum(), 5.0])
+        sums_sq = np.array([(quiet**2).sum(), (noisy**2).sum(), 25.0])
+
+        mean, std, flagged = noisy_sensor_stats(counts, sums, sums_sq)
+        assert mean.tolist() == pytest.approx([100.0, 100.0, 5.0])
+        assert std[:2].tolist() == pytest.approx([quiet.std(ddof=1), noisy.std(ddof=1)])
+        assert flagged.tolist() == [False, True, False]
+
+
+@pytest.mark.asyncio
+class TestLimitValidation:
+    async def test_out_of_limit_readings_flagged(self, db_session, sample_asset):
+        """GOOD readings outside tag limits become UNCERTAIN and are reported per tag."""
+        from datetime import timedelta
+
+        from app.services.telemetry_validation import TagLimitIndex, TelemetryValidator
+
+        tag = sample_asset["tag"]
+        tag.low_limit, tag.high_limit = 0.0, 100.0
+        await db_session.commit()
+
+        now = datetime.now(timezone.utc)
+        rows = [
+            (tag.id, now + timedelta(seconds=i), value, quality, None, None)
+            for i, (value, quality) in enumerate(
+                [(50.0, "GOOD"), (-5.0, "GOOD"), (150.0, "BAD"), (100.0, "GOOD")]
+            )
+        ]
+        validator = TelemetryValidator(db_session, TagLimitIndex())
+        rows, breaches = await validator.validate(rows)
+
+        assert [row[3] for row in rows] == ["GOOD", "UNCERTAIN", "BAD", "GOOD"]
+        [breach] = breaches
+        assert breach.tag_id == tag.id
+        assert (breach.count, breach.min_value, breach.max_value) == (2, -5.0, 150.0)
+
+    async def test_breach_alerts_wait_for_commit(self, db_session, sample_asset, monkeypatch):
+        """Limit alerts are published only once the ingest transaction commits."""
+        from app.database import drain_commit_hooks
+        from app.schemas.telemetry import TelemetryPoint
+        from app.services.telemetry_service import TelemetryService
+        from app.services.telemetry_validation import TelemetryValidator, tag_limit_index
+
+        published = []
+
+        async def publish(self, breaches):
+            published.extend(breaches)
+
+        monkeypatch.setattr(TelemetryValidator, "publish", publish)
+        tag = sample_asset["tag"]
+        tag.low_limit, tag.high_limit = 0.0, 100.0
+        await db_session.commit()
+        tag_id = tag.id
+        tag_limit_index.clear()
+
+        service = TelemetryService(db_session)
+        point = TelemetryPoint(tag_id=tag_id, time=datetime.now(timezone.utc), value=500.0)
+        await service.ingest([point])
+        await db_session.rollback()
+        await drain_commit_hooks()
+        assert published == []
+
+        await service.ingest([point])
+        await db_session.commit()
+        await drain_commit_hooks()
+        assert [b.tag_id for b in published] == [tag_id]
+
+    async def test_stream_merges_breaches_across_batches(
+        self, db_session, sample_asset, monkeypatch
+    ):
+        """A streamed upload publishes one breach per tag, however many batches it spans."""
+        import orjson
+
+        from app.database import drain_commit_hooks
+        from app.services.telemetry_cache import last_value_cache
+        from app.services.telemetry_service import TelemetryService
+        from app.services.telemetry_validation import TelemetryValidator, tag_limit_index
+
+        published = []
+
+        async def publish(self, breaches):
+            published.extend(breaches)
+
+        monkeypatch.setattr(TelemetryValidator, "publish", publish)
+        tag = sample_asset["tag"]
+        tag.low_limit, tag.high_limit = 0.0, 100.0
+        await db_session.commit()
+        tag_id = tag.id
+        tag_limit_index.clear()
+
+        values = [500.0, 50.0, -5.0, 50.0, 700.0]
+        lines = [
+            {"tag_id": str(tag_id), "time": f"2025-01-01T00:00:0{i}Z", "value": value}
+            for i, value in enumerate(values)
+        ]
+
+        async def body():
+            yield b"\n".join(orjson.dumps(line) for line in lines)
+
+        result = await TelemetryService(db_session).ingest_stream(
+            body(), "application/x-ndjson", batch_size=2
+        )
+        assert (result.ingested, result.limit_breaches) == (5, 3)
+        await db_session.commit()
+        await drain_commit_hooks()
+
+        [breach] = published
+        assert (breach.count, breach.min_value, breach.max_value) == (3, -5.0, 700.0)
+        assert breach.first_time == datetime(2025, 1, 1, tzinfo=timezone.utc)
+        found, _ = await last_value_cache.lookup([tag_id])
+        assert found[tag_id].value == 700.0
@@ -0,0 +1,163 @@
+"""Benchmark reconciliation variance computation for the active DB_ENGINE.
+
+Seeds TRIPS trips with ePODs and compares the legacy per-row ORM engine
+(one VarianceRecord object per trip, totals summed in Python) against
+ReconciliationService's set-based INSERT ... SELECT engine for the gantry
+and ePOD nodes plus run totals. Seed data is rolled back on exit.
+
+    DB_ENGINE=sqlite python -m scripts.benchmark_reconciliation
+    DB_ENGINE=postgresql python -m scripts.benchmark_reconciliation
+"""
+
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert, select
+
+from app.config import settings
+from app.core.constants import ReconciliationNode
+from app.database import async_session_factory, engine
+from app.models.base import Base
+from app.models.fleet import EPod, Trip, Vehicle
+from app.models.reconciliation import ReconciliationRun, VarianceRecord
+from app.services.reconciliation_service import ReconciliationService
+
+TRIPS = 100_000
+
+
+async def _legacy(session, run: ReconciliationRun, start: datetime, end: datetime) -> None:
+    trips = (
+        await session.execute(
+            select(Trip).where(
+                Trip.departure_time >= start,
+                Trip.departure_time <= end,
+                Trip.gantry_metered_litres.isnot(None),
+                Trip.loaded_volume_litres.isnot(None),
+            )
+        )
+    ).scalars()
+    for trip in trips:
+        expected, actual = trip.loaded_volume_litres / 1000, trip.gantry_metered_litres / 1000
+        session.add(_legacy_record(run, ReconciliationNode.GANTRY_LOADING, expected, actual, trip))
+    await session.flush()
+
+    rows = await session.execute(
+        select(Trip, EPod)
+        .join(EPod, Trip.id == EPod.trip_id)
+        .where(
+            Trip.departure_time >= start,
+            Trip.departure_time <= end,
+            Trip.gantry_metered_litres.isnot(None),
+        )
+    )
+    for trip, epod in rows:
+        expected, actual = trip.gantry_metered_litres / 1000, epod.delivered_volume_litres / 1000
+        session.add(_legacy_record(run, ReconciliationNode.DELIVERY_EPOD, expected, actual, trip))
+    await session.flush()
+
+    await session.refresh(run, ["variance_records"])
+    run.total_expected_m3 = sum(vr.expected_volume_m3 for vr in run.variance_records)
+    run.total_actual_m3 = sum(vr.actual_volume_m3 for vr in run.variance_records)
+    await session.flush()
+
+
+def _legacy_record(run, node, expected: float, actual: float, trip: Trip) -> VarianceRecord:
+    variance = actual - expected
+    variance_pct = (abs(variance) / expected * 100) if expected > 0 else 0
+    return VarianceRecord(
+        reconciliation_run_id=run.id,
+        node=node,
+        expected_volume_m3=expected,
+        actual_volume_m3=actual,
+        variance_m3=variance,
+        variance_pct=variance_pct,
+        is_exception=variance_pct > run.tolerance_threshold_pct,
+        reference_id=str(trip.id),
+    )
+
+
+async def _set_based(session, run: ReconciliationRun, start: datetime, end: datetime) -> None:
+    service = ReconciliationService(session)
+    await service._reconcile_gantry_loading(run, start, end)
+    await service._reconcile_delivery_epod(run, start, end)
+    await service._compute_totals(run)
+
+
+async def main() -> None:
+    if settings.DB_ENGINE == "sqlite":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    end = start + timedelta(days=31)
+
+    async with async_session_factory() as session:
+        vehicle = Vehicle(registration_number=f"BENCH-{uuid.uuid4().hex[:8]}")
+        session.add(vehicle)
+        await session.flush()
+
+        trip_rows = []
+        for i in range(TRIPS):
+            loaded = random.uniform(20_000, 40_000)
+            trip_rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "vehicle_id": vehicle.id,
+                    "destination_name": "Benchmark depot",
+                    "loaded_volume_litres": loaded,
+                    "gantry_metered_litres": loaded * random.uniform(0.98, 1.02),
+                    "departure_time": start + timedelta(seconds=i * 26),
+                }
+            )
+        await session.execute(insert(Trip), trip_rows)
+        await session.execute(
+            insert(EPod),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "trip_id": row["id"],
+                    "delivered_volume_litres": row["gantry_metered_litres"]
+                    * random.uniform(0.99, 1.0),
+                }
+                for row in trip_rows
+            ],
+        )
+
+        print(f"Backend: {settings.DB_ENGINE} ({TRIPS:,} trips with ePODs, gantry + ePOD nodes)")
+        print(f"{'engine':>10} {'seconds':>9} {'records':>9}")
+        timings = {}
+        for label, engine_fn in (("legacy", _legacy), ("set-based", _set_based)):
+            run = ReconciliationRun(
+                name=f"benchmark {label}", run_type="BENCHMARK", period_start=start, period_end=end
+            )
+            session.add(run)
+            await session.flush()
+            started = time.perf_counter()
+            await engine_fn(session, run, start, end)
+            timings[label] = time.perf_counter() - started
+            count = len(
+                (
+                    await session.execute(
+                        select(VarianceRecord.id).where(
+                            VarianceRecord.reconciliation_run_id == run.id
+                        )
+                    )
+                ).all()
+            )
+            print(f"{label:>10} {timings[label]:>9.2f} {count:>9,}")
+            await session.execute(
+                delete(VarianceRecord).where(VarianceRecord.reconciliation_run_id == run.id)
+            )
+            session.expunge_all()
+        print(f"speedup: {timings['legacy'] / timings['set-based']:.1f}x")
+
+        await session.rollback()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
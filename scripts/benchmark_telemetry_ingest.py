@@ -0,0 +1,87 @@
+"""Benchmark telemetry ingest throughput (rows/sec) for the active DB_ENGINE.
+
+Compares the legacy per-row ORM path against TelemetryService.ingest's bulk
+writer. Every run is rolled back so the database is left untouched.
+
+    DB_ENGINE=sqlite python -m scripts.benchmark_telemetry_ingest
+    DB_ENGINE=postgresql python -m scripts.benchmark_telemetry_ingest
+"""
+
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.config import settings
+from app.database import async_session_factory, engine
+from app.models.base import Base
+from app.models.telemetry import TelemetryReading
+from app.schemas.telemetry import TelemetryPoint
+from app.services.telemetry_service import TelemetryService
+
+BATCH_SIZES = (1_000, 10_000, 100_000)
+TAG_COUNT = 50
+
+
+def _make_points(n: int) -> list[TelemetryPoint]:
+    tag_ids = [uuid.uuid4() for _ in range(TAG_COUNT)]
+    start = datetime.now(timezone.utc)
+    return [
+        TelemetryPoint(
+            tag_id=tag_ids[i % TAG_COUNT],
+            time=start + timedelta(seconds=i // TAG_COUNT),
+            value=random.uniform(0, 500),
+            source="edge",
+        )
+        for i in range(n)
+    ]
+
+
+async def _orm_ingest(points: list[TelemetryPoint]) -> float:
+    async with async_session_factory() as session:
+        started = time.perf_counter()
+        for p in points:
+            session.add(
+                TelemetryReading(
+                    tag_id=p.tag_id,
+                    time=p.time,
+                    value=p.value,
+                    quality=p.quality,
+                    raw_value=p.raw_value,
+                    source=p.source,
+                )
+            )
+        await session.flush()
+        elapsed = time.perf_counter() - started
+        await session.rollback()
+    return elapsed
+
+
+async def _bulk_ingest(points: list[TelemetryPoint]) -> float:
+    async with async_session_factory() as session:
+        started = time.perf_counter()
+        await TelemetryService(session).ingest(points)
+        elapsed = time.perf_counter() - started
+        await session.rollback()
+    return elapsed
+
+
+async def main() -> None:
+    if settings.DB_ENGINE == "sqlite":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    print(f"Backend: {settings.DB_ENGINE}")
+    print(f"{'points':>10} {'orm rows/s':>14} {'bulk rows/s':>14} {'speedup':>9}")
+    for n in BATCH_SIZES:
+        points = _make_points(n)
+        orm_s = await _orm_ingest(points)
+        bulk_s = await _bulk_ingest(points)
+        print(f"{n:>10,} {n / orm_s:>14,.0f} {n / bulk_s:>14,.0f} {orm_s / bulk_s:>8.1f}x")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
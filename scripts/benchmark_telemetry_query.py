@@ -0,0 +1,97 @@
+"""Benchmark multi-tag telemetry query latency vs. tag count for the active DB_ENGINE.
+
+Compares the legacy one-query-per-tag loop against TelemetryService.query's
+single-statement fetch over the same seeded readings. Seed data is rolled
+back on exit.
+
+    DB_ENGINE=sqlite python -m scripts.benchmark_telemetry_query
+    DB_ENGINE=postgresql python -m scripts.benchmark_telemetry_query
+"""
+
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import async_session_factory, engine
+from app.models.base import Base
+from app.models.telemetry import TelemetryReading
+from app.schemas.telemetry import TelemetryPoint, TelemetryReadingResponse
+from app.services.telemetry_service import TelemetryService
+
+TAG_COUNTS = (1, 10, 40, 100)
+POINTS_PER_TAG = 1_000
+REPEATS = 5
+
+
+async def _per_tag_query(session, tag_ids, start, end) -> int:
+    total = 0
+    for tag_id in tag_ids:
+        result = await session.execute(
+            select(TelemetryReading)
+            .where(
+                TelemetryReading.tag_id == tag_id,
+                TelemetryReading.time >= start,
+                TelemetryReading.time <= end,
+            )
+            .order_by(TelemetryReading.time)
+        )
+        total += len([TelemetryReadingResponse.model_validate(r) for r in result.scalars()])
+        session.expunge_all()
+    return total
+
+
+async def _timed(coro_factory) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        await coro_factory()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def main() -> None:
+    if settings.DB_ENGINE == "sqlite":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    tag_ids = [uuid.uuid4() for _ in range(max(TAG_COUNTS))]
+    start = datetime.now(timezone.utc)
+    end = start + timedelta(seconds=POINTS_PER_TAG)
+
+    async with async_session_factory() as session:
+        service = TelemetryService(session)
+        await service.ingest(
+            [
+                TelemetryPoint(
+                    tag_id=tag_id,
+                    time=start + timedelta(seconds=i),
+                    value=random.uniform(0, 500),
+                )
+                for tag_id in tag_ids
+                for i in range(POINTS_PER_TAG)
+            ]
+        )
+
+        print(f"Backend: {settings.DB_ENGINE} ({POINTS_PER_TAG:,} points/tag, best of {REPEATS})")
+        print(f"{'tags':>6} {'per-tag ms':>12} {'single ms':>11} {'speedup':>9}")
+        for n in TAG_COUNTS:
+            ids = tag_ids[:n]
+            loop_s = await _timed(lambda ids=ids: _per_tag_query(session, ids, start, end))
+            single_s = await _timed(lambda ids=ids: service.query(ids, start, end))
+            print(
+                f"{n:>6} {loop_s * 1000:>12.1f} {single_s * 1000:>11.1f} "
+                f"{loop_s / single_s:>8.1f}x"
+            )
+
+        await session.rollback()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
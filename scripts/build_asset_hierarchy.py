@@ -0,0 +1,43 @@
+"""Backfill asset hierarchy paths, and their index or closure table.
+
+The asset API and ``AssetService`` set paths on every insert and re-parent,
+so run this once on databases created before that, or after loading rows
+any other way.
+On PostgreSQL it also creates the ltree extension and the path GiST indexes;
+on SQLite it rebuilds the ``asset_closure`` table. Idempotent.
+
+    python -m scripts.build_asset_hierarchy
+"""
+
+import asyncio
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import async_session_factory, engine
+from app.services.asset_hierarchy import AssetHierarchyService
+
+
+async def main() -> None:
+    if settings.DB_ENGINE != "sqlite":
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS ltree"))
+            for table in ("assets", "systems", "tags"):
+                await conn.execute(
+                    text(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_path_gist "
+                        f"ON {table} USING gist ((path::ltree))"
+                    )
+                )
+
+    async with async_session_factory() as session:
+        await AssetHierarchyService(session).rebuild()
+        await session.commit()
+    await engine.dispose()
+    print("Asset hierarchy paths rebuilt")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+"""Create the pg_trgm GIN index that backs tag search on an existing database.
+
+New schemas get it from the ``Tag`` model and migrated databases from the
+``3f9c2a1d7e45`` alembic revision; this script does the same for databases
+not managed by alembic. Idempotent, and builds the index without locking
+writes to ``tags``. A no-op on SQLite, which searches an in-memory index.
+
+    python -m scripts.create_tag_search_index
+"""
+
+import asyncio
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import engine
+
+
+async def main() -> None:
+    if settings.DB_ENGINE == "sqlite":
+        print("SQLite uses the in-memory tag name index; nothing to do")
+        return
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.execute(
+            text(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tags_name_trgm "
+                "ON tags USING gin (name gin_trgm_ops)"
+            )
+        )
+    await engine.dispose()
+    print("Tag search index: ix_tags_name_trgm")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
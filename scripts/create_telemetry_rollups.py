@@ -0,0 +1,52 @@
+"""Create the telemetry rollup tiers as TimescaleDB continuous aggregates.
+
+Run once per PostgreSQL database after ``telemetry_readings`` is a
+hypertable. Idempotent. With TIMESCALE_ENABLED=false (or SQLite) the tiers
+are plain tables created with the rest of the schema and refreshed by the
+``refresh_telemetry_rollups`` Celery task instead.
+
+Refuses to run if a tier already exists as a plain table (e.g. created by
+``create_all`` before the tiers were excluded from it), since ``IF NOT
+EXISTS`` would silently keep the empty table.
+
+    python -m scripts.create_telemetry_rollups
+"""
+
+import asyncio
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.services.telemetry_rollup import (
+    ROLLUP_TIERS,
+    continuous_aggregate_ddl,
+    uses_timescale,
+)
+
+
+async def main() -> None:
+    if not uses_timescale():
+        print("TimescaleDB rollups disabled; nothing to do")
+        return
+
+    # Continuous aggregates cannot be created inside a transaction block
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for tier in ROLLUP_TIERS:
+            name = tier.model.__tablename__
+            kind = await conn.scalar(
+                text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+                {"name": name},
+            )
+            if kind == "r":
+                raise SystemExit(
+                    f"{name} is a plain table; drop it before creating the continuous aggregate"
+                )
+        for statement in continuous_aggregate_ddl():
+            await conn.execute(text(statement))
+    await engine.dispose()
+    print("Telemetry rollup tiers: 1m, 1h, 1d")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
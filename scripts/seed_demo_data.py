@@ -29,6 +29,7 @@ from app.models.reconciliation import ReconciliationRun, VarianceRecord
 from app.models.terminal import GantryBay, LoadingRack, Tank, Terminal
 from app.models.user import User
 from app.models.vessel import BerthSchedule, DemurrageRecord, Vessel
+from app.services.asset_hierarchy import AssetHierarchyService
 
 
 async def seed() -> None:
@@ -328,6 +329,9 @@ async def seed() -> None:
         )
         session.add(ct)
 
+        # Rows were added in bulk; fill in their hierarchy paths in one pass
+        await AssetHierarchyService(session).rebuild()
+
         await session.commit()
         print("\nDemo data seeded successfully!")
         print(f"  Login: {settings.DEMO_ADMIN_EMAIL} / {settings.DEMO_ADMIN_PASSWORD}")